@@ -0,0 +1,74 @@
+"""
+emit_toml of toml_emitter.py with large dependency and classifier lists, compared with
+the former string concatenation of convert_list_to_toml and with toml.dumps.
+each output is parsed again with toml.loads, to check the round trip.
+
+usage : python ./benchmarks/bench_toml_emitter.py [repeats]
+"""
+
+# STDLIB
+import pathlib
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+# EXT
+import toml
+
+# PROJ
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+from toml_emitter import emit_toml     # noqa: E402
+
+
+def concatenate_list_to_toml(l_data: List[str]) -> str:
+    """ the former convert_list_to_toml, which builds the string with my_str = my_str + ... """
+    my_str = "[\n"
+    for str_data in l_data:
+        my_str = my_str + f'    "{str_data}",\n'
+    my_str = my_str + "]"
+    return my_str
+
+
+def get_project(number_of_items: int) -> Dict[str, Any]:
+    return {
+        'name': 'some_project',
+        'description': 'a "quoted" description',
+        'classifiers': [f'Topic :: Some Topic :: Classifier {number}' for number in range(number_of_items)],
+        'dependencies': [f'some_package_{number}>=1.{number}' for number in range(number_of_items)],
+    }
+
+
+def emit_concatenated(d_project: Dict[str, Any]) -> str:
+    return (f'[project]\nname = "{d_project["name"]}"\ndescription = "{d_project["description"].replace(chr(34), chr(39))}"\n'
+            f'classifiers = {concatenate_list_to_toml(d_project["classifiers"])}\n'
+            f'dependencies = {concatenate_list_to_toml(d_project["dependencies"])}')
+
+
+def time_ms(function: Callable[[Dict[str, Any]], str], d_project: Dict[str, Any], repeats: int) -> float:
+    """
+    returns the milliseconds of the fastest run - and checks that the output can be parsed again
+
+    >>> assert time_ms(lambda d_project: emit_toml([('project', d_project)]), get_project(10), 2) > 0
+    """
+    l_ms: List[float] = list()
+    for _ in range(repeats):
+        time_start = time.perf_counter()
+        toml_str = function(d_project)
+        l_ms.append((time.perf_counter() - time_start) * 1000)
+    assert toml.loads(toml_str)['project']['dependencies'] == d_project['dependencies']
+    return min(l_ms)
+
+
+def main(repeats: int = 5) -> None:
+    print(f'[project] table with n classifiers and n dependencies, fastest of {repeats} runs in milliseconds:')
+    print(f'    {"n":>8}   {"emit_toml":>10}   {"concatenate":>12}   {"toml.dumps":>10}')
+    for number_of_items in (100, 1000, 10000, 100000):
+        d_project = get_project(number_of_items)
+        ms_emit_toml = time_ms(lambda d_data: emit_toml([('project', d_data)]), d_project, repeats)
+        ms_concatenate = time_ms(emit_concatenated, d_project, repeats)
+        ms_toml_dumps = time_ms(lambda d_data: toml.dumps({'project': d_data}), d_project, repeats)
+        print(f'    {number_of_items:>8}   {ms_emit_toml:>10.2f}   {ms_concatenate:>12.2f}   {ms_toml_dumps:>10.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
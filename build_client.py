@@ -0,0 +1,143 @@
+"""
+thin client for the build server of conf_root.py - it only imports the standard library, so it starts fast.
+if the build server is not running, the project is built by conf_root.py in a new process.
+the location of the socket and the requests are defined here, conf_root.py imports them for the build server.
+
+start the build server with : python conf_root.py serve
+usage : python build_client.py [--conf_file ...] [--template_dir ...] [--target_dir ...] [--dry_run] [--socket ...]
+"""
+
+# stdlib
+import argparse
+import json
+import logging
+import os
+import pathlib
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger()
+FORMAT = '%(levelname)-8s %(message)s'
+logging.basicConfig(format=FORMAT)
+logger.level = logging.INFO
+
+PATH_CONF_FILE = pathlib.Path(__file__).resolve().parent / 'conf_root.py'
+
+
+def get_build_server_socket_dir() -> pathlib.Path:
+    """
+    the private directory for the socket of the build server of the current user : <$XDG_RUNTIME_DIR or the temp dir>/pizzacutter-<uid>,
+    created with mode 0700. other users can not connect to a socket inside of it, or replace the socket.
+    raises PermissionError if the directory belongs to another user or is accessible by others
+
+    >>> assert oct(stat.S_IMODE(get_build_server_socket_dir().stat().st_mode)) == '0o700'
+    """
+    path_runtime_dir = pathlib.Path(os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir())
+    path_socket_dir = path_runtime_dir / f'pizzacutter-{os.getuid()}'
+    try:
+        os.mkdir(path_socket_dir, mode=0o700)
+    except FileExistsError:
+        pass
+    # lstat - a symlink, created by another user, is not followed
+    dir_stat = os.lstat(path_socket_dir)
+    if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid() or stat.S_IMODE(dir_stat.st_mode) & 0o077:
+        raise PermissionError(f'the socket directory "{path_socket_dir}" needs to be a directory of the current user with mode 0700')
+    return path_socket_dir
+
+
+def get_build_server_socket_path() -> pathlib.Path:
+    """
+    the unix socket of the build server of the current user
+
+    >>> get_build_server_socket_path().name
+    'build_server.sock'
+    """
+    return get_build_server_socket_dir() / 'build_server.sock'
+
+
+def get_peer_uid(connected_socket: socket.socket) -> Optional[int]:
+    """
+    the user id of the process on the other end of the unix socket - None, where SO_PEERCRED is not supported
+
+    >>> server_socket, client_socket = socket.socketpair()
+    >>> assert get_peer_uid(client_socket) in (os.getuid(), None)
+    >>> server_socket.close(); client_socket.close()
+    """
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    # struct ucred : pid, uid, gid
+    _, uid, _ = struct.unpack('3i', connected_socket.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+    return int(uid)
+
+
+def check_peer_uid(connected_socket: socket.socket) -> None:
+    """ raises PermissionError if the process on the other end of the unix socket runs as another user """
+    peer_uid = get_peer_uid(connected_socket)
+    if peer_uid is not None and peer_uid != os.getuid():
+        raise PermissionError(f'the peer of the build server socket runs as user id {peer_uid}, not as the current user {os.getuid()}')
+
+
+def request_build_server(d_request: Dict[str, Any], path_socket: pathlib.Path) -> Optional[Dict[str, Any]]:
+    """
+    sends the request to the build server and returns the response - or None, if no build server is listening.
+    the request (paths of the conf file and the target) is only sent to a build server of the current user
+
+    >>> request_build_server({'command': 'ping'}, pathlib.Path('does_not_exist.sock')) is None
+    True
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+        try:
+            client_socket.connect(str(path_socket))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        check_peer_uid(client_socket)
+        client_socket.sendall(json.dumps(d_request).encode('utf-8') + b'\n')
+        with client_socket.makefile('rb') as response_file:
+            response_line = response_file.readline()
+    if not response_line:
+        raise RuntimeError(f'the build server on "{path_socket}" closed the connection without a response')
+    d_response: Dict[str, Any] = json.loads(response_line)
+    return d_response
+
+
+def main(l_args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='builds on the build server of conf_root.py, or with conf_root.py in a new process')
+    parser.add_argument('--conf_file', default=str(PATH_CONF_FILE), help='the conf file, default : conf_root.py')
+    parser.add_argument('--template_dir', default=str(PATH_CONF_FILE.parent), help='the template directory, default : the directory of conf_root.py')
+    parser.add_argument('--target_dir', default=str(PATH_CONF_FILE.parent.parent),
+                        help='the target directory, default : the parent directory of the template directory')
+    parser.add_argument('--dry_run', action='store_true', help='test only, report overwrites and unset patterns')
+    parser.add_argument('--socket', default=None, help='the socket of the build server, default : build_server.sock in the socket directory of the user')
+    args = parser.parse_args(l_args)
+    path_socket = pathlib.Path(args.socket) if args.socket else get_build_server_socket_path()
+
+    d_request = {'command': 'build',
+                 'conf_file': str(pathlib.Path(args.conf_file).resolve()),
+                 'template_dir': str(pathlib.Path(args.template_dir).resolve()),
+                 'target_dir': str(pathlib.Path(args.target_dir).resolve()),
+                 'dry_run': args.dry_run}
+    d_response = request_build_server(d_request, path_socket)
+
+    if d_response is None:
+        logger.info(f'no build server on "{path_socket}", building with "{PATH_CONF_FILE}"')
+        command = [sys.executable, str(PATH_CONF_FILE), 'build', '--conf_file', d_request['conf_file'], '--template_dir', d_request['template_dir'],
+                   '--target_dir', d_request['target_dir'], '--socket', str(path_socket)]
+        if args.dry_run:
+            command.append('--dry_run')
+        return subprocess.run(command).returncode
+
+    for level, message in d_response['log']:
+        logger.log(level, message)
+    if not d_response['ok']:
+        logger.error(f'the build on the build server failed:\n{d_response["error"]}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,38 @@
 # stdlib
+import concurrent.futures
 import datetime
+import hashlib
+import importlib.util
+import json
 import logging
+import os
 import pathlib
+import signal
+import socketserver
+import statistics
 import subprocess
 import sys
-from typing import Dict, List, Optional
+import tempfile
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # ext
 import toml     # noqa
 
 # own
+import build_client
 import lib_log_utils
+from pizzacutter import PizzaCutter
 from pizzacutter import PizzaCutterConfigBase
 from pizzacutter import find_version_number_in_file
+from toml_emitter import emit_toml
+# the former TOML helpers of this module, deprecated - kept for the configurations which import them from here
+from toml_emitter import clean_quotes as clean_quotes     # noqa: F401
+from toml_emitter import convert_dict_to_toml as convert_dict_to_toml     # noqa: F401
+from toml_emitter import convert_list_of_dict_to_toml as convert_list_of_dict_to_toml     # noqa: F401
+from toml_emitter import convert_list_to_toml as convert_list_to_toml     # noqa: F401
 
 logger = logging.getLogger()
 FORMAT = '%(levelname)-8s %(message)s'
@@ -29,7 +49,8 @@ class LinuxTestMatrix(object):
                  mypy_test: bool,
                  do_setup_install: bool,
                  do_setup_install_test: bool,
-                 do_cli_test: bool
+                 do_cli_test: bool,
+                 free_threaded: bool = False
                  ):
         self.arch = arch
         self.python_version = python_version
@@ -40,6 +61,16 @@ class LinuxTestMatrix(object):
         self.do_setup_install = do_setup_install
         self.do_setup_install_test = do_setup_install_test
         self.do_cli_test = do_cli_test
+        # the free-threaded build of CPython (no GIL, python >= 3.13) - the interpreter "python3.13t", with PYTHON_GIL=0 and the thread stress tests
+        self.free_threaded = free_threaded
+
+    @property
+    def interpreter_version(self) -> str:
+        # the python version for actions/setup-python and the local matrix : '3.13' -> '3.13t', '3.14-dev' -> '3.14t-dev'
+        if not self.free_threaded:
+            return self.python_version
+        version, dev, _ = self.python_version.partition('-dev')
+        return f'{version}t{dev}'
 
 
 class PizzaCutterConfig(PizzaCutterConfigBase):
@@ -64,6 +95,14 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         self.pizza_cutter_allow_outside_write = False
         self.pizza_cutter_dry_run = False
         self.pizza_cutter_quiet = False
+        # number of threads to copy and render the template files of the project (only used by PizzaCutterConcurrent, see main())
+        # set to 1 in order to render the files one after another
+        self.pizza_cutter_render_workers: int = min(32, (os.cpu_count() or 1) + 4)
+        # the optional files written by hand and their content, read before the template is copied - see pizza_cutter_hook_before_build
+        self.d_hand_written_optional_files: Dict[pathlib.Path, bytes] = dict()
+        # the clock of the build, for the year in the LICENSE and the dates in the generated files, as unix timestamp -
+        # set it to get the same output on every build. None : the environment variable SOURCE_DATE_EPOCH, otherwise the current time
+        self.pizza_cutter_source_date_epoch: Optional[int] = None
 
 # ##############################################################################################################################################################
 # Project Configuration - some lists that should only defined in the root configuration
@@ -120,6 +159,11 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         # "py.typed" and "*.pyi" will be included into setup_included_files
         # setup.py zip_safe is set to False
         self.is_typed_package = False
+        # generate the stubs (*.pyi) of the public api with stubgen on every build, if it is a typed package -
+        # type checkers of downstream projects only read the stubs then. stubs without the stubgen header line are hand written,
+        # they are kept as they are. mypy excludes the stubs in the project itself, to check the implementation.
+        # the local testscript checks the stubs with stubtest, the differences to accept are listed in stubtest_allowlist.txt
+        self.is_typed_package_generate_stubs = True
 
         # ### PyPi settings
         # if it is a PyPi Package, tagged Builds will be uploaded to PyPi
@@ -139,6 +183,113 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         # ### cli settings
         # #########################################################
         self.create_cli_file = True
+        # the console script runs on a warm server if it is running ("python -m <package>.warm_cli serve") :
+        # the server imports the cli once and forks a child per call, with argv, environment, working directory and stdio of the caller.
+        # the exit codes and signals are the same as without the server, which is used if the server is not running.
+        # for cli commands which are called very often from shell scripts - posix only, on windows the cli always runs directly.
+        self.cli_warm_server = False
+        # generate the module batch_io.py and the subcommand "batch COMMAND" : it reads records (json or lines) from stdin
+        # or a file, and runs COMMAND for each of them in one process, with one json result per line on stdout.
+        # a failing record is reported in its result line, the next records are processed as usual.
+        # the cli module is only created once - changing that setting later will not update it
+        self.cli_batch = False
+        # generate the module completion_index.py, which the console script runs : on a Tab press it reads the completions from
+        # completion_index.json instead of importing the cli and click. the index is generated from cli_main by the hook after the build,
+        # whenever the package changed - if it does not belong to the cli module (the hash differs), click completes as usual.
+        self.cli_completion_index = False
+        # generate the module plugins.py : other distributions add subcommands to cli_main with entry points in the group
+        # "<package_name>.commands". the entry points are cached in an index file, as long as the installed distributions do not change,
+        # and the module of a plugin is only imported when its subcommand is invoked. and the subcommand "plugins", which lists them.
+        # the cli module is only created once - changing that setting later will not update it
+        self.cli_plugins = False
+
+        # #########################################################
+        # ### asyncio settings
+        # #########################################################
+        # generate "async def main()" and a cli bridge which runs it under asyncio.run, using uvloop if it is installed.
+        # SIGINT and SIGTERM cancel the main task, instead of raising SigIntError / SigTermError in the signal handlers.
+        # the module aio_tools.py (with map_bounded for fan-out I/O with bounded concurrency) is only kept if async_main is set.
+        # the main module and the cli module are only created once - changing that setting later will not update them
+        self.async_main = False
+
+        # #########################################################
+        # ### process pool settings
+        # #########################################################
+        # generate the module worker_pool.py (map_chunked on a process pool) and the global cli option "--jobs N".
+        # the workers ignore SIGINT and SIGTERM, the parent cancels the pending work and waits for the running chunks.
+        # the cli module is only created once - changing that setting later will not update it
+        self.process_pool = False
+        # multiprocessing start method 'fork', 'forkserver' or 'spawn' - '' for the default of the platform
+        self.process_pool_start_method = ''
+
+        # #########################################################
+        # ### logging settings
+        # #########################################################
+        # generate the module log_setup.py and the global cli options "--log-level" and "--log-sink".
+        # log records are routed through a QueueHandler / QueueListener to a background thread, which formats and writes them.
+        # the cli module is only created once - changing that setting later will not update it
+        self.queue_logging = False
+
+        # #########################################################
+        # ### configuration settings
+        # #########################################################
+        # generate the module config_loader.py : load_config / get_config merge the defaults of a frozen dataclass, the toml files
+        # of the system, the user and the project, the environment variables <PACKAGE_NAME>_<SETTING> and the global cli option
+        # "--set KEY=VALUE" into an instance of that dataclass. the parsed config files are cached (pickle) in the cache directory
+        # of the user, with the modification times and sizes of the files - as long as they do not change, they are not parsed again.
+        # the cli module is only created once - changing that setting later will not update it
+        self.app_config = False
+
+        # #########################################################
+        # ### metrics settings
+        # #########################################################
+        # generate the module metrics.py with counters, gauges and histogram timers, as decorators or context managers for hot functions.
+        # the values are kept in preallocated arrays per thread and exported on demand, or at exit, as json or in the prometheus text format.
+        # they are enabled with the environment variables <PACKAGE_NAME>_METRICS=1 or <PACKAGE_NAME>_METRICS_FILE=<path> -
+        # disabled, a decorator returns the function itself, and inc(), observe(), time() only check a flag.
+        self.metrics = False
+
+        # #########################################################
+        # ### free threading settings
+        # #########################################################
+        # generate tests/test_thread_stress.py : the doctests of the package and the cli commands run in many threads at the same time,
+        # so races show up - only if the environment variable THREAD_STRESS=True, which the free-threaded cells of the linux test matrix
+        # set (LinuxTestMatrix(..., free_threaded=True)). and tests/benchmarks/bench_free_threading.py, the scaling of a thread pool
+        # with and without the GIL.
+        self.free_threading = False
+
+        # #########################################################
+        # ### disk cache settings
+        # #########################################################
+        # generate the module disk_cache.py : the decorator memoize() caches the results of expensive functions in a sqlite database
+        # in the cache directory of the user, by a stable hash of the arguments - the least recently used entries are evicted above a
+        # size limit, old entries are computed again. the worker processes of --jobs share the cache. and the global cli options
+        # "--no-cache", "--clear-cache" and "--cache-stats" (the hits and misses by function, at exit).
+        # the cli module is only created once - changing that setting later will not update it
+        self.disk_cache = False
+
+        # #########################################################
+        # ### mypyc settings
+        # #########################################################
+        # compile the modules in mypyc_modules with mypyc - they need to pass "mypy --strict", see the mypy settings.
+        # a setup.py with the compiled extension modules is generated, and mypy[mypyc] is added to the build requirements.
+        # the wheels are platform specific then - on other interpreters than CPython the pure python package is built.
+        # set the environment variable MYPYC_COMPILE=0 to build the pure python package - the local testscript does that
+        # for the editable install, and tests the compiled build in a separate virtual environment.
+        self.compile_with_mypyc = False
+
+        # #########################################################
+        # ### footprint budgets
+        # #########################################################
+        # "testing_tools.py check_footprint" imports the package in a fresh interpreter and fails if the import time
+        # or the peak rss after the import exceed their budget, or if the wheel (only built if it has a budget) is bigger.
+        # the report breaks down the import time per top level import, to find the dependency which made it grow.
+        # 0 = no budget - the check runs in the local testscript and in the linux jobs on github actions, if any budget is set.
+        self.budget_import_ms: float = 0
+        self.budget_import_rss_mb: float = 0
+        self.budget_wheel_kb: float = 0
+        self.budget_do_local_testscript = True
+        self.budget_do_gha = True
 
         # #########################################################
         # ### pytest settings
@@ -231,6 +382,15 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         self.do_code_coverage_code_climate = True
         self.do_code_coverage_codecov = True
 
+        # the coverage engine, selected for the interpreter which runs the tests, in the local testscript and on github actions :
+        # 'auto' = 'sysmon' (sys.monitoring on python >= 3.12, much less overhead than tracing every line), the C tracer 'ctrace' elsewhere.
+        # sys.monitoring measures branches only from python 3.14 - with "branch = True" in .coveragerc 'auto' selects 'ctrace' below.
+        # 'sysmon', 'ctrace' or 'pytrace' always select that engine. needs coverage >= 7.4, the environment variable COVERAGE_CORE wins.
+        self.coverage_core = 'auto'
+        # the test loop (run_testloop.sh) measures the coverage only in every n-th iteration and reports it - the other
+        # iterations run pytest without coverage. 1 = in every iteration
+        self.coverage_testloop_every_nth_iteration = 1
+
         # #########################################################
         # ### Github actions settings
         # #########################################################
@@ -369,6 +529,8 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         # #########################################################
         self.pyproject_build_system_requires: List[str] = ["setuptools", "setuptools-scm"]
         self.pyproject_build_system_backend: str = 'setuptools.build_meta'
+        # the modules to compile with mypyc, relative to the package directory - only used if compile_with_mypyc is set
+        self.mypyc_modules: List[str] = [f'{self.main_module}.py']
         self.pyproject_project_name: str = self.project_name
         self.pyproject_authors: List[Dict[str, str]] = [{'name': self.author, 'email': self.author_email}]
         self.pyproject_description: str = self.short_description
@@ -442,6 +604,15 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
                                                           build=True, build_docs=False,
                                                           do_setup_install=True, do_setup_install_test=True, do_cli_test=self.gha_linux_do_cli_test))
 
+        """
+        # the free-threaded build (no GIL) - runs the thread stress tests, see the free threading settings
+
+        self.gha_linux_test_matrix.append(LinuxTestMatrix(arch='amd64', python_version='3.13', build_test=True, mypy_test=True,
+                                                          build=True, build_docs=False,
+                                                          do_setup_install=True, do_setup_install_test=True, do_cli_test=self.gha_linux_do_cli_test,
+                                                          free_threaded=True))
+        """
+
         # build test and build bedingt ein pip upgrade, welches unter graalpy-24.1 nicht funktioniert
         self.gha_linux_test_matrix.append(LinuxTestMatrix(arch='amd64', python_version='graalpy-24.1', build_test=False, mypy_test=True,
                                                           build=False, build_docs=True,
@@ -519,7 +690,7 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         self.github_master = f'git+https://github.com/{self.github_account}/{self.project_name}.git'
         self.repo_slug = self.github_account + '/' + self.project_name
         # we ned to have a function main_commandline in module module_name - see examples
-        self.setup_entry_points = {'console_scripts': [f'{self.shell_command} = {self.package_dir}.{self.cli_module}:{self.cli_method}']}
+        self.setup_entry_points = {'console_scripts': [f'{self.shell_command} = {self.package_dir}.{self.get_cli_entry_point()}']}
 
         ''' 
         [project.entry-points."console_scripts"]
@@ -540,6 +711,11 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
             remove_from_list(self.setup_included_files, '*.pyi')
             remove_from_list(self.setup_included_files, '__init__.pyi')
 
+        if self.create_cli_file and self.cli_completion_index:
+            self.setup_included_files.append('completion_index.json')
+        else:
+            remove_from_list(self.setup_included_files, 'completion_index.json')
+
         self.setup_package_data = {self.package_name: self.setup_included_files}
 
         self.pizza_cutter_patterns['{{PizzaCutter.project_name}}'] = self.project_name
@@ -578,8 +754,9 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         # used in .coveragerc, just in case You keep the conf file in the project directory
         self.pizza_cutter_patterns['{{PizzaCutter.conf_file_name}}'] = self.pizza_cutter_path_conf_file.name
         # used in Licence
-        self.pizza_cutter_patterns['{{PizzaCutter.current_year}}'] = str(datetime.datetime.now().year)
-        self.pizza_cutter_patterns['{{PizzaCutter.date}}'] = datetime.datetime.today().strftime('%Y-%m-%d')
+        build_datetime = get_build_datetime(self.pizza_cutter_source_date_epoch)
+        self.pizza_cutter_patterns['{{PizzaCutter.current_year}}'] = str(build_datetime.year)
+        self.pizza_cutter_patterns['{{PizzaCutter.date}}'] = build_datetime.strftime('%Y-%m-%d')
 
         if self.docs_badges_with_jupiter:
             self.pizza_cutter_patterns['{{PizzaCutter.|jupyter| }}'] = '|jupyter| '
@@ -612,48 +789,217 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         self.setup_mypy()
         self.setup_black()
         self.setup_pytest()
-        self.setup_pyproject_build_system()
-        self.setup_pyproject_project()
+        self.setup_pyproject_toml()
+        self.setup_async_main()
+        self.setup_cli_module()
+        self.setup_mypyc()
+        self.setup_footprint_budgets()
+        self.setup_stubs()
 
     # ############################################################################
     # requirements_test.txt settings
-    # needs to be called BEFORE setup_pyproject_project
+    # needs to be called BEFORE setup_pyproject_toml
     # ############################################################################
     def setup_requirements_test(self):
         self.requirements_test = sorted(list(set(self.requirements_test)))
         self.pizza_cutter_patterns['# {{PizzaCutter.requirements_test}}'] = '\n'.join(self.requirements_test)
 
     # ############################################################################
-    # pyproject build-system
+    # pyproject.toml build-system, project and tool.setuptools tables
     # ############################################################################
-    def setup_pyproject_build_system(self) -> None:
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.build_system.requires}}'] = str(self.pyproject_build_system_requires)
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.build_system.backend}}'] = self.pyproject_build_system_backend
-
-    def setup_pyproject_project(self) -> None:
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.name}}'] = self.pyproject_project_name
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.authors}}'] = convert_list_of_dict_to_toml(self.pyproject_authors)
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.description}}'] = self.pyproject_description
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.requires_python}}'] = self.pyproject_requires_python
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.keywords}}'] = convert_list_to_toml(sorted(self.pyproject_keywords))
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.licence}}'] = convert_dict_to_toml(self.pyproject_licence)
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.classifiers}}'] = convert_list_to_toml(self.pyproject_classifiers)
-        # dependencies - former setup.cfg "install_requires"
-        # https://setuptools.pypa.io/en/latest/userguide/dependency_management.html
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.dependencies}}'] = convert_list_to_toml(sorted(self.pyproject_dependencies))
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.project.version}}'] = self.pyproject_version
-        # self.pizza_cutter_patterns['{{PizzaCutter.pyproject.optional_dependencies.test}}'] = convert_list_to_toml(self.pyproject_optional_dependencies_test)
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.optional_dependencies.test}}'] = convert_list_to_toml(sorted(list(set(self.requirements_test))))
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.zip_safe}}'] = str(self.setup_zip_safe).lower()
-        pyproject_package_data: str = f'[tool.setuptools.package-data]\n{self.package_name} = {convert_list_to_toml(sorted(self.setup_included_files))}'
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.package_data}}'] = pyproject_package_data
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.url}}'] = str(self.url)
+    def setup_pyproject_toml(self) -> None:
+        """
+        the tables are written by emit_toml in one pass, with TOML escaping for all strings
+        """
+        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.tables}}'] = emit_toml(self.get_pyproject_tables(), d_comments={
+            'project': '# see: https://setuptools.pypa.io/en/latest/userguide/pyproject_config.html',
+            'project.dependencies': '# dependencies - former setup.cfg "install_requires"\n'
+                                    '# see: https://setuptools.pypa.io/en/latest/userguide/dependency_management.html',
+        })
+
+    def get_pyproject_tables(self) -> List[Tuple[str, Dict[str, Any]]]:
+        pyproject_build_system_requires = list(self.pyproject_build_system_requires)
+        if self.compile_with_mypyc and 'mypy[mypyc]' not in pyproject_build_system_requires:
+            pyproject_build_system_requires.append('mypy[mypyc]')
 
         if self.create_cli_file:
-            pyproject_scripts = f'[project.scripts]\n    {self.shell_command} = "{self.package_dir}.{self.cli_module}:{self.cli_method}"'
+            d_pyproject_scripts = {self.shell_command: f'{self.package_dir}.{self.get_cli_entry_point()}'}
         else:
-            pyproject_scripts = ''
-        self.pizza_cutter_patterns['{{PizzaCutter.pyproject.scripts}}'] = pyproject_scripts
+            d_pyproject_scripts = dict()
+
+        return [
+            ('build-system', {
+                'requires': pyproject_build_system_requires,
+                'build-backend': self.pyproject_build_system_backend,
+            }),
+            ('project', {
+                'name': self.pyproject_project_name,
+                'authors': self.pyproject_authors,
+                'description': self.pyproject_description,
+                'readme': 'README.rst',
+                'requires-python': self.pyproject_requires_python,
+                'keywords': sorted(self.pyproject_keywords),
+                'license': self.pyproject_licence,
+                'classifiers': self.pyproject_classifiers,
+                'dependencies': sorted(self.pyproject_dependencies),
+                'version': self.pyproject_version,
+            }),
+            ('project.urls', {
+                'Homepage': str(self.url),
+                'Documentation': f'{self.url}/blob/master/README.rst',
+                'Repository': f'{self.url}.git',
+                'Changelog': f'{self.url}/blob/master/CHANGES.rst',
+            }),
+            ('project.optional-dependencies', {
+                'test': sorted(set(self.requirements_test)),
+            }),
+            # empty tables are not written
+            ('project.scripts', d_pyproject_scripts),
+            ('tool.setuptools.package-data', {
+                self.package_name: sorted(self.setup_included_files),
+            }),
+        ]
+
+    # ############################################################################
+    # mypyc settings
+    # ############################################################################
+    def setup_mypyc(self) -> None:
+        self.pizza_cutter_patterns['{{PizzaCutter.mypyc.modules}}'] = str([f'{self.package_dir}/{module}' for module in self.mypyc_modules])
+        module_names = [f'{self.package_dir}.{module}'.rsplit('.py', 1)[0].replace('/', '.') for module in self.mypyc_modules]
+        self.pizza_cutter_patterns['{{PizzaCutter.mypyc.module_names}}'] = str(module_names)
+        self.pizza_cutter_patterns['{{PizzaCutter.testscript.do_mypyc}}'] = str(self.compile_with_mypyc)
+
+    # ############################################################################
+    # stubs settings
+    # ############################################################################
+    def setup_stubs(self) -> None:
+        do_stubs = self.is_typed_package and self.is_typed_package_generate_stubs
+        self.pizza_cutter_patterns['{{PizzaCutter.mypy.exclude_stubs}}'] = "exclude = '[.]pyi$'" if do_stubs else ''
+        self.pizza_cutter_patterns['{{PizzaCutter.testscript.do_stubtest}}'] = str(do_stubs)
+
+    # ############################################################################
+    # footprint budgets
+    # ############################################################################
+    def setup_footprint_budgets(self) -> None:
+        self.pizza_cutter_patterns['{{PizzaCutter.budget.import_ms}}'] = str(self.budget_import_ms)
+        self.pizza_cutter_patterns['{{PizzaCutter.budget.import_rss_mb}}'] = str(self.budget_import_rss_mb)
+        self.pizza_cutter_patterns['{{PizzaCutter.budget.wheel_kb}}'] = str(self.budget_wheel_kb)
+        has_budget = any((self.budget_import_ms, self.budget_import_rss_mb, self.budget_wheel_kb))
+        self.pizza_cutter_patterns['{{PizzaCutter.testscript.do_footprint_check}}'] = str(has_budget and self.budget_do_local_testscript)
+        self.pizza_cutter_patterns['{{PizzaCutter.gha.do_footprint_check}}'] = str(has_budget and self.budget_do_gha)
+
+    # ############################################################################
+    # asyncio settings
+    # ############################################################################
+    def setup_async_main(self) -> None:
+        if self.async_main:
+            self.pizza_cutter_patterns['{{PizzaCutter.main_module.import_asyncio}}'] = 'import asyncio'
+            self.pizza_cutter_patterns['{{PizzaCutter.main_module.def}}'] = 'async def'
+            self.pizza_cutter_patterns['{{PizzaCutter.main_module.doctest_call_main}}'] = 'asyncio.run(main())'
+        else:
+            self.pizza_cutter_patterns['{{PizzaCutter.main_module.import_asyncio}}'] = ''
+            self.pizza_cutter_patterns['{{PizzaCutter.main_module.def}}'] = 'def'
+            self.pizza_cutter_patterns['{{PizzaCutter.main_module.doctest_call_main}}'] = 'main()'
+
+    # ############################################################################
+    # cli module settings
+    # ############################################################################
+    def get_cli_entry_point(self, completion_index: bool = True) -> str:
+        """
+        the function which the console script runs, as "module:function" in the package : the completion index, the warm client or the cli
+        """
+        if completion_index and self.cli_completion_index:
+            return 'completion_index:main'
+        if self.cli_warm_server:
+            return 'warm_cli:main'
+        return f'{self.cli_module}:{self.cli_method}'
+
+    def setup_cli_module(self) -> None:
+        """
+        the optional parts of the cli module : package modules to import, global options of cli_main and their settings
+        """
+        l_imports: List[str] = list()
+        l_typing_imports: List[str] = ['Optional']
+        l_main_options: List[str] = list()
+        l_main_parameters: List[str] = list()
+        l_main_settings: List[str] = list()
+        l_commands: List[str] = list()
+        l_group_options: List[str] = list()
+
+        if self.async_main:
+            l_imports.append('aio_tools')
+            call_main = 'aio_tools.run({{PizzaCutter.main_module}}.main())'
+            # SIGINT and SIGTERM are handled by aio_tools.run()
+            set_signal_handlers = '# SIGINT and SIGTERM cancel the main task, see aio_tools.run()'
+        else:
+            call_main = '{{PizzaCutter.main_module}}.main()'
+            set_signal_handlers = '_set_signal_handlers()'
+
+        if self.process_pool:
+            l_imports.append('worker_pool')
+            l_main_options.append("@click.option('-j', '--jobs', type=click.IntRange(min=0), default=1, show_default=True, "
+                                  "help='number of worker processes, 0 = number of cpus')")
+            l_main_parameters.append('jobs: int = 1')
+            l_main_settings.append('worker_pool.config.jobs = jobs')
+            if self.process_pool_start_method:
+                l_main_settings.append(f"worker_pool.config.start_method = '{self.process_pool_start_method}'")
+
+        if self.queue_logging:
+            l_imports.append('log_setup')
+            l_main_options.append("@click.option('--log-level', type=click.Choice(log_setup.LOG_LEVELS, case_sensitive=False), default='WARNING', "
+                                  "show_default=True, help='the log level')")
+            l_main_options.append("@click.option('--log-sink', type=str, default='stderr', show_default=True, help=log_setup.LOG_SINKS_HELP)")
+            l_main_parameters.append("log_level: str = 'WARNING'")
+            l_main_parameters.append("log_sink: str = 'stderr'")
+            l_main_settings.append('log_setup.setup_logging(level=log_level, sink=log_sink)')
+
+        if self.app_config:
+            l_imports.append('config_loader')
+            l_typing_imports.append('Tuple')
+            l_main_options.append("@click.option('--set', 'config_overrides', type=str, multiple=True, metavar='KEY=VALUE', "
+                                  "help='override a setting of the configuration, see config_loader.py')")
+            l_main_parameters.append('config_overrides: Tuple[str, ...] = ()')
+            l_main_settings.append('config_loader.config.overrides = config_loader.parse_overrides(config_overrides)')
+
+        if self.disk_cache:
+            l_imports.append('disk_cache')
+            l_main_options.append("@click.option('--no-cache', is_flag=True, help='do not use the disk cache')")
+            l_main_options.append("@click.option('--clear-cache', is_flag=True, help='clear the disk cache before the run')")
+            l_main_options.append("@click.option('--cache-stats', is_flag=True, help='print the hits and misses of the disk cache at exit')")
+            l_main_parameters.append('no_cache: bool = False')
+            l_main_parameters.append('clear_cache: bool = False')
+            l_main_parameters.append('cache_stats: bool = False')
+            l_main_settings.append('disk_cache.setup(bypass=no_cache, clear_cache=clear_cache, report_stats=cache_stats)')
+
+        if self.cli_batch:
+            l_imports.append('batch_io')
+            l_commands.append('# the subcommand "batch COMMAND" runs COMMAND for every record from stdin, see batch_io.py\n'
+                              'batch_io.add_batch_command(cli_main, context_settings=CLICK_CONTEXT_SETTINGS, fatal_exceptions=(SigIntError, SigTermError))')
+
+        if self.cli_plugins:
+            l_imports.append('plugins')
+            l_group_options.append('cls=plugins.PluginGroup')
+            l_commands.append("@cli_main.command('plugins', context_settings=CLICK_CONTEXT_SETTINGS)      # type: ignore\n"
+                              'def cli_plugins() -> None:\n'
+                              '    """ list the plugin commands, see plugins.py """\n'
+                              "    print('\\n'.join(plugins.get_plugin_info()))")
+
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.imports}}'] = '\n    '.join(f'from . import {module}' for module in l_imports)
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.typing_imports}}'] = ', '.join(l_typing_imports)
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.imports_doctest}}'] = \
+            '\n    '.join(f'import {module}'.ljust(40) + '# type: ignore  # pragma: no cover' for module in l_imports)
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.group_options}}'] = ''.join(f', {option}' for option in l_group_options)
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.main_options}}'] = '\n'.join(l_main_options)
+        main_parameters = ''.join(f', {parameter}' for parameter in l_main_parameters)
+        if len(f'def cli_main(traceback: Optional[bool] = None{main_parameters}) -> None:') > 160:
+            # one parameter per line, aligned after "def cli_main("
+            main_parameters = ''.join(f',\n{" " * 13}{parameter}' for parameter in l_main_parameters)
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.main_parameters}}'] = main_parameters
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.main_settings}}'] = '\n    '.join(l_main_settings)
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.call_main}}'] = call_main
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.set_signal_handlers}}'] = set_signal_handlers
+        self.pizza_cutter_patterns['{{PizzaCutter.cli_module.commands}}'] = ''.join(f'\n\n\n{command}' for command in l_commands)[1:]
+        self.pizza_cutter_patterns['{{PizzaCutter.completion_index.cli_entry_point}}'] = self.get_cli_entry_point(completion_index=False)
 
     # ############################################################################
     # pytest settings
@@ -685,6 +1031,8 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         self.pizza_cutter_patterns['{{PizzaCutter.gha.do_coverage_upload_codecov}}'] = str(self.coverage_upload_codecov)
         self.pizza_cutter_patterns['{{PizzaCutter.gha.do_coverage_upload_code_climate}}'] = str(self.coverage_upload_code_climate)
         self.pizza_cutter_patterns['{{PizzaCutter.testscript.do_coverage}}'] = str(self.coverage_do_local_testscript)
+        self.pizza_cutter_patterns['{{PizzaCutter.coverage_core}}'] = self.coverage_core
+        self.pizza_cutter_patterns['{{PizzaCutter.testscript.coverage_every_nth_iteration}}'] = str(max(self.coverage_testloop_every_nth_iteration, 1))
 
         if self.coverage_do_local_testscript:
             # coverage_option = '--cov={package_name} --cov-config=.coveragerc'.format(package_name=self.package_name)
@@ -782,16 +1130,29 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
     # github_actions Linux Matrix settings
     # ############################################################################
     def setup_gha_linux_tests(self) -> None:
+        # the same matrix for "testing_tools.py matrix", which runs the cells locally
+        l_testscript_linux_test_matrix: List[str] = list()
+        for matrix_item in self.gha_linux_test_matrix:
+            d_cell = dict(python_version=matrix_item.interpreter_version, build=matrix_item.build,
+                          mypy_test=matrix_item.mypy_test and self.mypy_do_tests_in_local_testscript, do_setup_install=matrix_item.do_setup_install,
+                          do_setup_install_test=matrix_item.do_setup_install_test, do_cli_test=matrix_item.do_cli_test)
+            if matrix_item.free_threaded:
+                d_cell['free_threaded'] = True
+            l_testscript_linux_test_matrix.append(f'    {d_cell},\n')
+        self.pizza_cutter_patterns['{{PizzaCutter.testscript.linux_test_matrix}}'] = '[\n' + ''.join(l_testscript_linux_test_matrix) + ']'
+
         if not self.gha_linux_tests:
             self.pizza_cutter_patterns['{{PizzaCutter.gha.linux.tests}}'] = ''
         else:
             l_gha_linux_tests: List[str] = list()
             for matrix_item in self.gha_linux_test_matrix:
                 mypy_test = matrix_item.mypy_test and self.mypy_do_tests_in_gha
+                # PYTHON_GIL=0 keeps the GIL disabled, even if an extension module is not marked as free-threading safe
+                free_threaded_env = '              PYTHON_GIL: "0"\n' if matrix_item.free_threaded else ''
                 gha_linux_matrix_item = \
                     f"""
           - os: ubuntu-latest
-            python-version: "{matrix_item.python_version}"
+            python-version: "{matrix_item.interpreter_version}"
             env:
               BUILD_DOCS: "{matrix_item.build_docs}"
               BUILD: "{matrix_item.build}"  
@@ -800,7 +1161,8 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
               DO_SETUP_INSTALL: "{matrix_item.do_setup_install}"
               DO_SETUP_INSTALL_TEST: "{matrix_item.do_setup_install_test}"
               DO_CLI_TEST: "{matrix_item.do_cli_test}"
-"""
+              THREAD_STRESS: "{matrix_item.free_threaded}"
+{free_threaded_env}"""
 
                 l_gha_linux_tests.append(gha_linux_matrix_item)
 
@@ -975,36 +1337,169 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
 # Hooks
 # #############################################################################################################################################################
     def pizza_cutter_hook_before_build(self):
-        pass
+        # the optional files without OPTIONAL_FILE_HEADER are written by hand - they are restored after the template is copied
+        self.d_hand_written_optional_files = {path_optional_file: path_optional_file.read_bytes() for path_optional_file in self.get_optional_files()
+                                              if path_optional_file.is_file() and not is_optional_template_file(path_optional_file)}
 
     def pizza_cutter_hook_after_build(self):
+        """
+        the hook is a small graph of named steps - each step starts as soon as the steps it requires are finished.
+        the cli help and the README are only created again if their inputs or outputs changed since the last build,
+        the state is kept in <project_dir>/.pizzacutter_hook_state.json
+        """
+        path_cli_help_rst_file = self.path_project_dir / self.docs_dir / 'commandline_help.rst'
 
+        l_hook_steps = [
+            HookStep('check_jupyter_file', self.hook_check_jupyter_file),
+            HookStep('typed_marker', self.hook_typed_marker),
+            HookStep('remove_optional_files', self.hook_remove_optional_files),
+            HookStep('remove_github_workflow', self.hook_remove_github_workflow),
+            # the help subprocess imports the package - so the package needs to be complete
+            HookStep('commandline_help', self.hook_commandline_help,
+                     requires=('typed_marker', 'remove_optional_files'),
+                     inputs=(self.path_package_dir, ),
+                     outputs=(path_cli_help_rst_file, ),
+                     parameters=f'{self.create_cli_file} {self.shell_command} {sys.executable}'),
+            # the README includes the cli help, the docs, the main module, the requirements and the changelog
+            HookStep('readme', self.hook_readme,
+                     requires=('commandline_help', ),
+                     inputs=(self.path_project_dir / self.docs_dir,
+                             self.path_package_dir / (self.main_module + '.py'),
+                             self.path_project_dir / 'requirements.txt',
+                             self.path_project_dir / 'CHANGES.rst'),
+                     outputs=(self.path_project_dir / 'README.rst', )),
+            # black rewrites the modules which are imported by the help subprocess and included in the README
+            HookStep('black', self.hook_black,
+                     requires=('remove_optional_files', 'readme')),
+            # the stubs are generated from the final sources
+            HookStep('stubs', self.hook_stubs,
+                     requires=('black', ),
+                     inputs=(self.path_package_dir, ),
+                     parameters=f'{self.is_typed_package} {self.is_typed_package_generate_stubs} {sys.executable}'),
+            # the completion index subprocess imports the cli from the final sources
+            HookStep('completion_index', self.hook_completion_index,
+                     requires=('stubs', ),
+                     inputs=(self.path_package_dir, ),
+                     outputs=(self.path_package_dir / 'completion_index.json', ),
+                     parameters=f'{self.create_cli_file} {self.cli_completion_index} {self.shell_command} {sys.executable}'),
+        ]
+        run_hook_steps(l_hook_steps=l_hook_steps, path_state_file=self.path_project_dir / '.pizzacutter_hook_state.json')
+
+    def hook_check_jupyter_file(self) -> None:
         # check if the jupyter file is present if selected jupyter
         if self.docs_badges_with_jupiter:
             path_jupyter_file = (pathlib.Path(self.pizza_cutter_path_target_dir) / self.project_dir / self.package_name).with_suffix('.ipynb')
             if not path_jupyter_file.is_file():
                 logger.warning('You selected Binder (Jupyter) Badge, but the Jupyter File is not present : "{}"'.format(path_jupyter_file))
 
+    def hook_typed_marker(self) -> None:
         # create the marker file for typed packages
         if self.is_typed_package:
             (self.path_package_dir / 'py.typed').touch(exist_ok=True)
         else:
             (self.path_package_dir / 'py.typed').unlink(missing_ok=True)
 
-        # create documentation
-        import rst_include
+    def get_optional_files(self) -> Dict[pathlib.Path, bool]:
+        """ the optional modules and benchmarks, and if their option is set - they start with OPTIONAL_FILE_HEADER """
+        return {
+            self.path_package_dir / 'aio_tools.py': self.async_main,
+            # the directories of the user, for the modules which cache files
+            self.path_package_dir / 'user_dirs.py': self.app_config or self.disk_cache or (self.create_cli_file and self.cli_plugins),
+            self.path_package_dir / 'worker_pool.py': self.process_pool,
+            self.path_package_dir / 'log_setup.py': self.queue_logging,
+            self.path_project_dir / 'tests/benchmarks/bench_log_setup.py': self.queue_logging,
+            self.path_package_dir / 'config_loader.py': self.app_config,
+            self.path_project_dir / 'tests/benchmarks/bench_config_loader.py': self.app_config,
+            self.path_package_dir / 'metrics.py': self.metrics,
+            self.path_project_dir / 'tests/benchmarks/bench_metrics.py': self.metrics,
+            self.path_project_dir / 'tests/test_thread_stress.py': self.free_threading,
+            self.path_project_dir / 'tests/benchmarks/bench_free_threading.py': self.free_threading,
+            self.path_package_dir / 'disk_cache.py': self.disk_cache,
+            self.path_project_dir / 'tests/benchmarks/bench_disk_cache.py': self.disk_cache,
+            # the setup.py of the mypyc build - a setup.py written by hand is kept as it is
+            self.path_project_dir / 'setup.py': self.compile_with_mypyc,
+            self.path_project_dir / 'tests/benchmarks/bench_mypyc.py': self.compile_with_mypyc,
+            self.path_package_dir / 'batch_io.py': self.create_cli_file and self.cli_batch,
+            self.path_project_dir / 'tests/benchmarks/bench_batch.py': self.create_cli_file and self.cli_batch,
+            self.path_package_dir / 'completion_index.py': self.create_cli_file and self.cli_completion_index,
+            self.path_project_dir / 'tests/benchmarks/bench_completion.py': self.create_cli_file and self.cli_completion_index,
+            self.path_package_dir / 'plugins.py': self.create_cli_file and self.cli_plugins,
+            self.path_package_dir / 'plugin_index.py': self.create_cli_file and self.cli_plugins,
+            self.path_project_dir / 'tests/benchmarks/bench_plugins.py': self.create_cli_file and self.cli_plugins,
+            self.path_package_dir / 'warm_cli.py': self.create_cli_file and self.cli_warm_server,
+            self.path_project_dir / 'tests/benchmarks/bench_warm_cli.py': self.create_cli_file and self.cli_warm_server,
+            self.path_project_dir / 'stubtest_allowlist.txt': self.is_typed_package and self.is_typed_package_generate_stubs,
+        }
+
+    def hook_remove_optional_files(self) -> None:
+        # the files of the cli are only kept if the option is set
+        if not self.create_cli_file:
+            (self.path_package_dir / (self.cli_module + '.py')).unlink(missing_ok=True)
+            (self.path_project_dir / 'tests/test_cli.py').unlink(missing_ok=True)
+
+        # the optional files written by hand are kept as they are, the optional files of the template only if the option is set
+        for path_optional_file, optional_file_content in self.d_hand_written_optional_files.items():
+            path_optional_file.write_bytes(optional_file_content)
+        for path_optional_file, keep_optional_file in self.get_optional_files().items():
+            if not keep_optional_file and is_optional_template_file(path_optional_file):
+                path_optional_file.unlink()
+        path_benchmarks_dir = self.path_project_dir / 'tests/benchmarks'
+        if path_benchmarks_dir.is_dir() and not any(path_benchmarks_dir.iterdir()):
+            path_benchmarks_dir.rmdir()
+
+    def hook_remove_github_workflow(self) -> None:
+        if self.add_github_actions is False:
+            (self.path_project_dir / '.github/workflows/python-package.yml').unlink(missing_ok=True)
 
-        path_cli_module = self.path_package_dir / (self.cli_module + '.py')
+    def hook_stubs(self) -> None:
+        # generate the stubs of the public api - the stubs written by an earlier build are refreshed or deleted, hand written stubs are kept
+        l_path_generated_stubs = [path_stub for path_stub in self.path_package_dir.rglob('*.pyi')
+                                  if path_stub.read_text(encoding='utf-8').startswith(STUBGEN_HEADER)]
+        for path_generated_stub in l_path_generated_stubs:
+            path_generated_stub.unlink()
+        if not (self.is_typed_package and self.is_typed_package_generate_stubs):
+            return
+        if importlib.util.find_spec('mypy') is None:
+            logger.warning('mypy is not installed, the stubs (*.pyi) are not generated')
+            return
+
+        with tempfile.TemporaryDirectory() as stubs_dir:
+            # mypy is compiled with mypyc, "python -m mypy.stubgen" does not work
+            command = [sys.executable, '-c', 'from mypy.stubgen import main; main()', '--no-import', '--export-less', '--quiet',
+                       '--output', stubs_dir, str(self.path_package_dir)]
+            subprocess.run(command, cwd=self.path_project_dir, check=True)
+            path_stubs_package_dir = pathlib.Path(stubs_dir) / self.path_package_dir.name
+            for path_stub in path_stubs_package_dir.rglob('*.pyi'):
+                path_target_stub = self.path_package_dir / path_stub.relative_to(path_stubs_package_dir)
+                if path_target_stub.is_file():
+                    logger.info(f'keeping the hand written stub "{path_target_stub}"')
+                    continue
+                path_target_stub.write_text(STUBGEN_HEADER + path_stub.read_text(encoding='utf-8'), encoding='utf-8')
+
+    def hook_completion_index(self) -> None:
+        # the static completion index of cli_main - the console script completes from it, without importing the cli
+        path_index_file = self.path_package_dir / 'completion_index.json'
+        if not (self.create_cli_file and self.cli_completion_index):
+            path_index_file.unlink(missing_ok=True)
+            return
+        command = [sys.executable, str(self.path_package_dir / 'completion_index.py'), 'build']
+        result = subprocess.run(command, cwd=self.path_project_dir, capture_output=True, text=True)
+        if result.returncode:
+            logger.warning(f'can not create the completion index "{path_index_file}", the completion is done by click :\n{result.stderr}')
+
+    def hook_commandline_help(self) -> None:
         path_cli_help_rst_file = self.path_project_dir / self.docs_dir / 'commandline_help.rst'
         if self.create_cli_file:
-            self.create_commandline_help_file(path_cli_module=path_cli_module,
+            self.create_commandline_help_file(path_cli_module=self.path_package_dir / (self.cli_module + '.py'),
                                               path_cli_help_rst_file=path_cli_help_rst_file,
                                               registered_shell_command=self.shell_command)
         else:
-            path_cli_module.unlink(missing_ok=True)
-            (self.path_project_dir / 'tests/test_cli.py').unlink(missing_ok=True)
             path_cli_help_rst_file.write_text('there are no cli commands', encoding='utf-8')
 
+    def hook_readme(self) -> None:
+        # create documentation
+        import rst_include
+
         path_rst_source_file = self.path_project_dir / self.docs_dir / 'README_template.rst'
         path_rst_target_file = self.path_project_dir / 'README.rst'
         rst_include.lib_main.rst_inc(source=path_rst_source_file, target=path_rst_target_file)
@@ -1013,6 +1508,7 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
         text = text.replace('{{\\PizzaCutter', '{{PizzaCutter')
         path_rst_target_file.write_text(text)
 
+    def hook_black(self) -> None:
         # black files if needed
         # we guess that if setup.py exists, we are in the final package
         path_setup_py = self.path_project_dir / 'setup.py'
@@ -1027,9 +1523,6 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
             command = f'black {path_setup_py}'
             subprocess.run(command, shell=True)
 
-        if self.add_github_actions is False:
-            (self.path_project_dir / '.github/workflows/python-package.yml').unlink(missing_ok=True)
-
     # TODO: make external module in order to parse click help for sub commands / groups
     def create_commandline_help_file(self, path_cli_module: pathlib.Path, path_cli_help_rst_file: pathlib.Path, registered_shell_command: str) -> None:
         """
@@ -1125,6 +1618,30 @@ class PizzaCutterConfig(PizzaCutterConfigBase):
             path_temp_file.rename(path_source_file)
 
 
+def get_build_datetime(source_date_epoch: Optional[int] = None) -> datetime.datetime:
+    """
+    the clock of the build, in UTC : source_date_epoch, otherwise the environment variable SOURCE_DATE_EPOCH
+    (see https://reproducible-builds.org/specs/source-date-epoch/), otherwise the current time
+
+    >>> source_date_epoch_save = os.environ.pop('SOURCE_DATE_EPOCH', None)
+    >>> os.environ['SOURCE_DATE_EPOCH'] = '1600000000'
+    >>> get_build_datetime().isoformat()
+    '2020-09-13T12:26:40+00:00'
+    >>> get_build_datetime(1700000000).isoformat()
+    '2023-11-14T22:13:20+00:00'
+
+    >>> del os.environ['SOURCE_DATE_EPOCH']
+    >>> if source_date_epoch_save is not None:
+    ...     os.environ['SOURCE_DATE_EPOCH'] = source_date_epoch_save
+    """
+    source_date_epoch_env = os.environ.get('SOURCE_DATE_EPOCH', '').strip()
+    if source_date_epoch is None and source_date_epoch_env:
+        source_date_epoch = int(source_date_epoch_env)
+    if source_date_epoch is None:
+        return datetime.datetime.now(datetime.timezone.utc)
+    return datetime.datetime.fromtimestamp(source_date_epoch, datetime.timezone.utc)
+
+
 def remove_from_list(a_list, item) -> None:
     """
     remove an item from a list without error if it is not there
@@ -1135,115 +1652,668 @@ def remove_from_list(a_list, item) -> None:
         pass
 
 
-def convert_list_to_toml(l_data: List[str], quoting_char: str = '"') -> str:
+def get_requirements_from_file(path_requirements: pathlib.Path) -> List[str]:
+    l_requirements = list()
+    try:
+        with open(str(path_requirements), mode="r") as requirements_file:
+            for line in requirements_file:
+                line_data = get_line_data(line)
+                if line_data:
+                    l_requirements.append(line_data)
+    except FileNotFoundError:
+        pass
+    return l_requirements
+
+
+def get_line_data(line: str) -> str:
+    """
+    >>> get_line_data('# comment')
+    ''
+    >>> get_line_data('test # comment')
+    'test'
+    """
+    line = line.strip()
+    if "#" in line:
+        line = line.split("#", 1)[0].strip()
+    return line
+
+
+# #############################################################################################################################################################
+# Hook Steps
+# #############################################################################################################################################################
+
+
+# the first line of the stubs written by the stubs hook step - delete it, to keep a stub as it is
+STUBGEN_HEADER = '# generated by stubgen on every build of PizzaCutter - delete this line to keep the stub as it is\n'
+# the first line of the optional files of the template - delete it, to keep the file as it is, even if its option is not set
+OPTIONAL_FILE_HEADER = '# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is\n'
+
+
+def is_generated_file(path_file: pathlib.Path) -> bool:
+    """
+    True for the files which the hook steps write into the package : the stubs with STUBGEN_HEADER and the completion index
+
+    >>> is_generated_file(pathlib.Path('completion_index.json'))
+    True
+    >>> is_generated_file(pathlib.Path(__file__))
+    False
+    """
+    if path_file.name == 'completion_index.json':
+        return True
+    if path_file.suffix != '.pyi':
+        return False
+    header = STUBGEN_HEADER.encode('utf-8')
+    with open(path_file, 'rb') as f_stub:
+        return f_stub.read(len(header)) == header
+
+
+def is_optional_template_file(path_file: pathlib.Path) -> bool:
     """
-    >>> convert_list_to_toml(['a', 'b', 'c'])
-    '[\\n    "a",\\n    "b",\\n    "c",\\n]'
-    >>> convert_list_to_toml(['a', 'b', 'c"test"'])
-    '[\\n    "a",\\n    "b",\\n    "c\\'test\\'",\\n]'
+    True if the file was copied from the template - it starts with OPTIONAL_FILE_HEADER. files written by hand are never overwritten or removed
 
+    >>> is_optional_template_file(pathlib.Path('does_not_exist.py'))
+    False
+    >>> is_optional_template_file(pathlib.Path(__file__))
+    False
     """
-    my_str = "[\n"
-    for str_data in l_data:
-        clean_quotes_str_data = clean_quotes(str_data=str_data, quoting_char=quoting_char)
-        my_str = my_str + f'    {quoting_char}{clean_quotes_str_data}{quoting_char},\n'
-    my_str = my_str + "]"
-    return my_str
+    header = OPTIONAL_FILE_HEADER.encode('utf-8')
+    try:
+        with open(path_file, 'rb') as f_optional_file:
+            return f_optional_file.read(len(header)) == header
+    except OSError:
+        return False
+
+
+class HookStep(object):
+    def __init__(self, name: str,
+                 function: Callable[[], None],
+                 requires: Tuple[str, ...] = (),
+                 inputs: Tuple[pathlib.Path, ...] = (),
+                 outputs: Tuple[pathlib.Path, ...] = (),
+                 parameters: str = ''
+                 ):
+        """
+        a named step of the after build hook
+        requires   : the names of the steps which need to be finished before this step starts
+        inputs     : files or directories which are read by the step - steps without inputs are always run
+        outputs    : files or directories which are written by the step
+        parameters : everything else the result depends on - a step is skipped if the parameters, inputs and outputs
+                     did not change since its last successful run
+        """
+        self.name = name
+        self.function = function
+        self.requires = requires
+        self.inputs = inputs
+        self.outputs = outputs
+        self.parameters = parameters
 
 
-def clean_quotes(str_data: str, quoting_char: str) -> str:
+def run_hook_steps(l_hook_steps: List[HookStep], path_state_file: Optional[pathlib.Path] = None) -> None:
     """
-    Ersetzt <'> mit <"> oder umgekehrt damit keine Kollision mit quoting_char auftritt:
-    >>> assert clean_quotes('test', quoting_char='"') == 'test'
-    >>> assert clean_quotes('test', quoting_char="'") == 'test'
-    >>> assert clean_quotes('test "par"', quoting_char='"') == "test 'par'"
-    >>> assert clean_quotes('test "par"', quoting_char="'") == 'test "par"'
-    >>> assert clean_quotes("test 'par'", quoting_char='"') == "test 'par'"
-    >>> assert clean_quotes("test 'par'", quoting_char="'") == 'test "par"'
-    >>> assert clean_quotes("test 'par'", quoting_char="") == "test 'par'"
-    >>> clean_quotes("test 'par'", quoting_char="x")
+    runs the steps on a thread pool, each step as soon as the steps it requires are finished.
+    if a step fails, no further steps are started, the running steps are finished and the error is raised.
+    the fingerprints of the successful steps are saved in the state file, to skip them next time if nothing changed.
+
+    >>> l_order = list()
+    >>> run_hook_steps([HookStep('b', lambda: l_order.append('b'), requires=('a', )), HookStep('a', lambda: l_order.append('a'))])
+    >>> l_order
+    ['a', 'b']
+
+    >>> run_hook_steps([HookStep('a', lambda: None, requires=('b', )), HookStep('b', lambda: None, requires=('a', ))])
     Traceback (most recent call last):
         ...
-    NotImplementedError: Quoting Char <x> is not supported
+    ValueError: hook steps with circular requirements: a, b
+
     """
-    if quoting_char == '"':
-        replacement_char = "'"
-    elif quoting_char == "'":
-        replacement_char = '"'
-    elif quoting_char == "":
-        return str_data
-    else:
-        raise NotImplementedError(f'Quoting Char <{quoting_char}> is not supported')
+    d_hook_steps = {hook_step.name: hook_step for hook_step in l_hook_steps}
+    validate_hook_steps(l_hook_steps)
+    d_state = load_hook_state(path_state_file)
+    d_remaining_requires = {hook_step.name: set(hook_step.requires) for hook_step in l_hook_steps}
+    d_running: Dict['concurrent.futures.Future[Tuple[float, bool, str]]', str] = dict()
+
+    time_start = time.perf_counter()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(l_hook_steps)), thread_name_prefix='pizzacutter_hook') as executor:
+            while d_remaining_requires or d_running:
+                for name in [name for name, requires in d_remaining_requires.items() if not requires]:
+                    del d_remaining_requires[name]
+                    # the fingerprint is only saved again if the step succeeds
+                    d_running[executor.submit(run_hook_step, d_hook_steps[name], d_state.pop(name, ''))] = name
+
+                done, _ = concurrent.futures.wait(d_running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = d_running.pop(future)
+                    # raises the error of the step - leaving the executor waits for the running steps
+                    duration, skipped, fingerprint = future.result()
+                    if fingerprint:
+                        d_state[name] = fingerprint
+                    logger.info(f'hook step {name}: {"skipped, nothing changed" if skipped else f"{duration * 1000:.1f} ms"}')
+                    for requires in d_remaining_requires.values():
+                        requires.discard(name)
+    finally:
+        save_hook_state(path_state_file, d_state)
+    logger.info(f'hook steps: {len(l_hook_steps)} steps in {(time.perf_counter() - time_start) * 1000:.1f} ms')
+
+
+def run_hook_step(hook_step: HookStep, last_fingerprint: str) -> Tuple[float, bool, str]:
+    """
+    returns the duration, if the step was skipped, and the fingerprint after the step - the fingerprint is empty for steps without inputs
+    """
+    if hook_step.inputs and last_fingerprint and last_fingerprint == get_hook_step_fingerprint(hook_step):
+        return 0.0, True, last_fingerprint
+    time_start = time.perf_counter()
+    hook_step.function()
+    duration = time.perf_counter() - time_start
+    fingerprint = get_hook_step_fingerprint(hook_step) if hook_step.inputs else ''
+    return duration, False, fingerprint
 
-    if quoting_char in str_data:
-        str_data = str_data.replace(quoting_char, replacement_char)
-    return str_data
 
+def validate_hook_steps(l_hook_steps: List[HookStep]) -> None:
+    """
+    >>> validate_hook_steps([HookStep('a', lambda: None), HookStep('a', lambda: None)])
+    Traceback (most recent call last):
+        ...
+    ValueError: hook step "a" is defined more than once
+
+    >>> validate_hook_steps([HookStep('a', lambda: None, requires=('b', ))])
+    Traceback (most recent call last):
+        ...
+    ValueError: hook step "a" requires the unknown step "b"
 
-def convert_list_of_dict_to_toml(ldict_data: List[Dict[str, str]]) -> str:
     """
-    >>> convert_list_of_dict_to_toml([{'a':'1', 'b':'2'}])
-    '[\\n    {a = "1", b = "2"},\\n]'
-    >>> convert_list_of_dict_to_toml([{"a":"1", "b":"2"}])
-    '[\\n    {a = "1", b = "2"},\\n]'
-    >>> convert_list_of_dict_to_toml([{"a":"1", "b":"2"}, {"c":"3", "d":"3"}])
-    '[\\n    {a = "1", b = "2"},\\n    {c = "3", d = "3"},\\n]'
+    d_hook_steps: Dict[str, HookStep] = dict()
+    for hook_step in l_hook_steps:
+        if hook_step.name in d_hook_steps:
+            raise ValueError(f'hook step "{hook_step.name}" is defined more than once')
+        d_hook_steps[hook_step.name] = hook_step
+    for hook_step in l_hook_steps:
+        for required_name in hook_step.requires:
+            if required_name not in d_hook_steps:
+                raise ValueError(f'hook step "{hook_step.name}" requires the unknown step "{required_name}"')
+
+    # remove the steps without open requirements, until nothing is left - what is left then, is part of a cycle
+    d_remaining_requires = {hook_step.name: set(hook_step.requires) for hook_step in l_hook_steps}
+    while True:
+        l_ready = [name for name, requires in d_remaining_requires.items() if not requires]
+        if not l_ready:
+            break
+        for name in l_ready:
+            del d_remaining_requires[name]
+        for requires in d_remaining_requires.values():
+            requires.difference_update(l_ready)
+    if d_remaining_requires:
+        raise ValueError(f'hook steps with circular requirements: {", ".join(sorted(d_remaining_requires))}')
+
+
+def get_hook_step_fingerprint(hook_step: HookStep) -> str:
     """
-    my_list = list()
-    for dict_data in ldict_data:
-        my_list.append(convert_dict_to_toml(dict_data))
-    return convert_list_to_toml(l_data=my_list, quoting_char='')
+    the sha256 of the parameters, and the paths and contents of all input and output files (directories recursively, without __pycache__
+    and without the files generated by the hook steps, see is_generated_file - otherwise the fingerprints of the next build would differ).
+    the paths are hashed by name, below a directory relative to it - the fingerprint does not depend on the location of the project
 
+    >>> hook_step = HookStep('a', lambda: None, inputs=(pathlib.Path('does_not_exist'), ), parameters='some parameter')
+    >>> assert get_hook_step_fingerprint(hook_step) == get_hook_step_fingerprint(hook_step)
+    >>> assert get_hook_step_fingerprint(hook_step) != get_hook_step_fingerprint(HookStep('a', lambda: None, inputs=hook_step.inputs))
 
-def convert_dict_to_toml(dict_data: Dict[str, str]) -> str:
     """
-    >>> convert_dict_to_toml({'a':'1', 'b':'2'})
-    '{a = "1", b = "2"}'
+    hasher = hashlib.sha256(hook_step.parameters.encode('utf-8'))
+    for path in hook_step.inputs + hook_step.outputs:
+        hasher.update(b'\0' + path.name.encode('utf-8'))
+        if path.is_dir():
+            l_paths_files = sorted(path_file for path_file in path.rglob('*')
+                                   if path_file.is_file() and '__pycache__' not in path_file.parts and not is_generated_file(path_file))
+        elif path.is_file():
+            l_paths_files = [path]
+        else:
+            hasher.update(b'\0missing')
+            l_paths_files = list()
+        for path_file in l_paths_files:
+            relative_path = path_file.relative_to(path).as_posix() if path_file != path else ''
+            hasher.update(b'\0' + relative_path.encode('utf-8') + b'\0' + hashlib.sha256(path_file.read_bytes()).digest())
+    return hasher.hexdigest()
+
+
+def load_hook_state(path_state_file: Optional[pathlib.Path]) -> Dict[str, str]:
+    if path_state_file is None or not path_state_file.is_file():
+        return dict()
+    try:
+        d_state: Dict[str, str] = json.loads(path_state_file.read_text(encoding='utf-8'))
+    except ValueError:
+        logger.warning(f'can not read the hook state "{path_state_file}", running all hook steps')
+        return dict()
+    return d_state
+
+
+def save_hook_state(path_state_file: Optional[pathlib.Path], d_state: Dict[str, str]) -> None:
+    if path_state_file is not None:
+        path_state_file.write_text(json.dumps(d_state, indent=4, sort_keys=True) + '\n', encoding='utf-8')
+
+
+# #############################################################################################################################################################
+# Concurrent Renderer
+# #############################################################################################################################################################
+
+
+class PizzaCutterConcurrent(PizzaCutter):
     """
-    my_str = toml.dumps(dict_data).replace('\n', ', ').strip().rstrip(',')
-    return f'{{{my_str}}}'
+    renders the files of one project on a bounded thread pool, instead of one after another.
+    each file is a small blocking read, substitute and write - on network filesystems and cold caches the build is latency bound.
 
+    - directories are created first, in sorted order, before any file inside of them is written
+    - skip checks (no_copy, outside write, overwrite, no_overwrite, dry_run) are evaluated sequentially, before any file is written
+    - the jobs are collected in the sorted order of the template objects, and errors are raised in that order
+    - the number of threads is taken from conf.pizza_cutter_render_workers
+    """
 
-def get_requirements_from_file(path_requirements: pathlib.Path) -> List[str]:
-    l_requirements = list()
+    def copy_files_from_template_to_project(self) -> None:
+        l_copy_jobs: List[Tuple[pathlib.Path, pathlib.Path]] = list()
+
+        for path_source_object in self.get_path_template_objects():
+
+            path_target_object_resolved = self.get_path_target_object(path_source_object=path_source_object)
+
+            if self.do_not_copy(path_source_object):
+                continue
+
+            if self.skip_write_outside_project_folder(path_target_object_resolved):
+                continue
+
+            if self.skip_overwrite(path_source_object, path_target_object_resolved):
+                continue
+
+            if self.dry_run:
+                continue
+
+            if path_source_object.is_dir():
+                path_target_object_resolved.mkdir(parents=True, exist_ok=True)
+            else:
+                l_copy_jobs.append((path_source_object, path_target_object_resolved))
+
+        # the parent directories need to exist before the files are written concurrently
+        for path_target_parent_dir in sorted({path_target_object.parent for _, path_target_object in l_copy_jobs}):
+            path_target_parent_dir.mkdir(parents=True, exist_ok=True)
+
+        self.run_timed_jobs(stage='copy', job=self.copy_file, l_job_args=l_copy_jobs)
+
+    def replace_patterns_in_files(self) -> None:
+        # dict.fromkeys : unique target files, in the sorted order of the template objects
+        d_render_jobs: Dict[pathlib.Path, None] = dict()
+
+        for path_source_object in self.get_path_template_objects():
+
+            path_target_object = self.get_path_target_object(path_source_object=path_source_object)
+
+            if self.do_not_copy(path_source_object):
+                continue
+
+            if self.skip_write_outside_project_folder(path_target_object, quiet=True):
+                continue
+
+            if path_target_object.is_file():
+                d_render_jobs[path_target_object] = None
+
+        self.run_timed_jobs(stage='render', job=self.render_file, l_job_args=[(path_target_object, ) for path_target_object in d_render_jobs])
+
+    @staticmethod
+    def copy_file(path_source_object: pathlib.Path, path_target_object: pathlib.Path) -> None:
+        # because sometime we receive "permission denied" when overwriting the file (weired)
+        path_target_object.unlink(missing_ok=True)
+        path_source_object.copy2(path_target_object)        # type: ignore  # pathlib3x
+
+    def render_file(self, path_target_object: pathlib.Path) -> None:
+        """
+        replaces the patterns in the target file - same as PizzaCutter.replace_patterns_in_file,
+        but without the shared self.file_stack, which is not thread safe (and only in preparation for file includes)
+        """
+        path_target_patterns_replaced = path_target_object.append_suffix('.PizzaCutter_Temp')      # type: ignore  # pathlib3x
+        with open(str(path_target_object), 'rb') as f_source:
+            with open(str(path_target_patterns_replaced), 'wb') as f_target:
+                for source_line in f_source:
+                    self.replace_patterns_in_source_line_and_write_to_target_file(path_target_object, source_line, f_target)
+        path_target_object.unlink()
+        path_target_patterns_replaced.rename(path_target_object)
+
+    def run_timed_jobs(self, stage: str, job: Callable[..., None], l_job_args: List[Tuple[Any, ...]]) -> None:
+        """
+        runs the jobs on the thread pool and reports the timing per file.
+        the results are collected in submission order, so the first error (in sorted file order) is raised
+        """
+
+        def timed_job(*job_args: Any) -> float:
+            time_start = time.perf_counter()
+            job(*job_args)
+            return time.perf_counter() - time_start
+
+        max_workers = max(1, int(self.conf.pizza_cutter_render_workers))
+        time_start_stage = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'pizzacutter_{stage}') as executor:
+            l_futures = [executor.submit(timed_job, *job_args) for job_args in l_job_args]
+            l_durations = [future.result() for future in l_futures]
+        duration_stage = time.perf_counter() - time_start_stage
+
+        if not self.quiet:
+            log_job_timings(stage=stage, l_paths=[job_args[-1] for job_args in l_job_args], l_durations=l_durations,
+                            max_workers=max_workers, duration_stage=duration_stage)
+
+
+def log_job_timings(stage: str, l_paths: List[pathlib.Path], l_durations: List[float], max_workers: int, duration_stage: float) -> None:
+    """
+    logs the distribution of the per file timings (info), and the timing of each file, slowest first (debug)
+
+    >>> log_job_timings('render', [pathlib.Path('a'), pathlib.Path('b')], [0.001, 0.003], max_workers=2, duration_stage=0.003)
+    >>> log_job_timings('render', [], [], max_workers=2, duration_stage=0.0)
+    """
+    if not l_durations:
+        return
+    l_sorted_durations = sorted(l_durations)
+    p95_duration = l_sorted_durations[min(len(l_sorted_durations) - 1, int(len(l_sorted_durations) * 0.95))]
+    logger.info(f'{stage}: {len(l_durations)} files with {max_workers} threads in {duration_stage * 1000:.1f} ms - per file: '
+                f'min {l_sorted_durations[0] * 1000:.2f} ms, median {statistics.median(l_sorted_durations) * 1000:.2f} ms, '
+                f'p95 {p95_duration * 1000:.2f} ms, max {l_sorted_durations[-1] * 1000:.2f} ms, sum {sum(l_durations) * 1000:.1f} ms')
+    for duration, path in sorted(zip(l_durations, l_paths), key=lambda item: (-item[0], str(item[1]))):
+        logger.debug(f'{stage}: {duration * 1000:8.2f} ms "{path}"')
+
+
+# #############################################################################################################################################################
+# Build Server
+# #############################################################################################################################################################
+
+
+class PizzaCutterWarm(PizzaCutterConcurrent):
+    """
+    the renderer of the build server - the template objects are kept in memory between the builds,
+    as long as no directory of the template tree changed (a new, deleted or renamed file changes the mtime of its directory)
+    """
+    # template dir : (signature of the template tree, template objects)
+    d_template_objects: Dict[str, Tuple[Tuple[Tuple[str, int], ...], List[pathlib.Path]]] = dict()
+
+    def get_path_template_objects(self) -> List[pathlib.Path]:      # type: ignore  # pathlib3x
+        signature = get_directory_tree_signature(self.get_path_template_subdirs_with_pattern())      # type: ignore  # pathlib3x
+        cached_signature, l_path_template_objects = self.d_template_objects.get(str(self.path_template_dir), (tuple(), list()))
+        if cached_signature != signature:
+            l_path_template_objects = list(super().get_path_template_objects())      # type: ignore  # pathlib3x
+            self.d_template_objects[str(self.path_template_dir)] = (signature, l_path_template_objects)
+        return list(l_path_template_objects)
+
+
+def get_directory_tree_signature(l_paths_root_dirs: List[pathlib.Path]) -> Tuple[Tuple[str, int], ...]:
+    """
+    the paths and modification times of all directories below the root directories
+
+    >>> assert get_directory_tree_signature([pathlib.Path(__file__).parent]) == get_directory_tree_signature([pathlib.Path(__file__).parent])
+    """
+    l_signature: List[Tuple[str, int]] = list()
+    for path_root_dir in l_paths_root_dirs:
+        for dir_path, _, _ in os.walk(str(path_root_dir)):
+            l_signature.append((dir_path, os.stat(dir_path).st_mtime_ns))
+    return tuple(l_signature)
+
+
+def build_warm(path_conf_file: pathlib.Path, path_template_dir: Optional[pathlib.Path], path_target_dir: pathlib.Path, dry_run: bool) -> None:
+    """
+    builds the project in this interpreter - pizzacutter adds the directory of the conf file to sys.path on every build,
+    so sys.path is restored afterwards, to keep it from growing in the build server
+    """
+    l_sys_path = list(sys.path)
     try:
-        with open(str(path_requirements), mode="r") as requirements_file:
-            for line in requirements_file:
-                line_data = get_line_data(line)
-                if line_data:
-                    l_requirements.append(line_data)
-    except FileNotFoundError:
-        pass
-    return l_requirements
+        pizza_cutter = PizzaCutterWarm(path_conf_file=path_conf_file,
+                                       path_template_dir=path_template_dir,
+                                       path_target_dir=path_target_dir,
+                                       dry_run=dry_run, allow_overwrite=True)
+        pizza_cutter.build()
+    finally:
+        sys.path[:] = l_sys_path
 
 
-def get_line_data(line: str) -> str:
+class BuildRequestHandler(socketserver.StreamRequestHandler):
     """
-    >>> get_line_data('# comment')
-    ''
-    >>> get_line_data('test # comment')
-    'test'
+    one request per connection - a json line {"command": "build", "conf_file": ..., "template_dir": ..., "target_dir": ..., "dry_run": ...},
+    {"command": "ping"} or {"command": "stop"}, the response is a json line {"ok": ..., "log": [[level, message], ...], "error": ...}
     """
-    line = line.strip()
-    if "#" in line:
-        line = line.split("#", 1)[0].strip()
-    return line
+
+    def handle(self) -> None:
+        # the build runs with the rights of the server - only for clients of the same user
+        try:
+            build_client.check_peer_uid(self.request)
+        except PermissionError as exc:
+            logger.warning(f'request refused: {exc}')
+            return
+        d_request = json.loads(self.rfile.readline())
+        if d_request.get('command') == 'ping':
+            self.send_response({'ok': True, 'log': [], 'error': ''})
+            return
+        if d_request.get('command') == 'stop':
+            self.send_response({'ok': True, 'log': [], 'error': ''})
+            # shutdown waits for serve_forever to return - so it can not be called from the thread which serves
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        log_collector = LogCollector()
+        logging.getLogger().addHandler(log_collector)
+        try:
+            build_warm(path_conf_file=pathlib.Path(d_request['conf_file']),
+                       path_template_dir=pathlib.Path(d_request['template_dir']) if d_request.get('template_dir') else None,
+                       path_target_dir=pathlib.Path(d_request['target_dir']),
+                       dry_run=bool(d_request.get('dry_run', False)))
+            d_response = {'ok': True, 'log': log_collector.l_records, 'error': ''}
+        except Exception:
+            d_response = {'ok': False, 'log': log_collector.l_records, 'error': traceback.format_exc()}
+        finally:
+            logging.getLogger().removeHandler(log_collector)
+        self.send_response(d_response)
+
+    def send_response(self, d_response: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(d_response).encode('utf-8') + b'\n')
+
+
+class LogCollector(logging.Handler):
+    """ collects the log records of a build, to send them to the client """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.l_records: List[Tuple[int, str]] = list()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.l_records.append((record.levelno, record.getMessage()))
+
+
+def serve_builds(path_socket: pathlib.Path) -> None:
+    """
+    runs the build server on the unix socket, until it gets the stop command, SIGINT or SIGTERM.
+    the modules of pizzacutter, the conf files and the hooks (rst_include) stay imported, and the template trees stay in memory.
+    the builds run one after another. build_client.py is the thin client, which only imports the standard library.
+    """
+    if path_socket.exists():
+        if build_client.request_build_server({'command': 'ping'}, path_socket) is not None:
+            raise RuntimeError(f'a build server is already listening on "{path_socket}"')
+        # stale socket of a build server which did not exit properly
+        path_socket.unlink()
+
+    try:
+        import rst_include      # noqa: F401  # imported by the after build hook
+    except ImportError:
+        logger.warning('can not import rst_include, the after build hook will fail')
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # the socket is created with mode 0600 (umask) before it listens - the default socket is also in the private directory of the user
+    umask = os.umask(0o177)
+    try:
+        build_server = socketserver.UnixStreamServer(str(path_socket), BuildRequestHandler)
+    finally:
+        os.umask(umask)
+    with build_server:
+        try:
+            logger.info(f'build server listening on "{path_socket}"')
+            build_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path_socket.unlink(missing_ok=True)
+    logger.info('build server stopped')
+
+
+def build(path_conf_file: pathlib.Path, path_template_dir: Optional[pathlib.Path], path_target_dir: pathlib.Path, dry_run: bool,
+          path_socket: pathlib.Path) -> None:
+    """
+    builds on the build server if it is listening - otherwise in this process
+    """
+    d_request = {'command': 'build', 'conf_file': str(path_conf_file), 'template_dir': str(path_template_dir) if path_template_dir else '',
+                 'target_dir': str(path_target_dir), 'dry_run': dry_run}
+    d_response = build_client.request_build_server(d_request, path_socket)
+    if d_response is None:
+        logger.info(f'no build server on "{path_socket}", building in process')
+        pizza_cutter = PizzaCutterConcurrent(path_conf_file=path_conf_file,
+                                             path_template_dir=path_template_dir,
+                                             path_target_dir=path_target_dir,
+                                             dry_run=dry_run, allow_overwrite=True)
+        pizza_cutter.build()
+        return
+
+    for level, message in d_response['log']:
+        logger.log(level, message)
+    if not d_response['ok']:
+        raise RuntimeError(f'the build on the build server failed:\n{d_response["error"]}')
+
+
+# #############################################################################################################################################################
+# Deterministic Build
+# #############################################################################################################################################################
+
+
+def get_tree_digests(path_root_dir: pathlib.Path) -> Dict[str, str]:
+    """
+    the sha256 of every file below the root directory (without __pycache__), by path relative to the root directory
+
+    >>> d_digests = get_tree_digests(pathlib.Path(__file__).parent)
+    >>> assert len(d_digests[pathlib.Path(__file__).name]) == 64
+    """
+    d_digests: Dict[str, str] = dict()
+    for path_file in sorted(path_root_dir.rglob('*')):
+        if path_file.is_file() and '__pycache__' not in path_file.parts:
+            d_digests[path_file.relative_to(path_root_dir).as_posix()] = hashlib.sha256(path_file.read_bytes()).hexdigest()
+    return d_digests
+
+
+def get_tree_differences(path_dir_1: pathlib.Path, path_dir_2: pathlib.Path) -> List[str]:
+    """
+    the relative paths of the files which are different, or only in one of the directories
+
+    >>> get_tree_differences(pathlib.Path(__file__).parent, pathlib.Path(__file__).parent)
+    []
+    """
+    d_digests_1 = get_tree_digests(path_dir_1)
+    d_digests_2 = get_tree_digests(path_dir_2)
+    return sorted(path for path in set(d_digests_1) | set(d_digests_2) if d_digests_1.get(path) != d_digests_2.get(path))
+
+
+def check_deterministic_build(path_conf_file: pathlib.Path, path_template_dir: pathlib.Path) -> List[str]:
+    """
+    builds the project twice into temporary directories and returns the relative paths of the files which are different.
+    each build runs in a new interpreter with a different PYTHONHASHSEED, so the iteration order of sets differs between the builds,
+    and with the same SOURCE_DATE_EPOCH - the current time, if it is not set already.
+    the builds run the commandline interface of this file, the conf file does not need one
+    """
+    env = dict(os.environ)
+    env.setdefault('SOURCE_DATE_EPOCH', str(int(time.time())))
+    with tempfile.TemporaryDirectory(prefix='pizzacutter_deterministic_') as temp_dir:
+        l_paths_target_dirs = [pathlib.Path(temp_dir) / f'build_{hash_seed}' for hash_seed in (1, 2)]
+        for hash_seed, path_target_dir in zip((1, 2), l_paths_target_dirs):
+            logger.info(f'building into "{path_target_dir}" with PYTHONHASHSEED={hash_seed}, SOURCE_DATE_EPOCH={env["SOURCE_DATE_EPOCH"]}')
+            # a socket which does not exist - the build runs in the new interpreter, not on the build server
+            subprocess.run([sys.executable, str(PATH_CONF_FILE), 'build', '--conf_file', str(path_conf_file), '--template_dir', str(path_template_dir),
+                            '--target_dir', str(path_target_dir), '--socket', str(pathlib.Path(temp_dir) / 'no_build_server.sock')],
+                           env=dict(env, PYTHONHASHSEED=str(hash_seed)), check=True)
+        return get_tree_differences(*l_paths_target_dirs)
+
 
 # #############################################################################################################################################################
 # CLI Interface
 # #############################################################################################################################################################
 
 
+PATH_CONF_FILE = pathlib.Path(__file__).resolve()
+
+
 def main() -> None:
-    import pizzacutter
+    """ builds the project of this conf file in this process, into the parent directory of the template directory """
     path_conf_file = pathlib.Path(__file__).resolve()
     path_template_dir = pathlib.Path(__file__).resolve().parent
     path_target_dir = pathlib.Path(__file__).resolve().parent.parent
 
-    pizzacutter.build(path_conf_file=path_conf_file,
-                      path_template_dir=path_template_dir,
-                      path_target_dir=path_target_dir, allow_overwrite=True)
+    pizza_cutter = PizzaCutterConcurrent(path_conf_file=path_conf_file,
+                                         path_template_dir=path_template_dir,
+                                         path_target_dir=path_target_dir, allow_overwrite=True)
+    pizza_cutter.build()
+
+
+def get_socket_path(socket_path: Optional[str]) -> pathlib.Path:
+    """
+    the socket given on the commandline, otherwise the socket in the private directory of the user
+
+    >>> get_socket_path('some.sock')
+    PosixPath('some.sock')
+    """
+    return pathlib.Path(socket_path) if socket_path else build_client.get_build_server_socket_path()
+
+
+def cli() -> None:
+    """
+    the commandline interface - click is only imported here, so the configuration can be imported without it.
+    the socket of the build server is resolved when a command runs, not on import
+    """
+    import click
+
+    context_settings = dict(help_option_names=['-h', '--help'])
+    socket_option = click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), default=None,
+                                 help='the socket of the build server, default : build_server.sock in the socket directory of the user')
+
+    @click.group(context_settings=context_settings, invoke_without_command=True)
+    @click.pass_context
+    def cli_main(ctx: click.Context) -> None:
+        """ builds the project of this conf file - on the build server, if it is running """
+        if ctx.invoked_subcommand is None:
+            ctx.invoke(cli_build)
+
+    @cli_main.command('build', context_settings=context_settings)
+    @click.option('--conf_file', type=click.Path(exists=True, dir_okay=False), default=str(PATH_CONF_FILE), help='the conf file, default : this file')
+    @click.option('--template_dir', type=click.Path(exists=True, file_okay=False), default=str(PATH_CONF_FILE.parent),
+                  help='the template directory, default : the directory of this file')
+    @click.option('--target_dir', type=click.Path(file_okay=False), default=str(PATH_CONF_FILE.parent.parent),
+                  help='the target directory, default : the parent directory of the template directory')
+    @click.option('--dry_run', is_flag=True, default=False, help='test only, report overwrites and unset patterns')
+    @socket_option
+    def cli_build(conf_file: str, template_dir: str, target_dir: str, dry_run: bool, socket_path: Optional[str]) -> None:
+        """ builds on the build server, or in process if the build server is not running """
+        build(path_conf_file=pathlib.Path(conf_file).resolve(), path_template_dir=pathlib.Path(template_dir).resolve(),
+              path_target_dir=pathlib.Path(target_dir).resolve(), dry_run=dry_run, path_socket=get_socket_path(socket_path))
+
+    @cli_main.command('check_deterministic', context_settings=context_settings)
+    @click.option('--conf_file', type=click.Path(exists=True, dir_okay=False), default=str(PATH_CONF_FILE), help='the conf file, default : this file')
+    @click.option('--template_dir', type=click.Path(exists=True, file_okay=False), default=str(PATH_CONF_FILE.parent),
+                  help='the template directory, default : the directory of this file')
+    def cli_check_deterministic(conf_file: str, template_dir: str) -> None:
+        """ builds the project twice, and fails if the two builds are not identical """
+        l_differences = check_deterministic_build(path_conf_file=pathlib.Path(conf_file).resolve(), path_template_dir=pathlib.Path(template_dir).resolve())
+        if l_differences:
+            raise click.ClickException('the builds are different:\n    ' + '\n    '.join(l_differences))
+        logger.info('the builds are identical')
+
+    @cli_main.command('serve', context_settings=context_settings)
+    @socket_option
+    def cli_serve(socket_path: Optional[str]) -> None:
+        """ runs the build server, which keeps the modules and template trees in memory between the builds """
+        serve_builds(get_socket_path(socket_path))
+
+    @cli_main.command('stop', context_settings=context_settings)
+    @socket_option
+    def cli_stop(socket_path: Optional[str]) -> None:
+        """ stops the build server """
+        path_socket = get_socket_path(socket_path)
+        if build_client.request_build_server({'command': 'stop'}, path_socket) is None:
+            logger.info(f'no build server on "{path_socket}"')
+
+    cli_main()
 
 
 if __name__ == '__main__':
-    main()
+    cli()
@@ -0,0 +1,8 @@
+# STDLIB
+import pathlib
+import sys
+
+# conf_root.py and build_client.py are in the root of the repository, not in a package
+path_repository_dir = pathlib.Path(__file__).resolve().parent.parent
+if str(path_repository_dir) not in sys.path:
+    sys.path.insert(0, str(path_repository_dir))
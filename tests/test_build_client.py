@@ -0,0 +1,63 @@
+"""
+the socket of the build server : the private socket directory, the check of the peer user, and conf_root.py without click
+"""
+
+# STDLIB
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+
+# EXT
+import pytest
+
+# PROJ
+import build_client
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'getuid'), reason='unix sockets and user ids')
+path_repository_dir = pathlib.Path(build_client.__file__).resolve().parent
+
+
+def test_socket_dir_is_private(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    path_socket = build_client.get_build_server_socket_path()
+    assert path_socket.parent == tmp_path / f'pizzacutter-{os.getuid()}'
+    assert path_socket.parent.stat().st_mode & 0o777 == 0o700
+    # a second call uses the existing directory
+    assert build_client.get_build_server_socket_path() == path_socket
+
+
+def test_socket_dir_accessible_by_others_is_refused(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    path_socket_dir = tmp_path / f'pizzacutter-{os.getuid()}'
+    path_socket_dir.mkdir(mode=0o777)
+    path_socket_dir.chmod(0o777)
+    with pytest.raises(PermissionError):
+        build_client.get_build_server_socket_path()
+
+
+def test_socket_dir_symlink_is_refused(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    path_other_dir = tmp_path / 'other'
+    path_other_dir.mkdir(mode=0o700)
+    (tmp_path / f'pizzacutter-{os.getuid()}').symlink_to(path_other_dir)
+    with pytest.raises(PermissionError):
+        build_client.get_build_server_socket_path()
+
+
+@pytest.mark.skipif(not hasattr(socket, 'SO_PEERCRED'), reason='SO_PEERCRED')
+def test_peer_of_another_user_is_refused(monkeypatch: pytest.MonkeyPatch) -> None:
+    server_socket, client_socket = socket.socketpair()
+    with server_socket, client_socket:
+        assert build_client.get_peer_uid(client_socket) == os.getuid()
+        build_client.check_peer_uid(client_socket)
+        monkeypatch.setattr(os, 'getuid', lambda: os.geteuid() + 1)
+        with pytest.raises(PermissionError):
+            build_client.check_peer_uid(client_socket)
+
+
+def test_conf_root_imports_without_click() -> None:
+    # the configuration is imported by pizzacutter - click and the socket directory are only needed by the commandline interface
+    code = "import sys; sys.modules['click'] = None; import conf_root; assert callable(conf_root.main)"
+    subprocess.run([sys.executable, '-c', code], cwd=path_repository_dir, env=dict(os.environ, XDG_RUNTIME_DIR='/does/not/exist'), check=True)
@@ -0,0 +1,32 @@
+"""
+the deterministic build : two builds of the same configuration with the same SOURCE_DATE_EPOCH write identical trees
+"""
+
+# STDLIB
+import pathlib
+
+# EXT
+import pytest
+
+# PROJ
+import conf_root
+
+path_repository_dir = pathlib.Path(conf_root.__file__).resolve().parent
+source_date_epoch = '1700000000'
+
+
+def test_builds_are_identical(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', source_date_epoch)
+    l_paths_target_dirs = [tmp_path / 'build_1', tmp_path / 'build_2']
+    for path_target_dir in l_paths_target_dirs:
+        # a socket which does not exist - the build runs in this process, not on a build server
+        conf_root.build(path_conf_file=conf_root.PATH_CONF_FILE, path_template_dir=path_repository_dir, path_target_dir=path_target_dir,
+                        dry_run=False, path_socket=tmp_path / 'no_build_server.sock')
+    assert conf_root.get_tree_digests(l_paths_target_dirs[0])
+    assert conf_root.get_tree_differences(*l_paths_target_dirs) == []
+
+
+def test_builds_with_different_hash_seeds_are_identical(monkeypatch: pytest.MonkeyPatch) -> None:
+    # the builds run in new interpreters with different PYTHONHASHSEED, like the command check_deterministic
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', source_date_epoch)
+    assert conf_root.check_deterministic_build(path_conf_file=conf_root.PATH_CONF_FILE, path_template_dir=path_repository_dir) == []
@@ -0,0 +1,71 @@
+"""
+the hook steps of the after build hook : a second build of an unchanged project skips every step with fingerprinted inputs,
+also when the stubs and the completion index are written into the package directory
+"""
+
+# STDLIB
+import logging
+import pathlib
+import re
+import textwrap
+from typing import Dict
+
+# EXT
+import pizzacutter
+import pytest
+
+# PROJ
+import conf_root
+
+path_repository_dir = pathlib.Path(conf_root.__file__).resolve().parent
+
+# a configuration with the options, which write generated files into the package directory
+conf_file_with_generated_files = """
+import conf_root
+
+
+class PizzaCutterConfig(conf_root.PizzaCutterConfig):
+    def set_defaults(self):
+        self.is_typed_package = True
+        self.is_typed_package_generate_stubs = True
+        self.create_cli_file = True
+        self.cli_completion_index = True
+        super().set_defaults()
+"""
+
+
+def build(path_conf_file: pathlib.Path, path_target_dir: pathlib.Path, caplog: pytest.LogCaptureFixture) -> Dict[str, bool]:
+    """ builds the project and returns the hook steps with fingerprints, and if they were skipped """
+    caplog.clear()
+    pizzacutter.build(path_conf_file=path_conf_file, path_template_dir=path_repository_dir, path_target_dir=path_target_dir, allow_overwrite=True)
+    d_skipped: Dict[str, bool] = dict()
+    for record in caplog.records:
+        match = re.fullmatch(r'hook step (\w+): (skipped, nothing changed|.* ms)', record.getMessage())
+        if match:
+            d_skipped[match.group(1)] = match.group(2) == 'skipped, nothing changed'
+    return d_skipped
+
+
+def test_second_build_skips_fingerprinted_steps(tmp_path: pathlib.Path, caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.INFO)
+    path_conf_file = tmp_path / 'conf_generated_files.py'
+    path_conf_file.write_text(textwrap.dedent(conf_file_with_generated_files), encoding='utf-8')
+    path_target_dir = tmp_path / 'target'
+    conf = conf_root.PizzaCutterConfig(pizza_cutter_path_target_dir=path_target_dir)
+    path_package_dir = conf.path_package_dir
+    fingerprinted_steps = {'commandline_help', 'readme', 'stubs', 'completion_index'}
+
+    # the first build creates the files which are never overwritten (CHANGES.rst, requirements.txt), which change the rendered files
+    build(path_conf_file, path_target_dir, caplog)
+    assert (path_package_dir / 'completion_index.json').is_file()
+    assert conf_root.is_generated_file(path_package_dir / '__init__.pyi')
+
+    # a change of the package runs the steps once, and the files they generate do not change their fingerprints
+    path_main_module = path_package_dir / (conf.main_module + '.py')
+    path_main_module.write_text(path_main_module.read_text(encoding='utf-8') + '\n\ndef added_function() -> None:\n    pass\n', encoding='utf-8')
+    d_skipped = build(path_conf_file, path_target_dir, caplog)
+    assert not any(d_skipped[name] for name in fingerprinted_steps)
+
+    d_skipped = build(path_conf_file, path_target_dir, caplog)
+    assert fingerprinted_steps <= set(d_skipped)
+    assert all(d_skipped[name] for name in fingerprinted_steps), f'steps run again on an unchanged project : {d_skipped}'
@@ -0,0 +1,101 @@
+"""
+quoting and escaping of the TOML emitter - every value is read back with tomllib (python 3.11 and above), like the build tools read
+pyproject.toml, otherwise with the toml parser, which does not parse some valid edge cases (empty quoted keys, escaped triple quotes)
+"""
+
+# STDLIB
+import sys
+from typing import Any, Dict
+
+# EXT
+import pytest
+
+# PROJ
+import toml_emitter
+
+if sys.version_info >= (3, 11):
+    import tomllib as toml_parser
+else:
+    import toml as toml_parser
+
+
+def parse(toml_text: str) -> Dict[str, Any]:
+    d_toml: Dict[str, Any] = toml_parser.loads(toml_text)
+    return d_toml
+
+
+l_strings = [
+    '',
+    'plain',
+    'double "quotes"',
+    "single 'quotes'",
+    'backslash \\ and \\n as text',
+    'trailing backslash \\',
+    'newline \n carriage return \r tab \t',
+    'backspace \b form feed \f',
+    'nul \x00 escape \x1b delete \x7f',
+    'unicode äöü € 𝄞',
+    '"""triple quotes"""',
+    "'''triple single quotes'''",
+    '# not a comment',
+    'some_package>=1.0; python_version < "3.8"',
+]
+
+
+@pytest.mark.parametrize('value', l_strings)
+def test_string_round_trip(value: str) -> None:
+    assert parse(f'key = {toml_emitter.toml_value(value)}')['key'] == value
+    assert parse(f'key = {toml_emitter.toml_value([value], multiline=True)}')['key'] == [value]
+
+
+@pytest.mark.parametrize('key', ['bare_key-1', '', 'with space', 'with.dot', 'with "quote"', 'äöü', '1234'])
+def test_key_round_trip(key: str) -> None:
+    assert parse(f'{toml_emitter.toml_key(key)} = 1') == {key: 1}
+    assert parse(toml_emitter.emit_toml([('table', {key: 1})])) == {'table': {key: 1}}
+
+
+def test_bare_keys_are_not_quoted() -> None:
+    assert toml_emitter.toml_key('requires-python') == 'requires-python'
+    assert toml_emitter.toml_key('with.dot') == '"with.dot"'
+    assert toml_emitter.toml_key('') == '""'
+
+
+def test_escapes() -> None:
+    assert toml_emitter.toml_value('a "b" \\ c') == '"a \\"b\\" \\\\ c"'
+    assert toml_emitter.toml_value('\n\t\r\b\f') == '"\\n\\t\\r\\b\\f"'
+    assert toml_emitter.toml_value('\x00\x1f\x7f') == '"\\u0000\\u001f\\u007f"'
+    assert toml_emitter.toml_value('äöü') == '"äöü"'
+
+
+def test_values_round_trip() -> None:
+    d_table = {'true': True, 'false': False, 'int': -3, 'float': 0.5, 'empty list': [], 'empty table': {},
+               'nested': [{'name': 'some "name"', 'list': [1, 2]}, {}], 'tuple': ('a', 'b')}
+    d_toml = parse(toml_emitter.emit_toml([('project', d_table)]))
+    assert d_toml == {'project': dict(d_table, tuple=['a', 'b'])}
+
+
+def test_unsupported_values() -> None:
+    for value in (None, b'bytes', {1, 2}):
+        with pytest.raises(TypeError):
+            toml_emitter.toml_value(value)
+
+
+def test_emit_toml_tables_and_comments() -> None:
+    toml_text = toml_emitter.emit_toml([('project', {'name': 'x'}), ('empty', {}), ('tool.setuptools.package-data', {'some.package': ['py.typed']})],
+                                       d_comments={'project': '# the project', 'project.name': '# the name'})
+    assert toml_text == ('[project]\n# the project\n# the name\nname = "x"\n\n'
+                         '[tool.setuptools.package-data]\n"some.package" = [\n    "py.typed",\n]')
+
+
+def test_deprecated_helpers() -> None:
+    with pytest.warns(DeprecationWarning, match='convert_list_to_toml is deprecated'):
+        assert toml_emitter.convert_list_to_toml(['a', 'b"c"']) == '[\n    "a",\n    "b\'c\'",\n]'
+    with pytest.warns(DeprecationWarning):
+        assert toml_emitter.convert_list_to_toml(["b'c'"], quoting_char="'") == '[\n    \'b"c"\',\n]'
+    with pytest.warns(DeprecationWarning):
+        assert toml_emitter.convert_list_of_dict_to_toml([{'a': '1'}, {'b': '2'}]) == '[\n    {a = "1"},\n    {b = "2"},\n]'
+    with pytest.warns(DeprecationWarning):
+        assert toml_emitter.convert_dict_to_toml({'a': '1', 'b': 'with "quote"'}) == '{a = "1", b = "with \\"quote\\""}'
+    # the helpers are still importable from conf_root.py
+    import conf_root
+    assert conf_root.convert_list_to_toml is toml_emitter.convert_list_to_toml
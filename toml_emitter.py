@@ -0,0 +1,190 @@
+"""
+writes TOML for the generated files (pyproject.toml) - the tables in the given order, in one pass, with TOML escaping for all strings.
+the former helpers convert_list_to_toml, convert_list_of_dict_to_toml and convert_dict_to_toml of conf_root.py are kept as
+deprecated wrappers, for the configurations which still use them.
+"""
+
+# stdlib
+import re
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+TOML_BARE_KEY = re.compile(r'[A-Za-z0-9_-]+')
+# TOML basic strings : backslash, quote and the control characters need to be escaped
+TOML_BASIC_STRING_NEEDS_ESCAPES = re.compile(r'[\x00-\x1f"\\\x7f]')
+TOML_BASIC_STRING_ESCAPES = str.maketrans({**{chr(code): f'\\u{code:04x}' for code in [*range(0x20), 0x7f]},
+                                          '\b': '\\b', '\t': '\\t', '\n': '\\n', '\f': '\\f', '\r': '\\r', '"': '\\"', '\\': '\\\\'})
+
+
+def emit_toml(l_tables: List[Tuple[str, Dict[str, Any]]], d_comments: Optional[Dict[str, str]] = None) -> str:
+    """
+    writes the tables in the given order, in one pass - the arrays of the keys are written with one item per line.
+    the table names are dotted keys, like 'project.urls' - empty tables are not written.
+    d_comments : comment lines after the table header ('<table name>'), or above a key ('<table name>.<key>')
+
+    >>> print(emit_toml([('project', {'name': 'x', 'keywords': ['a', 'b'], 'license': {'text': 'MIT'}}), ('project.scripts', {})],
+    ...                 d_comments={'project.keywords': '# some comment'}))
+    [project]
+    name = "x"
+    # some comment
+    keywords = [
+        "a",
+        "b",
+    ]
+    license = {text = "MIT"}
+
+    >>> # round trip, with strings which need to be escaped
+    >>> d_project = {'description': 'quotes " \\' and backslash \\\\ and newline \\n tab \\t nul \\x00 unicode äöü',
+    ...              'dependencies': ['some_package>=1.0; python_version < "3.8"'],
+    ...              'authors': [{'name': 'some "name"', 'email': 'some@email.com'}],
+    ...              'zip-safe': False, 'some key.with dot': 1, 'empty': []}
+    >>> import toml
+    >>> d_toml = toml.loads(emit_toml([('project', d_project), ('tool.setuptools.package-data', {'some_package': ['py.typed']})]))
+    >>> assert d_toml == {'project': d_project, 'tool': {'setuptools': {'package-data': {'some_package': ['py.typed']}}}}
+
+    """
+    if d_comments is None:
+        d_comments = dict()
+    l_lines: List[str] = list()
+    for table_name, d_table in l_tables:
+        if not d_table:
+            continue
+        if l_lines:
+            l_lines.append('')
+        l_lines.append(f'[{".".join(toml_key(table_name_part) for table_name_part in table_name.split("."))}]')
+        if table_name in d_comments:
+            l_lines.append(d_comments[table_name])
+        for key, value in d_table.items():
+            if f'{table_name}.{key}' in d_comments:
+                l_lines.append(d_comments[f'{table_name}.{key}'])
+            l_lines.append(f'{toml_key(key)} = {toml_value(value, multiline=True)}')
+    return '\n'.join(l_lines)
+
+
+def toml_key(key: str) -> str:
+    """
+    >>> toml_key('requires-python')
+    'requires-python'
+    >>> toml_key('some key.with dot')
+    '"some key.with dot"'
+    """
+    if TOML_BARE_KEY.fullmatch(key):
+        return key
+    return toml_value(key)
+
+
+def toml_value(value: Any, multiline: bool = False) -> str:
+    """
+    converts the value to TOML - multiline : arrays with one item per line (not possible inside inline tables)
+
+    >>> toml_value('some "quoted" \\\\ text')
+    '"some \\\\"quoted\\\\" \\\\\\\\ text"'
+    >>> toml_value(True), toml_value(3), toml_value(0.5)
+    ('true', '3', '0.5')
+    >>> toml_value(['a', {'b': [1, 2]}])
+    '["a", {b = [1, 2]}]'
+    >>> toml_value(['a'], multiline=True)
+    '[\\n    "a",\\n]'
+    >>> toml_value(None)
+    Traceback (most recent call last):
+        ...
+    TypeError: can not convert <class 'NoneType'> to TOML
+
+    """
+    if isinstance(value, str):
+        # most strings do not need escapes - searching is much faster than translating
+        if TOML_BASIC_STRING_NEEDS_ESCAPES.search(value):
+            value = value.translate(TOML_BASIC_STRING_ESCAPES)
+        return f'"{value}"'
+    # bool before int, because bool is a subclass of int
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        if multiline:
+            return '[\n' + ''.join(f'    {toml_value(item)},\n' for item in value) + ']'
+        return '[' + ', '.join(toml_value(item) for item in value) + ']'
+    if isinstance(value, dict):
+        return '{' + ', '.join(f'{toml_key(key)} = {toml_value(item)}' for key, item in value.items()) + '}'
+    raise TypeError(f'can not convert {type(value)} to TOML')
+
+
+# #############################################################################################################################################################
+# deprecated helpers
+# #############################################################################################################################################################
+
+
+def warn_deprecated(name: str, replacement: str) -> None:
+    warnings.warn(f'{name} is deprecated, use toml_emitter.{replacement} instead', DeprecationWarning, stacklevel=3)
+
+
+def convert_list_to_toml(l_data: List[str], quoting_char: str = '"') -> str:
+    """
+    deprecated - use toml_value(l_data, multiline=True)
+
+    >>> convert_list_to_toml(['a', 'b', 'c'])
+    '[\\n    "a",\\n    "b",\\n    "c",\\n]'
+    >>> convert_list_to_toml(['a', 'b', 'c"test"'])
+    '[\\n    "a",\\n    "b",\\n    "c\\'test\\'",\\n]'
+    >>> convert_list_to_toml(['{a = "1"}'], quoting_char='')
+    '[\\n    {a = "1"},\\n]'
+
+    """
+    warn_deprecated('convert_list_to_toml', 'toml_value(l_data, multiline=True)')
+    if quoting_char == '"':
+        return toml_value([clean_quotes(str_data=str_data, quoting_char=quoting_char) for str_data in l_data], multiline=True)
+    return '[\n' + ''.join(f'    {quoting_char}{clean_quotes(str_data=str_data, quoting_char=quoting_char)}{quoting_char},\n' for str_data in l_data) + ']'
+
+
+def clean_quotes(str_data: str, quoting_char: str) -> str:
+    """
+    Ersetzt <'> mit <"> oder umgekehrt damit keine Kollision mit quoting_char auftritt:
+    >>> assert clean_quotes('test', quoting_char='"') == 'test'
+    >>> assert clean_quotes('test', quoting_char="'") == 'test'
+    >>> assert clean_quotes('test "par"', quoting_char='"') == "test 'par'"
+    >>> assert clean_quotes('test "par"', quoting_char="'") == 'test "par"'
+    >>> assert clean_quotes("test 'par'", quoting_char='"') == "test 'par'"
+    >>> assert clean_quotes("test 'par'", quoting_char="'") == 'test "par"'
+    >>> assert clean_quotes("test 'par'", quoting_char="") == "test 'par'"
+    >>> clean_quotes("test 'par'", quoting_char="x")
+    Traceback (most recent call last):
+        ...
+    NotImplementedError: Quoting Char <x> is not supported
+    """
+    if quoting_char == '"':
+        replacement_char = "'"
+    elif quoting_char == "'":
+        replacement_char = '"'
+    elif quoting_char == "":
+        return str_data
+    else:
+        raise NotImplementedError(f'Quoting Char <{quoting_char}> is not supported')
+
+    if quoting_char in str_data:
+        str_data = str_data.replace(quoting_char, replacement_char)
+    return str_data
+
+
+def convert_list_of_dict_to_toml(ldict_data: List[Dict[str, str]]) -> str:
+    """
+    deprecated - use toml_value(ldict_data, multiline=True)
+
+    >>> convert_list_of_dict_to_toml([{'a':'1', 'b':'2'}])
+    '[\\n    {a = "1", b = "2"},\\n]'
+    >>> convert_list_of_dict_to_toml([{"a":"1", "b":"2"}, {"c":"3", "d":"3"}])
+    '[\\n    {a = "1", b = "2"},\\n    {c = "3", d = "3"},\\n]'
+    """
+    warn_deprecated('convert_list_of_dict_to_toml', 'toml_value(ldict_data, multiline=True)')
+    return toml_value(ldict_data, multiline=True)
+
+
+def convert_dict_to_toml(dict_data: Dict[str, str]) -> str:
+    """
+    deprecated - use toml_value(dict_data)
+
+    >>> convert_dict_to_toml({'a':'1', 'b':'2'})
+    '{a = "1", b = "2"}'
+    """
+    warn_deprecated('convert_dict_to_toml', 'toml_value(dict_data)')
+    return toml_value(dict_data)
@@ -7,4 +7,5 @@ collect_ignore: List[str] = {{PizzaCutter.pytest.collect_ignore}}
 def pytest_load_initial_conftests(early_config: pytest.Config, parser: pytest.Parser, args: List[str]) -> None:
     # PizzaCutter Template can add here additional pytest args
     additional_pytest_args: List[str] = {{PizzaCutter.pytest.additional_args}}
-    args[:] = list(set(args + additional_pytest_args))
+    # without duplicates, in the order of the arguments
+    args[:] = list(dict.fromkeys(args + additional_pytest_args))
@@ -0,0 +1,29 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# this file is only created if compile_with_mypyc is set in the PizzaCutter configuration
+# all other settings are in pyproject.toml - here we only add the mypyc compiled extension modules
+
+# STDLIB
+import os
+import platform
+from typing import Any, List
+
+# EXT
+from setuptools import setup
+
+# the modules to compile with mypyc, relative to the project directory
+mypyc_modules: List[str] = {{PizzaCutter.mypyc.modules}}
+
+
+def get_ext_modules() -> List[Any]:
+    """
+    compiles the modules with mypyc - set the environment variable MYPYC_COMPILE=0 to build the pure python package.
+    on other interpreters than CPython (PyPy, GraalPy) the pure python package is built.
+    """
+    if os.environ.get('MYPYC_COMPILE', '1') == '0' or platform.python_implementation() != 'CPython':
+        return list()
+    from mypyc.build import mypycify
+    # mypyc does not support "no_strict_optional" from the mypy settings in pyproject.toml
+    return list(mypycify(['--strict-optional'] + mypyc_modules, opt_level='3'))
+
+
+setup(ext_modules=get_ext_modules())
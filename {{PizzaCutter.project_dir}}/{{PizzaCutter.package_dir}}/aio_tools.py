@@ -0,0 +1,125 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import asyncio
+import signal
+import sys
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Iterable, List, Tuple, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class CancelledBySignalError(Exception):
+    """raised by run(), after the main task was cancelled by SIGINT or SIGTERM"""
+
+    def __init__(self, signal_number: int) -> None:
+        super().__init__(f'cancelled by signal {signal.Signals(signal_number).name}')
+        self.signal_number = signal_number
+
+
+def run(main_coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    runs the coroutine under asyncio.run, using uvloop if it is installed.
+    SIGINT and SIGTERM cancel the main task (on posix), so cleanup in try/finally blocks of the application is executed -
+    after the task is cancelled, CancelledBySignalError is raised, which is handled by the cli like every other exception.
+
+    >>> async def answer() -> int:
+    ...     await asyncio.sleep(0)
+    ...     return 42
+    >>> run(answer())
+    42
+
+    """
+    try:
+        import uvloop  # type: ignore
+    except ImportError:
+        return asyncio.run(_run_cancel_on_signals(main_coroutine))
+
+    if sys.version_info >= (3, 12):                                                                         # pragma: no cover
+        return asyncio.run(_run_cancel_on_signals(main_coroutine), loop_factory=uvloop.new_event_loop)     # pragma: no cover
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())                                                 # pragma: no cover
+    return asyncio.run(_run_cancel_on_signals(main_coroutine))                                              # pragma: no cover
+
+
+async def _run_cancel_on_signals(main_coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    runs the coroutine as task and cancels that task on SIGINT or SIGTERM.
+    on windows loop.add_signal_handler is not implemented - there asyncio.run cancels the main task on SIGINT itself.
+
+    >>> async def cancelled_by_sigterm() -> None:
+    ...     signal.raise_signal(signal.SIGTERM)
+    ...     await asyncio.sleep(10)
+    >>> if sys.platform != 'win32':
+    ...     try:
+    ...         asyncio.run(_run_cancel_on_signals(cancelled_by_sigterm()))
+    ...     except CancelledBySignalError as exc:
+    ...         assert exc.signal_number == signal.SIGTERM
+    ...         assert str(exc) == 'cancelled by signal SIGTERM'
+    ...     else:
+    ...         raise AssertionError('the main task was not cancelled')
+
+    """
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.ensure_future(main_coroutine)
+    l_received_signals: List[int] = list()
+    l_installed_signals: List[int] = list()
+
+    def _cancel_main_task(signal_number: int) -> None:
+        l_received_signals.append(signal_number)
+        main_task.cancel()
+
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, _cancel_main_task, signal_number)
+            l_installed_signals.append(signal_number)
+        except (NotImplementedError, RuntimeError, ValueError):     # pragma: no cover  # windows, or not in the main thread
+            pass                                                    # pragma: no cover
+
+    try:
+        return await main_task
+    except asyncio.CancelledError:
+        if l_received_signals:
+            raise CancelledBySignalError(l_received_signals[0]) from None
+        raise                                                       # pragma: no cover
+    finally:
+        for installed_signal in l_installed_signals:
+            loop.remove_signal_handler(installed_signal)
+
+
+async def map_bounded(coroutine_function: Callable[[T], Awaitable[R]], items: Iterable[T], limit: int) -> List[R]:
+    """
+    fan-out I/O : awaits coroutine_function(item) for all items, with at most <limit> of them running at the same time.
+    the items are consumed lazily, so also long generators can be passed. the results are returned in the order of the items.
+    if one call fails, the remaining calls are cancelled and the exception is raised.
+
+    >>> async def double(number: int) -> int:
+    ...     await asyncio.sleep(0.001 * (5 - number))
+    ...     return number * 2
+    >>> asyncio.run(map_bounded(double, range(5), limit=2))
+    [0, 2, 4, 6, 8]
+    >>> asyncio.run(map_bounded(double, [], limit=2))
+    []
+    >>> asyncio.run(map_bounded(double, range(5), limit=0))
+    Traceback (most recent call last):
+        ...
+    ValueError: limit must be at least 1, got 0
+
+    """
+    if limit < 1:
+        raise ValueError(f'limit must be at least 1, got {limit}')
+
+    iter_items: Iterable[Tuple[int, T]] = enumerate(items)
+    d_results: Dict[int, R] = dict()
+
+    async def _worker() -> None:
+        # all workers share the same iterator - that is safe, because they all run in the same thread
+        for index, item in iter_items:
+            d_results[index] = await coroutine_function(item)
+
+    l_tasks = [asyncio.ensure_future(_worker()) for _ in range(limit)]
+    try:
+        await asyncio.gather(*l_tasks)
+    finally:
+        for task in l_tasks:
+            task.cancel()
+    return [d_results[index] for index in range(len(d_results))]
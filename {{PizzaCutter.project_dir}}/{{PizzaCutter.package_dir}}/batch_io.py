@@ -0,0 +1,293 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import contextlib
+import io
+import json
+import shlex
+import sys
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple, Type
+
+# EXT
+import click
+
+# OWN
+import cli_exit_tools
+
+INPUT_FORMATS = ['ndjson', 'lines']
+# the results are written when the buffer holds that many characters, and at the end of the input
+BUFFER_SIZE = 64 * 1024
+
+
+class RecordError(Exception):
+    """ the record can not be dispatched - it is reported for that record, the stream goes on """
+    pass
+
+
+class RecordWriter(object):
+    """
+    writes one json object per line, with bounded buffering : the lines are written to the stream
+    when the buffer holds buffer_size characters, after flush_every records (0 = only by size), and on flush().
+
+    >>> writer = RecordWriter(sys.stdout, buffer_size=100)
+    >>> writer.write({'line': 1, 'result': 'a'})
+    >>> writer.flush()
+    {"line": 1, "result": "a"}
+    """
+
+    def __init__(self, stream: IO[str], buffer_size: int = BUFFER_SIZE, flush_every: int = 0) -> None:
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.flush_every = flush_every
+        self.l_buffer: List[str] = list()
+        self.buffered_size = 0
+        self.buffered_records = 0
+
+    def write(self, d_record: Dict[str, Any]) -> None:
+        line = json.dumps(d_record, ensure_ascii=False, default=str) + '\n'
+        self.l_buffer.append(line)
+        self.buffered_size += len(line)
+        self.buffered_records += 1
+        if self.buffered_size >= self.buffer_size or (self.flush_every and self.buffered_records >= self.flush_every):
+            self.flush()
+
+    def flush(self) -> None:
+        self.stream.write(''.join(self.l_buffer))
+        self.stream.flush()
+        self.l_buffer.clear()
+        self.buffered_size = 0
+        self.buffered_records = 0
+
+
+def iter_records(stream: IO[str], input_format: str = 'ndjson') -> Iterator[Tuple[int, Any]]:
+    """
+    yields (line number, record) for every line of the stream, which is read line by line - empty lines are skipped.
+    ndjson : the record is the decoded json value, a line which is no valid json yields a RecordError as record.
+    lines : the record is the line without the line ending.
+
+    >>> list(iter_records(io.StringIO('["a", "b"]\\n\\n{"x": 1}\\n{no json\\n')))
+    [(1, ['a', 'b']), (3, {'x': 1}), (4, RecordError('invalid json : Expecting property name enclosed in double quotes'))]
+    >>> list(iter_records(io.StringIO('a b\\r\\nc'), input_format='lines'))
+    [(1, 'a b'), (2, 'c')]
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        if input_format == 'lines':
+            yield line_number, line
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, RecordError(f'invalid json : {exc.msg}')
+
+
+def get_record_args(record: Any, command: click.Command) -> List[str]:
+    """
+    the command line arguments of the command for a record :
+        a string : split like a shell would do it
+        a list : the arguments
+        an object : the parameters of the command by name, {"name": "x", "verbose": true} for "--name x --verbose",
+                    the arguments of the command in the order of the command, after "--" - so values starting with "-" are no options.
+                    a list is expanded for options with multiple=True, and for options and arguments with nargs != 1
+
+    >>> @click.command()
+    ... @click.argument('path')
+    ... @click.option('--count', type=int)
+    ... @click.option('--verbose/--quiet', default=False)
+    ... def demo(path: str, count: int, verbose: bool) -> None:
+    ...     pass
+    >>> get_record_args('some_path --count 2', demo)
+    ['some_path', '--count', '2']
+    >>> get_record_args(['some path', 3], demo)
+    ['some path', '3']
+    >>> get_record_args({'count': 2, 'verbose': False, 'path': 'p'}, demo)
+    ['--count', '2', '--quiet', '--', 'p']
+    >>> get_record_args({'path': '-x'}, demo)
+    ['--', '-x']
+    >>> @click.command()
+    ... @click.argument('paths', nargs=-1)
+    ... @click.option('--tag', multiple=True)
+    ... def demo_paths(paths: Tuple[str, ...], tag: Tuple[str, ...]) -> None:
+    ...     pass
+    >>> get_record_args({'paths': ['a', '-b'], 'tag': ['x', 'y']}, demo_paths)
+    ['--tag', 'x', '--tag', 'y', '--', 'a', '-b']
+    >>> get_record_args({'colour': 'red'}, demo)
+    Traceback (most recent call last):
+        ...
+    batch_io.RecordError: no parameter "colour" for command "demo"
+    """
+    if isinstance(record, str):
+        return shlex.split(record)
+    if isinstance(record, list):
+        return [str(arg) for arg in record]
+    if not isinstance(record, dict):
+        raise RecordError(f'the record needs to be a string, a list or an object, got {type(record).__name__}')
+    return get_object_record_args(record, command)
+
+
+def get_object_record_args(record: Dict[str, Any], command: click.Command) -> List[str]:
+    """ the command line arguments for a record with the parameters of the command by name, see get_record_args() """
+    d_params = {param.name: param for param in command.params}
+    for name in record:
+        if name not in d_params:
+            raise RecordError(f'no parameter "{name}" for command "{command.name}"')
+    l_options: List[str] = list()
+    l_arguments: List[str] = list()
+    for name, param in d_params.items():
+        if name not in record:
+            continue
+        value = record[name]
+        if isinstance(param, click.Argument):
+            l_arguments.extend(str(item) for item in (value if isinstance(value, list) and param.nargs != 1 else [value]))
+        else:
+            for item in (value if isinstance(value, list) and param.multiple else [value]):
+                l_options.extend(get_option_args(param, item))
+    if l_arguments:
+        return l_options + ['--'] + l_arguments
+    return l_options
+
+
+def get_option_args(param: click.Parameter, value: Any) -> List[str]:
+    """
+    >>> get_option_args(click.Option(['--count']), 2)
+    ['--count', '2']
+    >>> get_option_args(click.Option(['--verbose/--quiet']), True)
+    ['--verbose']
+    >>> get_option_args(click.Option(['--verbose/--quiet']), False)
+    ['--quiet']
+    >>> get_option_args(click.Option(['--verbose'], is_flag=True), False)
+    []
+    >>> get_option_args(click.Option(['--size'], nargs=2), [3, 4])
+    ['--size', '3', '4']
+    """
+    if isinstance(param, click.Option) and param.is_flag:
+        return param.opts[:1] if value is True else param.secondary_opts[:1]
+    if isinstance(value, list) and param.nargs != 1:
+        return [param.opts[0], *(str(item) for item in value)]
+    return [param.opts[0], str(value)]
+
+
+def run_record(ctx: click.Context, command: click.Command, record: Any,
+               fatal_exceptions: Tuple[Type[BaseException], ...] = ()) -> Dict[str, Any]:
+    """
+    runs the command for one record, in the context of the group - returns the result as dict :
+    "result" (the return value of the command, if not None) and "output" (what the command wrote to stdout, if any),
+    or "error" and "exit_code" if the command failed. fatal_exceptions and click.Abort are raised, they end the batch.
+
+    >>> @click.command()
+    ... @click.argument('number', type=int)
+    ... def inverse(number: int) -> float:
+    ...     print('computing')
+    ...     return 1 / number
+    >>> ctx = click.Context(click.Group())
+    >>> run_record(ctx, inverse, ['4'])
+    {'result': 0.25, 'output': 'computing\\n'}
+    >>> run_record(ctx, inverse, ['zero'])
+    {'error': "Invalid value for 'NUMBER': 'zero' is not a valid integer.", 'exit_code': 2}
+    >>> run_record(ctx, inverse, ['0'])
+    {'error': 'ZeroDivisionError: division by zero', 'exit_code': 1, 'output': 'computing\\n'}
+    >>> run_record(ctx, inverse, ['0'], fatal_exceptions=(ZeroDivisionError,))
+    Traceback (most recent call last):
+        ...
+    ZeroDivisionError: division by zero
+    """
+    captured_stdout = io.StringIO()
+    d_result: Dict[str, Any] = dict()
+    try:
+        if isinstance(record, RecordError):
+            raise record
+        l_args = get_record_args(record, command)
+        with contextlib.redirect_stdout(captured_stdout):
+            with command.make_context(command.name, l_args, parent=ctx) as record_ctx:
+                result = command.invoke(record_ctx)
+        if result is not None:
+            d_result['result'] = result
+    except Exception as exc:
+        if isinstance(exc, (click.Abort, *fatal_exceptions)):
+            raise
+        d_result = get_error_result(exc)
+    if captured_stdout.getvalue():
+        d_result['output'] = captured_stdout.getvalue()
+    return d_result
+
+
+def get_error_result(exc: Exception) -> Dict[str, Any]:
+    """
+    >>> get_error_result(RecordError('no parameter "x" for command "info"'))
+    {'error': 'no parameter "x" for command "info"', 'exit_code': 2}
+    >>> get_error_result(click.UsageError('No such option: --x'))
+    {'error': 'No such option: --x', 'exit_code': 2}
+    >>> get_error_result(click.exceptions.Exit(0))
+    {}
+    >>> get_error_result(click.exceptions.Exit(3))
+    {'error': 'exit code 3', 'exit_code': 3}
+    >>> get_error_result(FileNotFoundError('some_file'))
+    {'error': 'FileNotFoundError: some_file', 'exit_code': 2}
+    """
+    if isinstance(exc, RecordError):
+        return {'error': str(exc), 'exit_code': 2}
+    if isinstance(exc, click.ClickException):
+        return {'error': exc.format_message(), 'exit_code': exc.exit_code}
+    if isinstance(exc, click.exceptions.Exit):
+        # ctx.exit(), like after --help
+        return {'error': f'exit code {exc.exit_code}', 'exit_code': exc.exit_code} if exc.exit_code else dict()
+    return {'error': f'{type(exc).__name__}: {exc}', 'exit_code': cli_exit_tools.get_system_exit_code(exc)}
+
+
+def run_batch(ctx: click.Context, command: click.Command, records: Iterator[Tuple[int, Any]], writer: RecordWriter,
+              fatal_exceptions: Tuple[Type[BaseException], ...] = ()) -> Tuple[int, int]:
+    """
+    runs the command for every record, and writes one result line per record as soon as the buffer of the writer allows it.
+    a failing record is reported with "error" and "exit_code" in its result line, the next records are processed as usual.
+    returns the number of records and the number of failed records
+    """
+    n_records = 0
+    n_failed = 0
+    try:
+        for line_number, record in records:
+            d_result = run_record(ctx, command, record, fatal_exceptions)
+            n_records += 1
+            if 'error' in d_result:
+                n_failed += 1
+            writer.write({'line': line_number, **d_result})
+    finally:
+        # the results so far are written, also if the batch is interrupted
+        writer.flush()
+    return n_records, n_failed
+
+
+def add_batch_command(group: click.Group, context_settings: Optional[Dict[str, Any]] = None,
+                      fatal_exceptions: Tuple[Type[BaseException], ...] = ()) -> click.Command:
+    """
+    adds the subcommand "batch" to the cli group : "batch COMMAND" reads records from stdin (or --input),
+    and runs COMMAND once per record, all in this process - instead of one process per record.
+    fatal_exceptions (like SigIntError, SigTermError of the cli) end the batch, other exceptions only fail their record.
+    """
+
+    @group.command('batch', context_settings=context_settings)     # type: ignore
+    @click.argument('command_name', metavar='COMMAND')
+    @click.option('--input', 'input_file', type=click.File('r', encoding='utf-8'), default='-', show_default=True,
+                  help='the records, one per line')
+    @click.option('--output', 'output_file', type=click.File('w', encoding='utf-8', lazy=False), default='-', show_default=True,
+                  help='the results, one json object per line')
+    @click.option('--format', 'input_format', type=click.Choice(INPUT_FORMATS), default='ndjson', show_default=True,
+                  help='ndjson : a json string, list or object per line - lines : the arguments of COMMAND per line')
+    @click.option('--flush-every', type=click.IntRange(min=0), default=None,
+                  help='write the results after that many records - default : 1 on a terminal, otherwise by buffer size')
+    @click.pass_context
+    def cli_batch(ctx: click.Context, command_name: str, input_file: IO[str], output_file: IO[str],
+                  input_format: str, flush_every: Optional[int]) -> None:
+        """ run COMMAND for every record, one result per line - exit code 1 if a record failed """
+        command = group.get_command(ctx, command_name)
+        if command is None or command is ctx.command:
+            raise click.BadParameter(f'no such command "{command_name}"', param_hint='COMMAND')
+        if flush_every is None:
+            flush_every = 1 if output_file.isatty() else 0
+        writer = RecordWriter(output_file, flush_every=flush_every)
+        n_records, n_failed = run_batch(ctx.parent or ctx, command, iter_records(input_file, input_format), writer, fatal_exceptions)
+        if n_failed:
+            click.echo(f'{n_failed} of {n_records} records failed', err=True)
+            ctx.exit(1)
+
+    return cli_batch
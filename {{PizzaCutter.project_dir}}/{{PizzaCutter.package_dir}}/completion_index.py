@@ -0,0 +1,360 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import hashlib
+import importlib
+import json
+import os
+import pathlib
+import shlex
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# the console script "{{PizzaCutter.shell_command}}" runs main() of this module - it only imports the standard library.
+# on a Tab press the shell runs the console script with the environment variable COMPLETE_VAR set : the completions are read from
+# completion_index.json, which is generated from cli_main at build time - the cli module and click are not imported.
+# if the index is missing or does not belong to the cli module (the hash differs), the completion is done by click as usual.
+# the plugin commands of a plugins.PluginGroup are not in the index, they are read from the plugin index on completion (plugin_index.py) -
+# the completion of the arguments of a plugin command is done by click.
+# generate the index again after changing the cli with : python -m {{PizzaCutter.package_name}}.completion_index build
+
+# the environment variable which is set by the completion scripts of click
+COMPLETE_VAR = '_{{PizzaCutter.shell_command}}_COMPLETE'.replace('-', '_').upper()
+# the entry point of the cli, "module:function" in this package
+CLI_ENTRY_POINT = '{{PizzaCutter.completion_index.cli_entry_point}}'
+CLI_MODULE = '{{PizzaCutter.cli_module}}'
+PATH_INDEX_FILE = pathlib.Path(__file__).resolve().parent / 'completion_index.json'
+PATH_CLI_MODULE = pathlib.Path(__file__).resolve().parent / f'{CLI_MODULE}.py'
+
+# a completion : (type, value, help) - the type is 'plain', 'file' or 'dir' like for click
+Completion = Tuple[str, str, str]
+
+
+def get_file_hash(path_file: pathlib.Path) -> str:
+    """
+    >>> assert len(get_file_hash(pathlib.Path(__file__))) == 64
+    >>> get_file_hash(pathlib.Path('does_not_exist.py'))
+    ''
+    """
+    try:
+        return hashlib.sha256(path_file.read_bytes()).hexdigest()
+    except OSError:
+        return ''
+
+
+def get_param_index(param: Any, ctx: Any) -> Dict[str, Any]:
+    """ the completion data of a click parameter """
+    import click
+
+    param_type = param.type
+    if isinstance(param_type, click.Choice):
+        # the choices like click completes them - depending on the version of click they are normalized, for example lower case
+        choices: Optional[List[str]] = [item.value for item in param_type.shell_complete(ctx, param, '')]
+    else:
+        choices = None
+    if isinstance(param_type, click.Path) and param_type.dir_okay and not param_type.file_okay:
+        value_type = 'dir'
+    elif isinstance(param_type, (click.Path, click.File)):
+        value_type = 'file'
+    else:
+        value_type = 'plain'
+    d_param: Dict[str, Any] = {'name': param.name, 'choices': choices, 'case_sensitive': getattr(param_type, 'case_sensitive', True),
+                               'type': value_type, 'nargs': param.nargs, 'multiple': param.multiple}
+    if isinstance(param, click.Option):
+        d_param.update({'opts': param.opts, 'secondary_opts': param.secondary_opts, 'help': param.help or '',
+                        'takes_value': not param.is_flag and not param.count})
+    return d_param
+
+
+def get_command_index(command: Any, name: str, parent_ctx: Any = None) -> Dict[str, Any]:
+    """
+    the completion data of a click command, and of its subcommands
+
+    >>> import click
+    >>> @click.group()
+    ... @click.option('--verbose', is_flag=True, help='more output')
+    ... def demo(verbose: bool) -> None:
+    ...     pass
+    >>> @demo.command('paint', short_help='paint it')
+    ... @click.argument('colour', type=click.Choice(['red', 'green']))
+    ... def paint(colour: str) -> None:
+    ...     pass
+    >>> d_index = get_command_index(demo, 'demo')
+    >>> [option['opts'] for option in d_index['options']]
+    [['--verbose'], ['--help']]
+    >>> d_index['commands']['paint']['arguments'][0]['choices']
+    ['red', 'green']
+    """
+    import click
+
+    ctx = click.Context(command, info_name=name, parent=parent_ctx, **command.context_settings)
+    has_plugin_commands = getattr(command, 'has_plugin_commands', False)
+    d_command: Dict[str, Any] = {'help': command.get_short_help_str(), 'options': list(), 'arguments': list(), 'commands': dict(),
+                                 'chain': getattr(command, 'chain', False), 'plugin_commands': has_plugin_commands}
+    for param in command.get_params(ctx):
+        if isinstance(param, click.Option) and not param.hidden:
+            d_command['options'].append(get_param_index(param, ctx))
+        elif isinstance(param, click.Argument):
+            d_command['arguments'].append(get_param_index(param, ctx))
+    if isinstance(command, click.Group):
+        # the commands of the package - the plugins of a plugins.PluginGroup are not imported
+        group_class = click.Group if has_plugin_commands else type(command)
+        for sub_command_name in group_class.list_commands(command, ctx):
+            sub_command = group_class.get_command(command, ctx, sub_command_name)
+            if sub_command is not None and not sub_command.hidden:
+                d_command['commands'][sub_command_name] = get_command_index(sub_command, sub_command_name, ctx)
+    return d_command
+
+
+def build_index(path_index_file: pathlib.Path = PATH_INDEX_FILE) -> None:
+    """ writes the completion index of cli_main - the hook after the build of PizzaCutter calls it """
+    try:
+        cli_module = importlib.import_module(f'.{CLI_MODULE}', __package__)
+    except (ImportError, TypeError):
+        # called as script, like from the hook after the build
+        cli_module = importlib.import_module(CLI_MODULE)
+    d_index = {'cli_module_hash': get_file_hash(PATH_CLI_MODULE),
+               'command': get_command_index(cli_module.cli_main, '{{PizzaCutter.shell_command}}')}
+    path_index_file.write_text(json.dumps(d_index, indent=1, sort_keys=True) + '\n', encoding='utf-8')
+
+
+def load_index(path_index_file: pathlib.Path = PATH_INDEX_FILE, path_cli_module: pathlib.Path = PATH_CLI_MODULE) -> Optional[Dict[str, Any]]:
+    """
+    returns the completion index - None if it does not exist, or if it was built from another version of the cli module
+
+    >>> load_index(pathlib.Path('does_not_exist.json')) is None
+    True
+    """
+    try:
+        d_index: Dict[str, Any] = json.loads(path_index_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if d_index.get('cli_module_hash') != get_file_hash(path_cli_module):
+        return None
+    return d_index
+
+
+def split_arg_string(string: str) -> List[str]:
+    """
+    like shlex.split, but an incomplete quote or escape at the end is kept - like click does it for the completion
+
+    >>> split_arg_string("{{PizzaCutter.shell_command}} info 'my file")
+    ['{{PizzaCutter.shell_command}}', 'info', 'my file']
+    """
+    lex = shlex.shlex(string, posix=True)
+    lex.whitespace_split = True
+    lex.commenters = ''
+    l_args: List[str] = list()
+    try:
+        l_args.extend(lex)
+    except ValueError:
+        l_args.append(lex.token)
+    return l_args
+
+
+def find_option(d_command: Dict[str, Any], option_name: str) -> Optional[Dict[str, Any]]:
+    l_options: List[Dict[str, Any]] = d_command['options']
+    for d_option in l_options:
+        if option_name in d_option['opts'] or option_name in d_option['secondary_opts']:
+            return d_option
+    return None
+
+
+def get_value_completions(d_param: Dict[str, Any], incomplete: str) -> List[Completion]:
+    """
+    >>> get_value_completions({'choices': ['DEBUG', 'INFO'], 'case_sensitive': False, 'type': 'plain'}, 'd')
+    [('plain', 'DEBUG', '')]
+    >>> get_value_completions({'choices': None, 'case_sensitive': True, 'type': 'file'}, 'some_fi')
+    [('file', 'some_fi', '')]
+    """
+    if d_param['choices'] is not None:
+        if d_param['case_sensitive']:
+            return [('plain', choice, '') for choice in d_param['choices'] if choice.startswith(incomplete)]
+        return [('plain', choice, '') for choice in d_param['choices'] if choice.lower().startswith(incomplete.lower())]
+    if d_param['type'] in ('file', 'dir'):
+        # the shell completes the path
+        return [(d_param['type'], incomplete, '')]
+    return list()
+
+
+def import_package_module(module_name: str) -> Any:
+    return importlib.import_module(f'.{module_name}', __package__)
+
+
+def add_plugin_commands(d_command: Dict[str, Any]) -> None:
+    """
+    adds the commands of the plugin index to a group with plugin commands, sorted like click lists them -
+    the commands of the package win over plugins with the same name
+    """
+    if not d_command.get('plugin_commands'):
+        return
+    plugin_index = import_package_module('plugin_index')
+    d_commands: Dict[str, Any] = dict(d_command['commands'])
+    for cmd_name in plugin_index.get_plugin_index():
+        d_commands.setdefault(cmd_name, {'help': plugin_index.get_short_help(cmd_name), 'options': [], 'arguments': [], 'commands': {},
+                                         'chain': False, 'plugin': True})
+    d_command['commands'] = dict(sorted(d_commands.items()))
+
+
+def get_completions(d_index: Dict[str, Any], l_args: List[str], incomplete: str) -> Optional[List[Completion]]:
+    """
+    the completions of the incomplete word, after the complete words l_args - like the completion of click for cli_main.
+    None after a plugin command, its parameters are not in the index
+
+    >>> d_paint = {'help': 'paint it', 'commands': {}, 'chain': False,
+    ...            'options': [{'opts': ['--brush'], 'secondary_opts': [], 'takes_value': True, 'multiple': False, 'help': 'the brush',
+    ...                         'choices': ['fine', 'wide'], 'case_sensitive': True, 'type': 'plain'}],
+    ...            'arguments': [{'nargs': 1, 'choices': ['red', 'green'], 'case_sensitive': True, 'type': 'plain'}]}
+    >>> d_index = {'command': {'help': '', 'options': [], 'arguments': [], 'chain': False, 'commands': {'paint': d_paint}}}
+    >>> get_completions(d_index, [], 'p')
+    [('plain', 'paint', 'paint it')]
+    >>> get_completions(d_index, ['paint'], '')
+    [('plain', 'red', ''), ('plain', 'green', '')]
+    >>> get_completions(d_index, ['paint'], '--')
+    [('plain', '--brush', 'the brush')]
+    >>> get_completions(d_index, ['paint', '--brush'], 'w')
+    [('plain', 'wide', '')]
+    >>> get_completions(d_index, ['paint'], '--brush=f')
+    [('plain', 'fine', '')]
+    >>> get_completions(d_index, ['paint', '--brush', 'fine', 'red'], '-')
+    []
+    >>> d_index['command']['commands']['hello'] = {'help': 'says hello', 'options': [], 'arguments': [], 'commands': {}, 'chain': False, 'plugin': True}
+    >>> get_completions(d_index, ['hello'], '') is None
+    True
+    """
+    if incomplete.startswith('-') and '=' in incomplete:
+        option_name, _, incomplete = incomplete.partition('=')
+        l_args = l_args + [option_name]
+    d_command, l_used_options, n_arguments, pending_option, options_ended = parse_args(d_index, l_args)
+    if d_command.get('plugin'):
+        return None
+
+    if pending_option is not None:
+        return get_value_completions(pending_option, incomplete)
+    if incomplete and not incomplete[0].isalnum() and not options_ended:
+        return get_option_completions(d_command, l_used_options, incomplete)
+    for d_argument in d_command['arguments']:
+        if n_arguments < 1 or d_argument['nargs'] == -1:
+            return get_value_completions(d_argument, incomplete)
+        n_arguments -= 1
+    return [('plain', name, d_sub_command['help']) for name, d_sub_command in d_command['commands'].items() if name.startswith(incomplete)]
+
+
+def parse_args(d_index: Dict[str, Any], l_args: List[str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], int, Optional[Dict[str, Any]], bool]:
+    """
+    returns the state after the complete words : the command, the options which were given, the number of arguments,
+    the option which still needs its value, and if the options ended with "--"
+    """
+    d_command: Dict[str, Any] = d_index['command']
+    l_used_options: List[Dict[str, Any]] = list()
+    n_arguments = 0
+    pending_option: Optional[Dict[str, Any]] = None
+    options_ended = False
+
+    for arg in l_args:
+        if pending_option is not None:
+            pending_option = None
+        elif arg == '--' and not options_ended:
+            options_ended = True
+        elif arg.startswith('-') and len(arg) > 1 and not options_ended:
+            d_option = find_option(d_command, arg.partition('=')[0])
+            if d_option is not None:
+                l_used_options.append(d_option)
+                if d_option['takes_value'] and '=' not in arg:
+                    pending_option = d_option
+        elif arg in d_command['commands'] and n_arguments >= len(d_command['arguments']):
+            d_command = d_command['commands'][arg]
+            l_used_options = list()
+            n_arguments = 0
+            options_ended = False
+        else:
+            n_arguments += 1
+    return d_command, l_used_options, n_arguments, pending_option, options_ended
+
+
+def get_option_completions(d_command: Dict[str, Any], l_used_options: List[Dict[str, Any]], incomplete: str) -> List[Completion]:
+    """ the options of the command - without the options which were given already, unless they can be given more than once """
+    l_completions: List[Completion] = list()
+    for d_option in d_command['options']:
+        if d_option in l_used_options and not d_option['multiple']:
+            continue
+        l_completions.extend(('plain', name, d_option['help']) for name in d_option['opts'] + d_option['secondary_opts']
+                             if name.startswith(incomplete))
+    return l_completions
+
+
+def get_completion_args(instruction: str) -> Tuple[List[str], str]:
+    """ the complete words and the incomplete word, from the environment variables which the completion scripts of click set """
+    l_words = split_arg_string(os.environ['COMP_WORDS'])
+    if instruction == 'fish_complete':
+        incomplete = os.environ['COMP_CWORD']
+        if incomplete:
+            incomplete = split_arg_string(incomplete)[0]
+        l_args = l_words[1:]
+        if incomplete and l_args and l_args[-1] == incomplete:
+            l_args.pop()
+        return l_args, incomplete
+    cword = int(os.environ['COMP_CWORD'])
+    l_args = l_words[1:cword]
+    incomplete = l_words[cword] if cword < len(l_words) else ''
+    return l_args, incomplete
+
+
+def format_completion(instruction: str, completion: Completion) -> str:
+    """
+    the completion in the format of the completion scripts of click
+
+    >>> format_completion('bash_complete', ('plain', 'info', 'get program information'))
+    'plain,info'
+    >>> format_completion('zsh_complete', ('plain', 'a:b', ''))
+    'plain\\na:b\\n_'
+    >>> format_completion('fish_complete', ('plain', 'info', 'get program information'))
+    'plain,info\\tget program information'
+    """
+    value_type, value, help_text = completion
+    if instruction == 'zsh_complete':
+        if help_text:
+            return f'{value_type}\n' + value.replace(':', '\\:') + f'\n{help_text}'
+        return f'{value_type}\n{value}\n_'
+    if instruction == 'fish_complete' and help_text:
+        help_text = help_text.replace('\n', '\\n').replace('\t', ' ')
+        return f'{value_type},{value}\t{help_text}'
+    return f'{value_type},{value}'
+
+
+def complete_from_index() -> bool:
+    """ prints the completions from the index - returns False if the index can not be used, then click completes """
+    instruction = os.environ.get(COMPLETE_VAR, '')
+    if instruction not in ('bash_complete', 'zsh_complete', 'fish_complete'):
+        # for example "bash_source", the completion script is created by click
+        return False
+    d_index = load_index()
+    if d_index is None:
+        return False
+    add_plugin_commands(d_index['command'])
+    l_args, incomplete = get_completion_args(instruction)
+    l_completions = get_completions(d_index, l_args, incomplete)
+    if l_completions is None:
+        return False
+    sys.stdout.write('\n'.join(format_completion(instruction, completion) for completion in l_completions) + '\n')
+    return True
+
+
+def run_cli() -> None:
+    module_name, function_name = CLI_ENTRY_POINT.split(':')
+    cli_entry_point = getattr(import_package_module(module_name), function_name)
+    cli_entry_point()
+
+
+def main() -> None:
+    """ the console script : completes from the index on a Tab press, otherwise runs the cli """
+    if COMPLETE_VAR in os.environ and complete_from_index():
+        sys.exit(0)
+    run_cli()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['build']:
+        build_index()
+    else:
+        sys.stderr.write('usage : python -m {{PizzaCutter.package_name}}.completion_index build\n')
+        sys.exit(2)
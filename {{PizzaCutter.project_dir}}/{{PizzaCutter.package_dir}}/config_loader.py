@@ -0,0 +1,365 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import dataclasses
+import hashlib
+import json
+import os
+import pathlib
+import pickle
+import sys
+import typing
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar
+
+# PROJ
+try:
+    from . import user_dirs
+except ImportError:                         # pragma: no cover
+    # imports for doctest, and for the cli module imported as script
+    import user_dirs                        # type: ignore  # pragma: no cover
+
+APP_NAME = '{{PizzaCutter.package_name}}'
+# the environment variable of a setting is ENV_PREFIX + the name of the setting in upper case
+ENV_PREFIX = APP_NAME.upper() + '_'
+# the layout of the cache files - cache files with another version are ignored
+CACHE_VERSION = 1
+TRUE_STRINGS = ['1', 'true', 'yes', 'on']
+FALSE_STRINGS = ['0', 'false', 'no', 'off']
+
+T = TypeVar('T')
+# the source (like the path of a config file) and the settings of each layer, the path, modification time and size of the config files
+Layers = List[Tuple[str, Dict[str, Any]]]
+FilesKey = Tuple[Tuple[str, int, int], ...]
+
+
+class ConfigError(Exception):
+    """ a setting is unknown or has the wrong type, or a config file can not be parsed """
+    pass
+
+
+class _Config(object):
+    # the settings from the command line, they override all other layers - set by the cli option --set KEY=VALUE
+    overrides: Dict[str, str] = dict()
+    # the directory of the cache files - None for the cache directory of the user, see get_cache_dir()
+    path_cache_dir: Optional[pathlib.Path] = None
+    # False : parse the config files on every load
+    use_cache: bool = True
+
+
+config = _Config()
+
+# the configurations loaded by get_config, by class
+_d_configs: Dict[type, Any] = dict()
+
+
+def get_config_file_paths(app_name: str = APP_NAME) -> List[pathlib.Path]:
+    """
+    the config files, from the lowest to the highest priority : system, user, project (in the current directory)
+        posix   : /etc/<app_name>/config.toml, $XDG_CONFIG_HOME/<app_name>/config.toml (default ~/.config), ./<app_name>.toml
+        windows : %PROGRAMDATA%\\<app_name>\\config.toml, %APPDATA%\\<app_name>\\config.toml, .\\<app_name>.toml
+
+    >>> [path.name for path in get_config_file_paths('demo')]
+    ['config.toml', 'config.toml', 'demo.toml']
+    """
+    if sys.platform == 'win32':
+        path_system_dir = pathlib.Path(os.environ.get('PROGRAMDATA') or 'C:/ProgramData')
+        path_user_dir = pathlib.Path(os.environ.get('APPDATA') or pathlib.Path.home() / 'AppData/Roaming')
+    else:
+        path_system_dir = pathlib.Path('/etc')
+        path_user_dir = pathlib.Path(os.environ.get('XDG_CONFIG_HOME') or pathlib.Path.home() / '.config')
+    return [path_system_dir / app_name / 'config.toml', path_user_dir / app_name / 'config.toml', pathlib.Path.cwd() / f'{app_name}.toml']
+
+
+def get_cache_dir() -> pathlib.Path:
+    """ the directory of the cache files : config.path_cache_dir, otherwise the cache directory of the user """
+    return config.path_cache_dir or user_dirs.get_user_cache_dir()
+
+
+def get_cache_file_path(l_paths_config_files: Sequence[pathlib.Path]) -> pathlib.Path:
+    """
+    one cache file per set of config files - the project file depends on the current directory
+
+    >>> get_cache_file_path([pathlib.Path('a.toml')]) == get_cache_file_path([pathlib.Path('b.toml')])
+    False
+    """
+    paths_hash = hashlib.sha256('\0'.join(str(path) for path in l_paths_config_files).encode('utf-8')).hexdigest()[:16]
+    return get_cache_dir() / f'config_cache_{paths_hash}.pickle'
+
+
+def get_files_key(l_paths: Sequence[pathlib.Path]) -> FilesKey:
+    """
+    the path, modification time and size of each file - (path, -1, -1) if it does not exist
+
+    >>> get_files_key([pathlib.Path('does_not_exist.toml')])
+    (('does_not_exist.toml', -1, -1),)
+    """
+    l_key: List[Tuple[str, int, int]] = list()
+    for path in l_paths:
+        try:
+            stat = os.stat(path)
+            l_key.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            l_key.append((str(path), -1, -1))
+    return tuple(l_key)
+
+
+def parse_toml_file(path: pathlib.Path) -> Dict[str, Any]:
+    """
+    parses the file with tomllib (python 3.11 and later) or toml - the parser is only imported if a file is parsed
+
+    >>> parse_toml_file(pathlib.Path(__file__))
+    Traceback (most recent call last):
+        ...
+    config_loader.ConfigError: can not parse the config file "...config_loader.py": ...
+    """
+    try:
+        if sys.version_info >= (3, 11):
+            import tomllib
+            with open(path, 'rb') as toml_file:
+                return tomllib.load(toml_file)
+        else:
+            import toml
+            return dict(toml.load(str(path)))
+    # tomllib.TOMLDecodeError and toml.TomlDecodeError are ValueErrors
+    except ValueError as exc:
+        raise ConfigError(f'can not parse the config file "{path}": {exc}') from exc
+
+
+def read_cache(path_cache_file: pathlib.Path, files_key: FilesKey) -> Optional[Layers]:
+    """
+    the file layers from the cache file, if it belongs to files_key - otherwise None. a broken cache file is ignored.
+    """
+    try:
+        cache_version, cached_files_key, l_file_layers = pickle.loads(path_cache_file.read_bytes())
+    except Exception:
+        return None
+    if cache_version != CACHE_VERSION or cached_files_key != files_key:
+        return None
+    return typing.cast(Layers, l_file_layers)
+
+
+def write_cache(path_cache_file: pathlib.Path, files_key: FilesKey, l_file_layers: Layers) -> None:
+    """
+    writes the cache file atomically, a cache which can not be written is skipped
+    """
+    path_temp_file = path_cache_file.with_name(f'{path_cache_file.name}.{os.getpid()}.tmp')
+    try:
+        path_cache_file.parent.mkdir(parents=True, exist_ok=True)
+        path_temp_file.write_bytes(pickle.dumps((CACHE_VERSION, files_key, l_file_layers), protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(path_temp_file, path_cache_file)
+    except OSError:
+        path_temp_file.unlink(missing_ok=True)
+
+
+def load_file_layers(l_paths_config_files: Sequence[pathlib.Path], path_cache_file: Optional[pathlib.Path] = None) -> Layers:
+    """
+    the source and the settings of every existing config file. with path_cache_file, the result is cached together with the
+    modification times and sizes of the config files : as long as they are the same, the files are not parsed again.
+    the files are checked before they are parsed - a file which changes during the load is parsed again next time.
+    """
+    files_key = get_files_key(l_paths_config_files)
+    if path_cache_file is not None:
+        l_cached_file_layers = read_cache(path_cache_file, files_key)
+        if l_cached_file_layers is not None:
+            return l_cached_file_layers
+
+    l_file_layers: Layers = list()
+    for path_config_file, (_, _, size) in zip(l_paths_config_files, files_key):
+        if size != -1:
+            l_file_layers.append((f'the config file "{path_config_file}"', parse_toml_file(path_config_file)))
+    if path_cache_file is not None:
+        write_cache(path_cache_file, files_key, l_file_layers)
+    return l_file_layers
+
+
+def convert_value(value: Any, value_type: Any) -> Any:
+    """
+    returns the value as value_type, or raises ValueError - strings from environment variables and overrides are parsed :
+    bool : 1, true, yes, on / 0, false, no, off - list and dict : json - Optional[...] : an empty string is None
+
+    >>> convert_value('yes', bool), convert_value('2', int), convert_value(2, float), convert_value('["a", "b"]', List[str])
+    (True, 2, 2.0, ['a', 'b'])
+    >>> convert_value('', Optional[int]) is None, convert_value('3', Optional[int])
+    (True, 3)
+    >>> convert_value(True, int)
+    Traceback (most recent call last):
+        ...
+    ValueError: expected int, got True
+    """
+    if value_type is Any:
+        return value
+    if typing.get_origin(value_type) is typing.Union:
+        return convert_union_value(value, typing.get_args(value_type))
+    if value_type in (bool, int, float, str):
+        return convert_scalar_value(value, value_type)
+    container_type = typing.get_origin(value_type) or value_type
+    if isinstance(value, str) and container_type in (list, dict):
+        value = json.loads(value)
+    if isinstance(container_type, type) and not isinstance(value, container_type):
+        raise ValueError(f'expected {container_type.__name__}, got {value!r}')
+    return value
+
+
+def convert_union_value(value: Any, l_value_types: Sequence[Any]) -> Any:
+    if type(None) in l_value_types and value in (None, ''):
+        return None
+    for value_type in l_value_types:
+        if value_type is not type(None):
+            try:
+                return convert_value(value, value_type)
+            except ValueError:
+                pass
+    raise ValueError(f'expected {" or ".join(getattr(value_type, "__name__", str(value_type)) for value_type in l_value_types)}, got {value!r}')
+
+
+def convert_scalar_value(value: Any, value_type: type) -> Any:
+    if isinstance(value, str) and value_type is not str:
+        if value_type is bool and value.strip().lower() in TRUE_STRINGS + FALSE_STRINGS:
+            return value.strip().lower() in TRUE_STRINGS
+        if value_type in (int, float):
+            return value_type(value)
+    # bool is a subclass of int, but no int setting
+    elif isinstance(value, value_type) and not (isinstance(value, bool) and value_type is not bool):
+        return value
+    elif value_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    raise ValueError(f'expected {value_type.__name__}, got {value!r}')
+
+
+def parse_overrides(l_overrides: Iterable[str]) -> Dict[str, str]:
+    """
+    the overrides from the command line
+
+    >>> parse_overrides(['port=9000', 'tags=["a", "b=c"]'])
+    {'port': '9000', 'tags': '["a", "b=c"]'}
+    >>> parse_overrides(['port'])
+    Traceback (most recent call last):
+        ...
+    config_loader.ConfigError: the override "port" needs to be KEY=VALUE
+    """
+    d_overrides: Dict[str, str] = dict()
+    for override in l_overrides:
+        name, separator, value = override.partition('=')
+        if not separator:
+            raise ConfigError(f'the override "{override}" needs to be KEY=VALUE')
+        d_overrides[name.strip()] = value
+    return d_overrides
+
+
+def load_config(config_class: Type[T], l_paths_config_files: Optional[Sequence[pathlib.Path]] = None,
+                environ: Optional[Mapping[str, str]] = None, overrides: Optional[Mapping[str, str]] = None) -> T:
+    """
+    returns the settings as config_class (a frozen dataclass), merged from the layers - from the lowest to the highest priority :
+        - the defaults of config_class
+        - the config files - default : system, user and project, see get_config_file_paths()
+        - the environment variables ENV_PREFIX + the name of the setting in upper case
+        - the overrides - default : config.overrides, from the cli option --set KEY=VALUE
+    the config files are cached (see load_file_layers) in get_cache_dir(), unless config.use_cache is False.
+
+    >>> import tempfile
+    >>> @dataclasses.dataclass(frozen=True)
+    ... class DemoConfig:
+    ...     host: str = 'localhost'
+    ...     port: int = 8080
+    ...     debug: bool = False
+    ...     tags: List[str] = dataclasses.field(default_factory=list)
+    >>> temp_dir = tempfile.TemporaryDirectory()
+    >>> config.path_cache_dir = pathlib.Path(temp_dir.name)
+    >>> path_config_file = config.path_cache_dir / 'demo.toml'
+    >>> _ = path_config_file.write_text('host = "example.com"\\nport = 80\\ntags = ["a"]\\n')
+    >>> load_config(DemoConfig, [path_config_file], environ={ENV_PREFIX + 'PORT': '8443'}, overrides={'debug': 'yes'})
+    DemoConfig(host='example.com', port=8443, debug=True, tags=['a'])
+
+    >>> # the second load reads the cache, the file is parsed again after it changed
+    >>> assert read_cache(get_cache_file_path([path_config_file]), get_files_key([path_config_file])) is not None
+    >>> load_config(DemoConfig, [path_config_file], environ={})
+    DemoConfig(host='example.com', port=80, debug=False, tags=['a'])
+    >>> _ = path_config_file.write_text('colour = "red"\\n')
+    >>> load_config(DemoConfig, [path_config_file], environ={})
+    Traceback (most recent call last):
+        ...
+    config_loader.ConfigError: unknown setting "colour" in the config file ".../demo.toml"
+    >>> config.path_cache_dir = None
+    >>> temp_dir.cleanup()
+
+    >>> load_config(DemoConfig, [], environ={ENV_PREFIX + 'PORT': 'http'})
+    Traceback (most recent call last):
+        ...
+    config_loader.ConfigError: setting "port" in the environment variable ..._PORT: invalid literal for int() with base 10: 'http'
+    """
+    if l_paths_config_files is None:
+        l_paths_config_files = get_config_file_paths()
+    if environ is None:
+        environ = os.environ
+    if overrides is None:
+        overrides = config.overrides
+    path_cache_file = get_cache_file_path(l_paths_config_files) if config.use_cache else None
+
+    d_field_types = get_field_types(config_class)
+    l_layers = [*load_file_layers(l_paths_config_files, path_cache_file), *get_env_layers(d_field_types, environ), ('the overrides', dict(overrides))]
+    return config_class(**merge_layers(d_field_types, l_layers))
+
+
+def get_field_types(config_class: type) -> Dict[str, Any]:
+    """
+    the types of the fields of the dataclass, by name
+
+    >>> @dataclasses.dataclass(frozen=True)
+    ... class DemoConfig:
+    ...     port: int = 8080
+    >>> get_field_types(DemoConfig)
+    {'port': <class 'int'>}
+    """
+    d_type_hints = typing.get_type_hints(config_class)
+    return {field.name: d_type_hints[field.name] for field in dataclasses.fields(typing.cast(Any, config_class))}
+
+
+def get_env_layers(d_field_types: Dict[str, Any], environ: Mapping[str, str]) -> Layers:
+    """
+    >>> get_env_layers({'port': int, 'host': str}, {ENV_PREFIX + 'PORT': '9000', 'PORT': '80'})
+    [('the environment variable ..._PORT', {'port': '9000'})]
+    """
+    l_env_layers: Layers = list()
+    for name in d_field_types:
+        env_name = ENV_PREFIX + name.upper()
+        if env_name in environ:
+            l_env_layers.append((f'the environment variable {env_name}', {name: environ[env_name]}))
+    return l_env_layers
+
+
+def merge_layers(d_field_types: Dict[str, Any], l_layers: Layers) -> Dict[str, Any]:
+    """
+    the settings of all layers, converted to the types of the fields - a setting of a later layer replaces the earlier one
+
+    >>> merge_layers({'port': int}, [('the config file "a.toml"', {'port': 80}), ('the overrides', {'port': '8080'})])
+    {'port': 8080}
+    >>> merge_layers({'port': int}, [('the config file "a.toml"', {'colour': 'red'})])
+    Traceback (most recent call last):
+        ...
+    config_loader.ConfigError: unknown setting "colour" in the config file "a.toml"
+    """
+    d_settings: Dict[str, Any] = dict()
+    for source, d_layer in l_layers:
+        for name, value in d_layer.items():
+            if name not in d_field_types:
+                raise ConfigError(f'unknown setting "{name}" in {source}')
+            try:
+                d_settings[name] = convert_value(value, d_field_types[name])
+            except ValueError as exc:
+                raise ConfigError(f'setting "{name}" in {source}: {exc}') from exc
+    return d_settings
+
+
+def get_config(config_class: Type[T]) -> T:
+    """
+    load_config(config_class) once per process - the following calls return the same object
+
+    >>> @dataclasses.dataclass(frozen=True)
+    ... class DemoConfig:
+    ...     port: int = 8080
+    >>> config.use_cache = False
+    >>> assert get_config(DemoConfig) is get_config(DemoConfig)
+    >>> config.use_cache = True
+    """
+    if config_class not in _d_configs:
+        _d_configs[config_class] = load_config(config_class)
+    return typing.cast(T, _d_configs[config_class])
@@ -0,0 +1,443 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import atexit
+import dataclasses
+import enum
+import functools
+import hashlib
+import os
+import pathlib
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TypeVar, cast
+
+# PROJ
+try:
+    from . import user_dirs
+except ImportError:                         # pragma: no cover
+    # imports for doctest, and for the cli module imported as script
+    import user_dirs                        # type: ignore  # pragma: no cover
+
+APP_NAME = '{{PizzaCutter.package_name}}'
+# the environment variable to bypass the cache : <PACKAGE_NAME>_CACHE=off - set by the cli option --no-cache, so worker processes see it
+ENV_CACHE = APP_NAME.upper() + '_CACHE'
+OFF_STRINGS = ['0', 'off', 'false', 'no']
+# the layout of the database - a database with another version is cleared
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, function TEXT NOT NULL, value BLOB NOT NULL, size INTEGER NOT NULL,
+                                    created REAL NOT NULL, accessed REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS stats (function TEXT PRIMARY KEY, hits INTEGER NOT NULL DEFAULT 0, misses INTEGER NOT NULL DEFAULT 0);
+"""
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+def _is_enabled_by_env() -> bool:
+    return os.environ.get(ENV_CACHE, '').lower() not in OFF_STRINGS
+
+
+class _Config(object):
+    # False : the decorated functions are called directly - set by the cli option --no-cache
+    enabled: bool = _is_enabled_by_env()
+    # the directory of the database - None for the cache directory of the user, see get_cache_dir()
+    path_cache_dir: Optional[pathlib.Path] = None
+    # the least recently used entries are evicted, when the values together are bigger
+    max_size_mb: float = 256.0
+    # entries older than that are computed again - None : no age limit. memoize(max_age_seconds=...) sets it per function
+    max_age_seconds: Optional[float] = 30 * 24 * 3600.0
+    # the time of the last access is written at most every n seconds per entry - a hit does not always need a write
+    touch_interval_seconds: float = 60.0
+    # the hits and misses are counted in the process, and written with the next write, at most every n seconds on hits, and at exit
+    stats_flush_seconds: float = 10.0
+
+
+config = _Config()
+
+
+class _State(object):
+    # one connection per process - a forked worker opens its own
+    lock = threading.RLock()
+    connection: Optional[sqlite3.Connection] = None
+    pid: int = 0
+    stats_registered: bool = False
+    # the hits and misses of this process which are not written yet, [hits, misses] by function - and the time of the last write
+    d_pending_stats: Dict[str, List[int]] = dict()
+    stats_written: float = 0.0
+    # the process which registered the write of the pending statistics at exit
+    stats_flush_pid: int = 0
+
+
+_state = _State()
+
+
+def get_cache_dir() -> pathlib.Path:
+    """ the directory of the database : config.path_cache_dir, otherwise the cache directory of the user """
+    return config.path_cache_dir or user_dirs.get_user_cache_dir()
+
+
+def _hash_value(hasher: 'hashlib._Hash', value: Any) -> None:
+    """
+    feeds the value with its type into the hasher - the same for equal values in every process and on every run,
+    unlike hash() (randomized for str) and pickle (the order of sets and dicts)
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        hasher.update(f'{type(value).__name__}:{value!r};'.encode('utf-8'))
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f'{type(value).__name__}[{len(value)}:'.encode('utf-8'))
+        for item in value:
+            _hash_value(hasher, item)
+        hasher.update(b']')
+    elif isinstance(value, (set, frozenset)):
+        hasher.update(f'{type(value).__name__}{{{len(value)}:{",".join(sorted(get_key(item) for item in value))}}}'.encode('utf-8'))
+    elif isinstance(value, Mapping):
+        l_items = sorted((get_key(key), get_key(item)) for key, item in value.items())
+        hasher.update(f'{type(value).__name__}{{{len(value)}:{",".join(f"{key}={item}" for key, item in l_items)}}}'.encode('utf-8'))
+    elif isinstance(value, enum.Enum):
+        hasher.update(f'{type(value).__qualname__}.{value.name};'.encode('utf-8'))
+    elif isinstance(value, pathlib.PurePath):
+        hasher.update(f'{type(value).__name__}:{value};'.encode('utf-8'))
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        hasher.update(f'{type(value).__module__}.{type(value).__qualname__}'.encode('utf-8'))
+        _hash_value(hasher, {field.name: getattr(value, field.name) for field in dataclasses.fields(value)})
+    else:
+        raise TypeError(f'the disk cache can not hash an argument of type "{type(value).__qualname__}"')
+
+
+def get_key(*values: Any) -> str:
+    """
+    the stable hash of the values - None, bool, numbers, str, bytes, and lists, tuples, sets, dicts, dataclasses, enums and paths of them
+
+    >>> assert get_key({'b': {2, 1}, 'a': [1.5, 'x']}) == get_key({'a': [1.5, 'x'], 'b': {1, 2}})
+    >>> assert get_key(1) != get_key(1.0) != get_key(True) != get_key('1')
+    >>> assert get_key((1, 2)) != get_key([1, 2]) != get_key((1, (2, )))
+    >>> get_key(object())
+    Traceback (most recent call last):
+        ...
+    TypeError: the disk cache can not hash an argument of type "object"
+    """
+    hasher = hashlib.sha256()
+    _hash_value(hasher, values)
+    return hasher.hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    """
+    the connection of this process, opened on first use. WAL : readers do not block the writer, and the writers of several
+    processes wait for each other (busy timeout) - every write is one short transaction.
+    """
+    if _state.connection is not None and _state.pid == os.getpid():
+        return _state.connection
+    path_cache_dir = get_cache_dir()
+    path_cache_dir.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(path_cache_dir / 'disk_cache.sqlite3'), timeout=30.0, isolation_level=None, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    with _transaction(connection):
+        for statement in SCHEMA.split(';'):
+            if statement.strip():
+                connection.execute(statement)
+        row = connection.execute("SELECT value FROM meta WHERE name = 'schema_version'").fetchone()
+        if row is None or row[0] != SCHEMA_VERSION:
+            _clear_tables(connection)
+    _state.connection, _state.pid = connection, os.getpid()
+    return connection
+
+
+class _transaction(object):
+    """ BEGIN IMMEDIATE ... COMMIT (ROLLBACK on an exception) - takes the write lock of the database at the start """
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        self.connection.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def _clear_tables(connection: sqlite3.Connection) -> None:
+    connection.execute('DELETE FROM entries')
+    connection.execute('DELETE FROM stats')
+    connection.execute('DELETE FROM meta')
+    connection.execute("INSERT INTO meta (name, value) VALUES ('schema_version', ?), ('total_size', 0)", (SCHEMA_VERSION, ))
+
+
+def _count(function_name: str, hits: int = 0, misses: int = 0) -> None:
+    """ counts hits and misses in this process, they are written by _write_stats() - the caller holds the lock """
+    if _state.stats_flush_pid != os.getpid():
+        _register_flush_at_exit()
+    l_function_stats = _state.d_pending_stats.setdefault(function_name, [0, 0])
+    l_function_stats[0] += hits
+    l_function_stats[1] += misses
+
+
+def _write_stats(connection: sqlite3.Connection) -> None:
+    """ adds the pending hits and misses of this process to the statistics - in the transaction of the caller """
+    connection.executemany('INSERT INTO stats (function, hits, misses) VALUES (?, ?, ?) ON CONFLICT (function) '
+                           'DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses',
+                           [(function_name, hits, misses) for function_name, (hits, misses) in _state.d_pending_stats.items()])
+    _state.d_pending_stats = dict()
+    _state.stats_written = time.monotonic()
+
+
+def _flush_stats() -> None:
+    """ writes the pending hits and misses of this process """
+    with _state.lock:
+        if _state.d_pending_stats:
+            connection = _connect()
+            with _transaction(connection):
+                _write_stats(connection)
+
+
+def _flush_stats_at_exit() -> None:
+    try:
+        _flush_stats()
+    except sqlite3.Error:                                                       # pragma: no cover
+        pass                                                                    # pragma: no cover
+
+
+def _register_flush_at_exit() -> None:
+    """
+    the pending statistics are written at exit - the worker processes of multiprocessing (like the workers of --jobs) end with os._exit(),
+    they run the finalizers of multiprocessing instead of atexit. writing twice does no harm, the second write has nothing to write
+    """
+    atexit.register(_flush_stats_at_exit)
+    if 'multiprocessing' in sys.modules:
+        import multiprocessing.util
+        multiprocessing.util.Finalize(None, _flush_stats_at_exit, exitpriority=10)
+    _state.stats_flush_pid = os.getpid()
+    _state.stats_written = time.monotonic()
+
+
+def _get(key: str, function_name: str, max_age_seconds: Optional[float]) -> Tuple[bool, Any]:
+    """
+    (True, value) for a hit, (False, None) for a miss - expired entries and entries which can not be unpickled are misses.
+    a hit only reads : the write lock is taken if the time of the access needs to be written, or the pending statistics
+    """
+    now = time.time()
+    with _state.lock:
+        connection = _connect()
+        row = connection.execute('SELECT value, created, accessed FROM entries WHERE key = ?', (key, )).fetchone()
+        if row is None or (max_age_seconds is not None and row[1] < now - max_age_seconds):
+            return False, None
+        try:
+            value = pickle.loads(row[0])
+        except Exception:
+            return False, None
+        _count(function_name, hits=1)
+        touch = row[2] < now - config.touch_interval_seconds
+        if touch or time.monotonic() - _state.stats_written > config.stats_flush_seconds:
+            with _transaction(connection):
+                if touch:
+                    connection.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+                _write_stats(connection)
+    return True, value
+
+
+def _put(key: str, function_name: str, value: Any) -> None:
+    """ stores the value and evicts the least recently used entries, if the cache got too big - values which can not be pickled are skipped """
+    try:
+        value_bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        value_bytes = None
+    now = time.time()
+    with _state.lock:
+        connection = _connect()
+        _count(function_name, misses=1)
+        with _transaction(connection):
+            # the write lock is taken anyway, the pending statistics are written with the value
+            _write_stats(connection)
+            if value_bytes is None:
+                return
+            row = connection.execute('SELECT size FROM entries WHERE key = ?', (key, )).fetchone()
+            connection.execute('INSERT OR REPLACE INTO entries (key, function, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)',
+                               (key, function_name, value_bytes, len(value_bytes), now, now))
+            connection.execute("UPDATE meta SET value = value + ? WHERE name = 'total_size'", (len(value_bytes) - (row[0] if row else 0), ))
+            _evict(connection, now)
+
+
+def _evict(connection: sqlite3.Connection, now: float) -> None:
+    """ deletes the expired entries and the least recently used entries, down to 90% of config.max_size_mb """
+    max_size = int(config.max_size_mb * 1024 * 1024)
+    total_size = connection.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+    if total_size <= max_size:
+        return
+    if config.max_age_seconds is not None:
+        connection.execute('DELETE FROM entries WHERE created < ?', (now - config.max_age_seconds, ))
+        total_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+    l_evicted_keys: List[str] = list()
+    for key, size in connection.execute('SELECT key, size FROM entries ORDER BY accessed'):
+        if total_size <= max_size * 0.9:
+            break
+        l_evicted_keys.append(key)
+        total_size -= size
+    connection.executemany('DELETE FROM entries WHERE key = ?', [(key, ) for key in l_evicted_keys])
+    connection.execute("UPDATE meta SET value = ? WHERE name = 'total_size'", (total_size, ))
+
+
+def memoize(version: str = '', max_age_seconds: Optional[float] = None) -> Callable[[F], F]:
+    """
+    caches the results of the decorated function on disk, by its arguments - for expensive results which only depend on the arguments,
+    like parsed input files (pass the path and its modification time) or derived data. the arguments are hashed with get_key(),
+    the results are pickled - change the version, if the function returns other results for the same arguments.
+    the cache can be used from several threads and processes (like the workers of --jobs) at the same time.
+    if the cache can not be read or written (for instance a full disk), the function is called as usual.
+    max_age_seconds : older results are computed again - default : config.max_age_seconds
+
+    >>> import tempfile
+    >>> temp_dir = tempfile.TemporaryDirectory()
+    >>> config.path_cache_dir = pathlib.Path(temp_dir.name)
+    >>> @memoize(version='1')
+    ... def demo_square(value: int) -> int:
+    ...     print('computing', value)
+    ...     return value * value
+    >>> demo_square(3)
+    computing 3
+    9
+    >>> demo_square(3)
+    9
+    >>> [(function.rsplit('.', 1)[-1], d_stats['hits'], d_stats['misses'], d_stats['entries']) for function, d_stats in get_stats().items()]
+    [('demo_square', 1, 1, 1)]
+    >>> clear()
+    >>> demo_square(3)
+    computing 3
+    9
+    >>> close()
+    >>> config.path_cache_dir = None
+    >>> temp_dir.cleanup()
+    """
+    def decorator(func: F) -> F:
+        function_name = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def memoized(*args: Any, **kwargs: Any) -> Any:
+            if not config.enabled:
+                return func(*args, **kwargs)
+            key = get_key(function_name, version, args, kwargs)
+            try:
+                hit, value = _get(key, function_name, config.max_age_seconds if max_age_seconds is None else max_age_seconds)
+            except sqlite3.Error:
+                return func(*args, **kwargs)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            try:
+                _put(key, function_name, value)
+            except sqlite3.Error:
+                pass
+            return value
+        return cast(F, memoized)
+    return decorator
+
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    """
+    the hits and misses of all processes since the cache was cleared, the number of entries and their size in bytes, by function.
+    the pending statistics of other running processes are written at the latest after config.stats_flush_seconds, or at their exit
+    """
+    with _state.lock:
+        _flush_stats()
+        connection = _connect()
+        d_stats: Dict[str, Dict[str, int]] = {function: {'hits': hits, 'misses': misses, 'entries': 0, 'size': 0}
+                                              for function, hits, misses in connection.execute('SELECT function, hits, misses FROM stats')}
+        for function, entries, size in connection.execute('SELECT function, COUNT(*), SUM(size) FROM entries GROUP BY function'):
+            d_stats.setdefault(function, {'hits': 0, 'misses': 0, 'entries': 0, 'size': 0}).update(entries=entries, size=size)
+    return d_stats
+
+
+def format_stats(d_stats: Dict[str, Dict[str, int]]) -> List[str]:
+    """
+    the lines of the statistics table
+
+    >>> print('\\n'.join(format_stats({'pkg.parse': {'hits': 3, 'misses': 1, 'entries': 1, 'size': 2048}})))
+    disk cache                                    hits   misses  hit rate  entries    size kB
+    pkg.parse                                        3        1     75.0%        1        2.0
+    """
+    l_lines = [f'{"disk cache":<40}{"hits":>10}{"misses":>9}{"hit rate":>10}{"entries":>9}{"size kB":>11}']
+    for function, d_function_stats in sorted(d_stats.items()):
+        calls = d_function_stats['hits'] + d_function_stats['misses']
+        hit_rate = f'{d_function_stats["hits"] / calls * 100:.1f}%' if calls else '-'
+        l_lines.append(f'{function:<40}{d_function_stats["hits"]:>10}{d_function_stats["misses"]:>9}{hit_rate:>10}'
+                       f'{d_function_stats["entries"]:>9}{d_function_stats["size"] / 1024:>11.1f}')
+    return l_lines
+
+
+def clear() -> None:
+    """ deletes all entries and statistics """
+    with _state.lock:
+        _state.d_pending_stats = dict()
+        connection = _connect()
+        with _transaction(connection):
+            _clear_tables(connection)
+        connection.execute('VACUUM')
+
+
+def close() -> None:
+    """ closes the connection of this process, after writing the pending statistics - it is opened again on the next use """
+    with _state.lock:
+        _flush_stats_at_exit()
+        if _state.connection is not None and _state.pid == os.getpid():
+            _state.connection.close()
+        _state.connection = None
+
+
+def setup(bypass: bool = False, clear_cache: bool = False, report_stats: bool = False) -> None:
+    """
+    the settings of the cli options :
+        bypass : --no-cache, the decorated functions are called directly, also in worker processes
+        clear_cache : --clear-cache, deletes all entries and statistics before the run
+        report_stats : --cache-stats, prints the statistics to stderr at exit
+
+    >>> setup()
+    """
+    if bypass:
+        config.enabled = False
+        os.environ[ENV_CACHE] = 'off'
+    if clear_cache:
+        clear()
+    if report_stats and not _state.stats_registered:
+        atexit.register(_report_stats)
+        _state.stats_registered = True
+
+
+def reload_config() -> bool:
+    """
+    reads the environment variable ENV_CACHE again - the children of the warm server (warm_cli.py) get the environment of the client.
+    returns True, the setting applies to the functions which were decorated already
+
+    >>> enabled = config.enabled
+    >>> reload_config()
+    True
+    >>> config.enabled = enabled
+    """
+    config.enabled = _is_enabled_by_env()
+    return True
+
+
+def _report_stats() -> None:
+    try:
+        print('\n'.join(format_stats(get_stats())), file=sys.stderr)
+    except sqlite3.Error as exc:                                                # pragma: no cover
+        print(f'disk cache statistics not available: {exc}', file=sys.stderr)   # pragma: no cover
+
+
+def _after_fork_in_child() -> None:
+    """
+    a forked child (for instance a worker process) must not use the connection of the parent - it opens its own.
+    the lock might have been held by another thread at the fork, the child gets a new one.
+    the pending statistics belong to the parent, the parent writes them.
+    """
+    _state.lock = threading.RLock()                                             # pragma: no cover
+    _state.connection = None                                                    # pragma: no cover
+    _state.d_pending_stats = dict()                                             # pragma: no cover
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,138 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Any, Optional
+
+LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+LOG_SINKS_HELP = 'log to "stderr", "stdout", "null" or to the given file path'
+LOG_FORMAT = '%(asctime)s %(levelname)-8s %(name)s: %(message)s'
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    puts the LogRecord itself on the queue, the message (msg % args) is formatted in the listener thread.
+    logging.handlers.QueueHandler formats the record in the calling thread, because the record might be pickled -
+    here the queue only lives in this process, so the hot path only pays for the LogRecord and the queue.put.
+    the args are formatted later - dont pass objects which are changed after the log call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _State(object):
+    # setup_logging and shutdown_logging can be called from several threads at the same time
+    lock = threading.RLock()
+    listener: Optional[logging.handlers.QueueListener] = None
+    queue_handler: Optional[logging.Handler] = None
+    sink_handler: Optional[logging.Handler] = None
+    atexit_registered: bool = False
+
+
+_state = _State()
+
+
+def get_sink_handler(sink: str) -> logging.Handler:
+    """
+    returns the handler which writes the log records to the sink
+
+    >>> get_sink_handler('stderr')
+    <StreamHandler ... (NOTSET)>
+    >>> get_sink_handler('null')
+    <NullHandler (NOTSET)>
+    >>> get_sink_handler('some_dir/some_file.log')
+    <FileHandler ...some_file.log (NOTSET)>
+
+    """
+    if sink == 'stderr':
+        return logging.StreamHandler(sys.stderr)
+    if sink == 'stdout':
+        return logging.StreamHandler(sys.stdout)
+    if sink == 'null':
+        return logging.NullHandler()
+    # delay : the file is only created with the first record
+    return logging.FileHandler(sink, encoding='utf-8', delay=True)
+
+
+def setup_logging(level: str = 'WARNING', sink: str = 'stderr', log_format: str = LOG_FORMAT) -> None:
+    """
+    routes all log records of the root logger through a queue to a background thread, which formats and writes them to the sink.
+    the level is set on the root logger, so disabled calls are rejected by the (cached) level check of the logger -
+    use lazy formatting on hot paths : logger.debug('value %s', value) instead of logger.debug(f'value {value}'),
+    and guard expensive arguments with logger.isEnabledFor(logging.DEBUG).
+
+    the queue is drained and the sink is flushed at exit, or with shutdown_logging().
+    calling setup_logging again replaces the previous setup - also from another thread.
+
+    >>> setup_logging(level='INFO', sink='stdout', log_format='%(levelname)s %(name)s: %(message)s')
+    >>> logging.getLogger('demo').info('hello %s', 'world')
+    >>> logging.getLogger('demo').debug('not logged %s', 'because of the level')
+    >>> shutdown_logging()
+    INFO demo: hello world
+
+    """
+    with _state.lock:
+        shutdown_logging()
+
+        sink_handler = get_sink_handler(sink)
+        sink_handler.setFormatter(logging.Formatter(log_format))
+        log_queue: 'queue.SimpleQueue[Any]' = queue.SimpleQueue()
+        queue_handler = LazyQueueHandler(log_queue)
+
+        root_logger = logging.getLogger()
+        root_logger.addHandler(queue_handler)
+        root_logger.setLevel(level.upper())
+
+        listener = logging.handlers.QueueListener(log_queue, sink_handler, respect_handler_level=True)
+        listener.start()
+
+        _state.listener = listener
+        _state.queue_handler = queue_handler
+        _state.sink_handler = sink_handler
+        if not _state.atexit_registered:
+            atexit.register(shutdown_logging)
+            _state.atexit_registered = True
+
+
+def shutdown_logging() -> None:
+    """
+    drains the queue, stops the listener thread and closes the sink - can be called more than once
+
+    >>> shutdown_logging()
+
+    """
+    with _state.lock:
+        root_logger = logging.getLogger()
+        if _state.queue_handler is not None:
+            root_logger.removeHandler(_state.queue_handler)
+            _state.queue_handler = None
+        if _state.listener is not None:
+            _state.listener.stop()
+            _state.listener = None
+        if _state.sink_handler is not None:
+            _state.sink_handler.close()
+            _state.sink_handler = None
+
+
+def _after_fork_in_child() -> None:
+    """
+    the listener thread does not exist in a forked child (for instance a worker process) - log directly to the sink there.
+    the lock might have been held by another thread at the fork, the child gets a new one.
+    """
+    _state.lock = threading.RLock()                                             # pragma: no cover
+    if _state.queue_handler is not None and _state.sink_handler is not None:    # pragma: no cover
+        root_logger = logging.getLogger()                                       # pragma: no cover
+        root_logger.removeHandler(_state.queue_handler)                         # pragma: no cover
+        root_logger.addHandler(_state.sink_handler)                             # pragma: no cover
+        _state.queue_handler = None                                             # pragma: no cover
+        _state.listener = None                                                  # pragma: no cover
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,389 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import array
+import atexit
+import bisect
+import functools
+import itertools
+import json
+import os
+import pathlib
+import re
+import threading
+import time
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence, Tuple, TypeVar, cast
+
+APP_NAME = '{{PizzaCutter.package_name}}'
+# the metrics are enabled if one of the environment variables is set when the package is imported :
+# ENV_METRICS=1 - export them on demand with export(), ENV_METRICS_FILE=<path> - and write them to that file at exit,
+# in the prometheus text format if the path ends with .prom (for the textfile collector of the node exporter), otherwise as json
+ENV_METRICS = APP_NAME.upper() + '_METRICS'
+ENV_METRICS_FILE = APP_NAME.upper() + '_METRICS_FILE'
+# the number of values in the array of each thread - a counter or a gauge needs one, a histogram one per bucket plus two
+SLOTS = 1024
+# the upper bounds of the histogram buckets in seconds - from 10 us, for hot functions, to 10 s
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+METRIC_NAME_PATTERN = re.compile(r'[a-zA-Z_:][a-zA-Z0-9_:]*')
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+def _is_enabled_by_env() -> bool:
+    return bool(os.environ.get(ENV_METRICS_FILE)) or os.environ.get(ENV_METRICS, '0') not in ('', '0')
+
+
+class _Config(object):
+    # disabled metrics only cost the check of this flag - a decorator returns the function itself, if it is disabled at decoration time
+    enabled: bool = _is_enabled_by_env()
+    # the file which is written at exit - '' : not written
+    export_path: str = os.environ.get(ENV_METRICS_FILE, '')
+
+
+config = _Config()
+
+
+class _State(object):
+    lock = threading.Lock()
+    next_slot: int = 0
+    d_metrics: Dict[str, '_Metric'] = dict()
+    # the arrays of the running threads, and the sum of the arrays of the finished threads
+    l_thread_values: List[Tuple[threading.Thread, 'array.array[float]']] = list()
+    retired_values: 'array.array[float]' = array.array('d', bytes(8 * SLOTS))
+    # the functions which were decorated while the metrics were disabled - they are not tracked, if the metrics are enabled later
+    untracked_functions: int = 0
+
+
+_state = _State()
+_local = threading.local()
+
+
+def _get_new_thread_values() -> 'array.array[float]':
+    """
+    the array of the calling thread, created on its first metric - each thread only writes to its own array, without locks
+    """
+    values = array.array('d', bytes(8 * SLOTS))
+    _local.values = values
+    with _state.lock:
+        _state.l_thread_values.append((threading.current_thread(), values))
+    return values
+
+
+class _Metric(object):
+    kind = ''
+
+    def __init__(self, name: str, description: str, number_of_slots: int) -> None:
+        if not METRIC_NAME_PATTERN.fullmatch(name):
+            raise ValueError(f'invalid metric name "{name}"')
+        with _state.lock:
+            if name in _state.d_metrics:
+                raise ValueError(f'the metric "{name}" exists already')
+            if _state.next_slot + number_of_slots > SLOTS:
+                raise ValueError(f'no slots left for the metric "{name}", increase metrics.SLOTS')
+            self.slot = _state.next_slot
+            _state.next_slot += number_of_slots
+            self.name = name
+            self.description = description
+            _state.d_metrics[name] = self
+
+    def get_sample(self, totals: 'array.array[float]') -> Dict[str, Any]:
+        return {'type': self.kind, 'description': self.description, 'value': totals[self.slot]}
+
+
+class Counter(_Metric):
+    """
+    a value which only goes up - as decorator, it counts the calls of the function
+
+    >>> config.enabled = True
+    >>> demo_calls = Counter('demo_calls_total', 'the calls of demo')
+    >>> @demo_calls
+    ... def demo() -> None:
+    ...     pass
+    >>> demo()
+    >>> demo_calls.inc(2)
+    >>> demo_calls.get_value()
+    3.0
+    """
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str = '') -> None:
+        super().__init__(name, description, number_of_slots=1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if config.enabled:
+            try:
+                values = _local.values
+            except AttributeError:
+                values = _get_new_thread_values()
+            values[self.slot] += amount
+
+    def get_value(self) -> float:
+        return float(collect()[self.name]['value'])
+
+    def __call__(self, func: F) -> F:
+        if not config.enabled:
+            _state.untracked_functions += 1
+            return func
+
+        @functools.wraps(func)
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            self.inc()
+            return func(*args, **kwargs)
+        return cast(F, counted)
+
+
+class Gauge(_Metric):
+    """
+    a value which goes up and down : set() for measured values, inc() and dec() for counted values - dont mix them.
+    as decorator or context manager (track_inprogress), it counts the calls in progress.
+
+    >>> config.enabled = True
+    >>> demo_queue_size = Gauge('demo_queue_size', 'the items in the queue')
+    >>> demo_queue_size.set(5)
+    >>> with demo_queue_size.track_inprogress():
+    ...     demo_queue_size.get_value()
+    6.0
+    >>> demo_queue_size.get_value()
+    5.0
+    """
+    kind = 'gauge'
+
+    def __init__(self, name: str, description: str = '') -> None:
+        super().__init__(name, description, number_of_slots=1)
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        if config.enabled:
+            self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        if config.enabled:
+            try:
+                values = _local.values
+            except AttributeError:
+                values = _get_new_thread_values()
+            values[self.slot] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def track_inprogress(self) -> ContextManager[None]:
+        return _InProgress(self) if config.enabled else _NULL_CONTEXT
+
+    def get_value(self) -> float:
+        return float(collect()[self.name]['value'])
+
+    def get_sample(self, totals: 'array.array[float]') -> Dict[str, Any]:
+        return {'type': self.kind, 'description': self.description, 'value': self.value + totals[self.slot]}
+
+    def __call__(self, func: F) -> F:
+        if not config.enabled:
+            _state.untracked_functions += 1
+            return func
+
+        @functools.wraps(func)
+        def tracked(*args: Any, **kwargs: Any) -> Any:
+            self.inc()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.dec()
+        return cast(F, tracked)
+
+
+class Histogram(_Metric):
+    """
+    counts the observed values in buckets, with their sum and count - as decorator or context manager (time), it observes the duration in seconds
+
+    >>> config.enabled = True
+    >>> demo_seconds = Histogram('demo_seconds', 'the duration of demo', buckets=(0.1, 1.0))
+    >>> demo_seconds.observe(0.05)
+    >>> demo_seconds.observe(0.5)
+    >>> with demo_seconds.time():
+    ...     pass
+    >>> collect()['demo_seconds']['buckets']
+    {'0.1': 2.0, '1.0': 3.0, '+Inf': 3.0}
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = sorted(buckets)
+        # one slot per bucket, the +Inf bucket and the sum
+        super().__init__(name, description, number_of_slots=len(self.buckets) + 2)
+        self.slot_sum = self.slot + len(self.buckets) + 1
+
+    def observe(self, value: float) -> None:
+        if config.enabled:
+            try:
+                values = _local.values
+            except AttributeError:
+                values = _get_new_thread_values()
+            values[self.slot + bisect.bisect_left(self.buckets, value)] += 1
+            values[self.slot_sum] += value
+
+    def time(self) -> ContextManager[None]:
+        return _Timer(self) if config.enabled else _NULL_CONTEXT
+
+    def get_sample(self, totals: 'array.array[float]') -> Dict[str, Any]:
+        d_buckets: Dict[str, float] = dict()
+        cumulative_count = 0.0
+        for bucket_index, upper_bound in enumerate([*self.buckets, float('inf')]):
+            cumulative_count += totals[self.slot + bucket_index]
+            d_buckets['+Inf' if upper_bound == float('inf') else repr(float(upper_bound))] = cumulative_count
+        return {'type': self.kind, 'description': self.description, 'buckets': d_buckets, 'count': cumulative_count, 'sum': totals[self.slot_sum]}
+
+    def __call__(self, func: F) -> F:
+        if not config.enabled:
+            _state.untracked_functions += 1
+            return func
+
+        @functools.wraps(func)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            time_start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe(time.perf_counter() - time_start)
+        return cast(F, timed)
+
+
+class _Timer(object):
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram = histogram
+        self.time_start = 0.0
+
+    def __enter__(self) -> None:
+        self.time_start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.time_start)
+
+
+class _InProgress(object):
+    def __init__(self, gauge: Gauge) -> None:
+        self.gauge = gauge
+
+    def __enter__(self) -> None:
+        self.gauge.inc()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.gauge.dec()
+
+
+class _NullContext(object):
+    """
+    the context manager of disabled metrics - one shared instance, which does nothing.
+    __enter__ and __exit__ are builtin functions, which are not bound to the instance : the with statement runs no python frame.
+    __exit__ returns '', so exceptions are not suppressed.
+
+    >>> with _NULL_CONTEXT:
+    ...     raise ValueError('not suppressed')
+    Traceback (most recent call last):
+        ...
+    ValueError: not suppressed
+    """
+    __enter__: Callable[[], None] = itertools.repeat(None).__next__
+    __exit__: Callable[..., str] = ''.format
+
+
+_NULL_CONTEXT = cast(ContextManager[None], _NullContext())
+
+
+def collect() -> Dict[str, Dict[str, Any]]:
+    """
+    the current values of all metrics, summed over all threads, by name.
+    the arrays of finished threads are added to the retired values and released.
+
+    >>> assert isinstance(collect(), dict)
+    """
+    with _state.lock:
+        l_running_thread_values: List[Tuple[threading.Thread, 'array.array[float]']] = list()
+        for thread, values in _state.l_thread_values:
+            if thread.is_alive():
+                l_running_thread_values.append((thread, values))
+            else:
+                for slot in range(_state.next_slot):
+                    _state.retired_values[slot] += values[slot]
+        _state.l_thread_values = l_running_thread_values
+        totals = array.array('d', _state.retired_values)
+        for _, values in l_running_thread_values:
+            for slot in range(_state.next_slot):
+                totals[slot] += values[slot]
+        d_metrics = dict(_state.d_metrics)
+    return {name: metric.get_sample(totals) for name, metric in d_metrics.items()}
+
+
+def format_prometheus(d_samples: Dict[str, Dict[str, Any]]) -> str:
+    """
+    the samples in the prometheus text format
+
+    >>> print(format_prometheus({'demo_seconds': {'type': 'histogram', 'description': 'the duration', 'buckets': {'0.1': 1.0, '+Inf': 2.0},
+    ...                                           'count': 2.0, 'sum': 0.55}}), end='')
+    # HELP demo_seconds the duration
+    # TYPE demo_seconds histogram
+    demo_seconds_bucket{le="0.1"} 1.0
+    demo_seconds_bucket{le="+Inf"} 2.0
+    demo_seconds_sum 0.55
+    demo_seconds_count 2.0
+    """
+    l_lines: List[str] = list()
+    for name, d_sample in d_samples.items():
+        description = d_sample['description'].replace('\\', '\\\\').replace('\n', '\\n')
+        l_lines.extend([f'# HELP {name} {description}', f'# TYPE {name} {d_sample["type"]}'])
+        if d_sample['type'] == 'histogram':
+            l_lines.extend(f'{name}_bucket{{le="{upper_bound}"}} {count!r}' for upper_bound, count in d_sample['buckets'].items())
+            l_lines.extend([f'{name}_sum {d_sample["sum"]!r}', f'{name}_count {d_sample["count"]!r}'])
+        else:
+            l_lines.append(f'{name} {d_sample["value"]!r}')
+    return ''.join(f'{line}\n' for line in l_lines)
+
+
+def export(path: Optional[str] = None) -> None:
+    """
+    writes the current values of all metrics to the file (default : config.export_path) - in the prometheus text format if it ends with .prom,
+    otherwise as json. the file is replaced atomically, so a collector never reads a partial file.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as temp_dir:
+    ...     export(os.path.join(temp_dir, 'metrics.json'))
+    ...     assert isinstance(json.loads(pathlib.Path(temp_dir, 'metrics.json').read_text()), dict)
+    """
+    if not (path or config.export_path):
+        raise ValueError(f'no file to export the metrics to, set {ENV_METRICS_FILE}')
+    path_export_file = pathlib.Path(path or config.export_path)
+    d_samples = collect()
+    content = format_prometheus(d_samples) if path_export_file.suffix == '.prom' else json.dumps(d_samples, indent=4) + '\n'
+    path_temp_file = path_export_file.with_name(f'{path_export_file.name}.{os.getpid()}.tmp')
+    path_temp_file.write_text(content, encoding='utf-8')
+    os.replace(path_temp_file, path_export_file)
+
+
+def reset() -> None:
+    """
+    sets all metrics to 0 - for tests
+    """
+    with _state.lock:
+        for values in [_state.retired_values, *(values for _, values in _state.l_thread_values)]:
+            for slot in range(SLOTS):
+                values[slot] = 0.0
+        for metric in _state.d_metrics.values():
+            if isinstance(metric, Gauge):
+                metric.value = 0.0
+
+
+def reload_config() -> bool:
+    """
+    reads the environment variables again - the children of the warm server (warm_cli.py) get the environment of the client.
+    returns False if the metrics are enabled now, but functions were decorated while they were disabled : those functions are not tracked,
+    the command needs a new interpreter
+    """
+    config.enabled = _is_enabled_by_env()
+    config.export_path = os.environ.get(ENV_METRICS_FILE, '')
+    return not (config.enabled and _state.untracked_functions)
+
+
+def _export_at_exit() -> None:
+    if config.enabled and config.export_path:
+        export()
+
+
+atexit.register(_export_at_exit)
@@ -0,0 +1,164 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import hashlib
+import json
+import os
+import pathlib
+import sys
+import threading
+import textwrap
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# PROJ
+try:
+    from . import user_dirs
+except ImportError:                         # pragma: no cover
+    # imports for doctest, and for the cli module imported as script
+    import user_dirs                        # type: ignore  # pragma: no cover
+
+# the plugin index of plugins.py - only the standard library, so the completion index (completion_index.py) can read it without click.
+# scanning the entry points of all installed distributions takes time - the plugin index (the entry points of the group ENTRY_POINT_GROUP)
+# is cached in a json file, together with the fingerprint of the site-packages (sys.path) : the paths and modification times of
+# the directories, which change when a distribution is installed or removed. as long as the fingerprint is the same, the index
+# is read from the cache file.
+
+APP_NAME = '{{PizzaCutter.package_name}}'
+ENTRY_POINT_GROUP = APP_NAME + '.commands'
+# the layout of the index file - index files with another version are ignored
+INDEX_VERSION = 1
+
+# the plugins by the name of the command : {'value': 'module:attribute', 'distribution': ..., 'version': ..., 'help': ...}
+PluginIndex = Dict[str, Dict[str, str]]
+
+
+class _Config(object):
+    # the entry point group of the plugin commands
+    entry_point_group: str = ENTRY_POINT_GROUP
+    # the directory of the index file - None for the cache directory of the user, see get_cache_dir()
+    path_cache_dir: Optional[pathlib.Path] = None
+    # False : scan the installed distributions on every start
+    use_cache: bool = True
+
+
+config = _Config()
+
+
+class _State(object):
+    # the plugin index of this process, loaded on first use
+    plugin_index: Optional[PluginIndex] = None
+
+
+_state = _State()
+
+
+def get_cache_dir() -> pathlib.Path:
+    """ the directory of the index file : config.path_cache_dir, otherwise the cache directory of the user """
+    return config.path_cache_dir or user_dirs.get_user_cache_dir()
+
+
+def get_site_packages_fingerprint(l_paths: Optional[Iterable[str]] = None) -> str:
+    """
+    the hash of the interpreter, the entry point group, and the paths of sys.path with their modification times - installing or
+    removing a distribution adds or removes its .dist-info directory, and changes the modification time of the directory
+
+    >>> assert get_site_packages_fingerprint(['a']) == get_site_packages_fingerprint(['a']) != get_site_packages_fingerprint(['b'])
+    """
+    l_key: List[Tuple[str, int]] = list()
+    for path in sys.path if l_paths is None else l_paths:
+        try:
+            l_key.append((path, os.stat(path or '.').st_mtime_ns))
+        except OSError:
+            l_key.append((path, -1))
+    return hashlib.sha256(json.dumps([sys.executable, config.entry_point_group, l_key]).encode('utf-8')).hexdigest()
+
+
+def scan_plugins(entry_point_group: Optional[str] = None) -> PluginIndex:
+    """
+    the plugin index from the entry points of the installed distributions - the first distribution on sys.path wins, like for imports
+
+    >>> scan_plugins('{{PizzaCutter.package_name}}.no_such_group')
+    {}
+    """
+    # importlib.metadata is only imported, when the index is not cached
+    import importlib.metadata
+
+    entry_point_group = config.entry_point_group if entry_point_group is None else entry_point_group
+    plugin_index: PluginIndex = dict()
+    for distribution in importlib.metadata.distributions():
+        for entry_point in distribution.entry_points:
+            if entry_point.group == entry_point_group and entry_point.name not in plugin_index:
+                plugin_index[entry_point.name] = {'value': entry_point.value, 'distribution': distribution.metadata['Name'] or '',
+                                                  'version': distribution.version or '', 'help': distribution.metadata['Summary'] or ''}
+    return plugin_index
+
+
+def read_index(path_index_file: pathlib.Path, fingerprint: str) -> Optional[PluginIndex]:
+    """
+    the cached plugin index - None if the file does not exist, can not be read, or belongs to another fingerprint
+
+    >>> read_index(pathlib.Path('does_not_exist.json'), '') is None
+    True
+    """
+    try:
+        d_index = json.loads(path_index_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(d_index, dict) or d_index.get('version') != INDEX_VERSION or d_index.get('fingerprint') != fingerprint:
+        return None
+    plugin_index: PluginIndex = d_index['plugins']
+    return plugin_index
+
+
+def write_index(path_index_file: pathlib.Path, fingerprint: str, plugin_index: PluginIndex) -> None:
+    """
+    writes the index file atomically, an index which can not be written is skipped
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as temp_dir:
+    ...     path_index_file = pathlib.Path(temp_dir) / 'plugins.json'
+    ...     write_index(path_index_file, 'abc', {'hello': {'value': 'some_plugin:hello', 'distribution': 'some_plugin', 'version': '1.0', 'help': ''}})
+    ...     read_index(path_index_file, 'abc'), read_index(path_index_file, 'other fingerprint')
+    ({'hello': {'value': 'some_plugin:hello', 'distribution': 'some_plugin', 'version': '1.0', 'help': ''}}, None)
+    """
+    path_temp_file = path_index_file.with_name(f'{path_index_file.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        path_index_file.parent.mkdir(parents=True, exist_ok=True)
+        path_temp_file.write_text(json.dumps({'version': INDEX_VERSION, 'fingerprint': fingerprint, 'plugins': plugin_index}), encoding='utf-8')
+        os.replace(path_temp_file, path_index_file)
+    except OSError:
+        path_temp_file.unlink(missing_ok=True)
+
+
+def set_plugin_index(plugin_index: Optional[PluginIndex]) -> None:
+    """ sets the plugin index of this process - None : it is loaded again on the next use. for tests """
+    _state.plugin_index = plugin_index
+
+
+def get_short_help(cmd_name: str, limit: int = 45) -> str:
+    """
+    the summary of the distribution of a plugin, shortened to the limit - the help of cli_main and the completion show it
+
+    >>> set_plugin_index({'hello': {'value': 'some_plugin:hello', 'distribution': 'some_plugin', 'version': '1.0',
+    ...                             'help': 'says hello to everybody who is listening, in many languages'}})
+    >>> get_short_help('hello')
+    'says hello to everybody who is listening,...'
+    >>> set_plugin_index(None)
+    """
+    return textwrap.shorten(get_plugin_index()[cmd_name]['help'], width=limit, placeholder='...')
+
+
+def get_plugin_index() -> PluginIndex:
+    """
+    the plugin index - from the cache file if the site-packages did not change, otherwise scanned and written to the cache file.
+    it is loaded once per process.
+    """
+    if _state.plugin_index is None:
+        fingerprint = get_site_packages_fingerprint()
+        path_index_file = get_cache_dir() / f'plugins_{hashlib.sha256(sys.executable.encode("utf-8")).hexdigest()[:16]}.json'
+        plugin_index = read_index(path_index_file, fingerprint) if config.use_cache else None
+        if plugin_index is None:
+            plugin_index = scan_plugins()
+            if config.use_cache:
+                write_index(path_index_file, fingerprint, plugin_index)
+        _state.plugin_index = plugin_index
+    return _state.plugin_index
@@ -0,0 +1,129 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+from typing import Dict, List, Optional, Tuple
+
+# EXT
+import click
+from click.shell_completion import CompletionItem
+
+# PROJ
+try:
+    from . import plugin_index
+except ImportError:                         # pragma: no cover
+    # imports for doctest, and for the cli module imported as script
+    import plugin_index                     # type: ignore  # pragma: no cover
+
+# other distributions add subcommands to cli_main with an entry point in the group ENTRY_POINT_GROUP, in their pyproject.toml :
+#     [project.entry-points."{{PizzaCutter.package_name}}.commands"]
+#     hello = "some_plugin.cli:hello"           # a click.Command (or click.Group), the name is the name of the subcommand
+# the plugins are read from the plugin index, see plugin_index.py. the module of a plugin is only imported when its subcommand is invoked -
+# the help of cli_main and the shell completion show the summary of the distribution instead of the help of the command.
+# the commands of the package itself win over plugins with the same name.
+
+
+def load_plugin_command(name: str, d_plugin: Dict[str, str]) -> click.Command:
+    """
+    imports the command of a plugin
+
+    >>> load_plugin_command('dumps', {'value': 'json:dumps', 'distribution': 'demo'})
+    Traceback (most recent call last):
+        ...
+    click.exceptions.ClickException: the plugin command "dumps" of demo is no click command : json:dumps
+    """
+    import importlib.metadata
+
+    entry_point = importlib.metadata.EntryPoint(name=name, value=d_plugin['value'], group=plugin_index.config.entry_point_group)
+    try:
+        command = entry_point.load()
+    except Exception as exc:
+        raise click.ClickException(f'the plugin command "{name}" of {d_plugin["distribution"]} can not be loaded : {type(exc).__name__}: {exc}')
+    if not isinstance(command, click.Command):
+        raise click.ClickException(f'the plugin command "{name}" of {d_plugin["distribution"]} is no click command : {d_plugin["value"]}')
+    return command
+
+
+class PluginGroup(click.Group):
+    """
+    a click group with the plugin commands of the plugin index - cli_main is created with @click.group(cls=plugins.PluginGroup).
+    a plugin is only imported, when its command is invoked. the completion index (completion_index.py) only contains the commands
+    of the package, it reads the plugin commands from the plugin index on completion
+
+    >>> plugin_index.set_plugin_index({'broken': {'value': 'does_not_exist:cli', 'distribution': 'broken_plugin', 'version': '1.0', 'help': 'a broken plugin'}})
+    >>> @click.group(cls=PluginGroup)
+    ... def demo() -> None:
+    ...     pass
+    >>> @demo.command()
+    ... def hello() -> None:
+    ...     print('hello')
+    >>> _ = demo.main(['--help'], prog_name='demo', standalone_mode=False)
+    Usage: demo [OPTIONS] COMMAND [ARGS]...
+    ...
+    Commands:
+      broken  a broken plugin
+      hello
+    >>> demo.main(['broken'], prog_name='demo', standalone_mode=False)
+    Traceback (most recent call last):
+        ...
+    click.exceptions.ClickException: the plugin command "broken" of broken_plugin can not be loaded : ModuleNotFoundError: No module named 'does_not_exist'
+    >>> plugin_index.set_plugin_index(None)
+    """
+
+    # the completion index contains the commands of click.Group, and reads the plugin commands from the plugin index
+    has_plugin_commands = True
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(plugin_index.get_plugin_index()))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        # the commands of the package do not need the plugin index
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in plugin_index.get_plugin_index():
+            command = load_plugin_command(cmd_name, plugin_index.get_plugin_index()[cmd_name])
+        return command
+
+    def get_visible_commands(self, ctx: click.Context, incomplete: str = '') -> List[Tuple[str, Optional[click.Command]]]:
+        """ the commands which start with incomplete and are not hidden - None for plugin commands, which are not imported """
+        l_commands: List[Tuple[str, Optional[click.Command]]] = list()
+        for cmd_name in self.list_commands(ctx):
+            if not cmd_name.startswith(incomplete):
+                continue
+            command = super().get_command(ctx, cmd_name)
+            if command is None or not command.hidden:
+                l_commands.append((cmd_name, command))
+        return l_commands
+
+    @staticmethod
+    def get_short_help(cmd_name: str, command: Optional[click.Command], limit: int = 45) -> str:
+        if command is not None:
+            return command.get_short_help_str(limit)
+        # the summary of the distribution - without importing the plugin, like the completion index
+        return plugin_index.get_short_help(cmd_name, limit)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        l_commands = self.get_visible_commands(ctx)
+        if l_commands:
+            limit = formatter.width - 6 - max(len(cmd_name) for cmd_name, _ in l_commands)
+            with formatter.section('Commands'):
+                formatter.write_dl([(cmd_name, self.get_short_help(cmd_name, command, limit)) for cmd_name, command in l_commands])
+
+    def shell_complete(self, ctx: click.Context, incomplete: str) -> List[CompletionItem]:
+        l_results = [CompletionItem(cmd_name, help=self.get_short_help(cmd_name, command)) for cmd_name, command in self.get_visible_commands(ctx, incomplete)]
+        # the options of the group - click.Group.shell_complete would import the plugins
+        l_results.extend(click.Command.shell_complete(self, ctx, incomplete))
+        return l_results
+
+
+def get_plugin_info() -> List[str]:
+    """
+    the lines of the plugin table, for the plugins of the plugin index
+
+    >>> plugin_index.set_plugin_index({'hello': {'value': 'some_plugin.cli:hello', 'distribution': 'some_plugin', 'version': '1.0', 'help': ''}})
+    >>> print('\\n'.join(get_plugin_info()))
+    command           distribution                  version     entry point
+    hello             some_plugin                   1.0         some_plugin.cli:hello
+    >>> plugin_index.set_plugin_index(None)
+    """
+    l_lines = [f'{"command":<18}{"distribution":<30}{"version":<12}entry point']
+    for cmd_name, d_plugin in sorted(plugin_index.get_plugin_index().items()):
+        l_lines.append(f'{cmd_name:<18}{d_plugin["distribution"]:<30}{d_plugin["version"]:<12}{d_plugin["value"]}')
+    return l_lines
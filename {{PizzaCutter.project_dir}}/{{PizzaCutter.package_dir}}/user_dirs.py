@@ -0,0 +1,23 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import os
+import pathlib
+import sys
+
+# the directories of the user for the files of the package - the modules which cache files (config_loader, disk_cache, plugins) share them
+
+APP_NAME = '{{PizzaCutter.package_name}}'
+
+
+def get_user_cache_dir(app_name: str = APP_NAME) -> pathlib.Path:
+    """
+    $XDG_CACHE_HOME/<app_name> (default ~/.cache) - on windows %LOCALAPPDATA%\\<app_name>
+
+    >>> get_user_cache_dir('demo').name
+    'demo'
+    """
+    if sys.platform == 'win32':
+        path_cache_base_dir = pathlib.Path(os.environ.get('LOCALAPPDATA') or pathlib.Path.home() / 'AppData/Local')
+    else:
+        path_cache_base_dir = pathlib.Path(os.environ.get('XDG_CACHE_HOME') or pathlib.Path.home() / '.cache')
+    return path_cache_base_dir / app_name
@@ -0,0 +1,516 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import array
+import atexit
+import json
+import os
+import selectors
+import signal
+import socket
+import stat
+import struct
+import sys
+import time
+from types import FrameType, ModuleType
+from typing import Any, Dict, List, Optional, Tuple
+
+# the console script "{{PizzaCutter.shell_command}}" runs main() of this module - it only imports the standard library.
+# if the warm server is running ("python -m {{PizzaCutter.package_name}}.warm_cli serve"), the command runs in a child
+# forked from the server, where the cli is already imported - otherwise it runs directly in this process.
+# restart the server after an update of the package, the server keeps the modules which it imported on start.
+# the request contains the environment of the caller - the socket is in a directory of the user with mode 0700, and the client and the
+# server check that the other side runs as the same user (SO_PEERCRED, where the platform has it).
+
+# the socket of the warm server, in the private directory of the user - can be set with the environment variable WARM_CLI_SOCKET,
+# the directory of that socket needs to be private as well
+SOCKET_DIR_NAME = '{{PizzaCutter.shell_command}}_warm_cli-{uid}'
+SOCKET_NAME = 'warm_cli.sock'
+# the signals the client forwards to the child - SIGINT from the terminal reaches the client, not the child
+FORWARDED_SIGNALS = ['SIGINT', 'SIGTERM', 'SIGHUP', 'SIGQUIT', 'SIGUSR1', 'SIGUSR2', 'SIGWINCH']
+# the message length prefix of the protocol : every message is a json object
+LENGTH_PREFIX = struct.Struct('!I')
+# the seconds a client has to send its request - the server reads the requests without blocking, a slow client does not delay others
+REQUEST_TIMEOUT = 5.0
+# the modules of the package read their environment variables again in the child, see reload_package_configs()
+PACKAGE_PREFIX = '{{PizzaCutter.package_name}}.'
+# a child which can not apply the environment of the client runs the command in a new interpreter - argv follows after "-c"
+DIRECT_COMMAND = 'import sys; sys.argv = sys.argv[1:]; from {{PizzaCutter.package_name}}.warm_cli import run_direct; run_direct()'
+
+
+def get_socket_path() -> str:
+    """
+    >>> assert get_socket_path().endswith('.sock')
+    """
+    socket_path = os.environ.get('WARM_CLI_SOCKET')
+    if socket_path:
+        return os.path.abspath(socket_path)
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or '/tmp'
+    return os.path.join(runtime_dir, SOCKET_DIR_NAME.format(uid=os.getuid()), SOCKET_NAME)
+
+
+def is_private_dir(dir_path: str) -> bool:
+    """
+    True if the directory belongs to the current user, and others have no access - a symlink is not followed
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as temp_dir:
+    ...     is_private_dir(temp_dir), is_private_dir(os.path.join(temp_dir, 'does_not_exist'))
+    (True, False)
+    """
+    try:
+        dir_stat = os.lstat(dir_path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(dir_stat.st_mode) and dir_stat.st_uid == os.getuid() and not stat.S_IMODE(dir_stat.st_mode) & 0o077
+
+
+def make_private_dir(dir_path: str) -> None:
+    """ creates the directory of the socket with mode 0700 - raises PermissionError, if it belongs to another user or others have access """
+    try:
+        os.mkdir(dir_path, mode=0o700)
+    except FileExistsError:
+        pass
+    if not is_private_dir(dir_path):
+        raise PermissionError(f'the socket directory "{dir_path}" needs to be a directory of the current user with mode 0700')
+
+
+def is_peer_current_user(conn: socket.socket) -> bool:
+    """
+    False if the process on the other end of the unix socket runs as another user - True where SO_PEERCRED is not supported,
+    there the private directory of the socket keeps other users out
+
+    >>> client, server = socket.socketpair()
+    >>> is_peer_current_user(client)
+    True
+    >>> client.close(), server.close()
+    (None, None)
+    """
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    # struct ucred : pid, uid, gid
+    _, uid, _ = struct.unpack('3i', conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+    return bool(uid == os.getuid())
+
+
+def encode_message(d_message: Dict[str, Any]) -> bytes:
+    """
+    >>> encode_message({'pid': 1})
+    b'\\x00\\x00\\x00\\n{"pid": 1}'
+    """
+    data = json.dumps(d_message).encode('utf-8')
+    return LENGTH_PREFIX.pack(len(data)) + data
+
+
+def receive_message(conn: socket.socket, max_fds: int = 0) -> Tuple[Optional[Dict[str, Any]], List[int]]:
+    """
+    returns the next message and the file descriptors sent with it - (None, []) if the connection was closed
+
+    >>> client, server = socket.socketpair()
+    >>> client.sendall(encode_message({'exit_code': 3}))
+    >>> receive_message(server)
+    ({'exit_code': 3}, [])
+    >>> client.close()
+    >>> receive_message(server)
+    (None, [])
+    >>> server.close()
+    """
+    l_fds: List[int] = list()
+    data = b''
+    while not is_complete_message(data):
+        chunk, l_chunk_fds = receive_chunk(conn, max_fds)
+        l_fds.extend(l_chunk_fds)
+        if not chunk:
+            for fd in l_fds:
+                os.close(fd)
+            return None, list()
+        data += chunk
+    return decode_message(data), l_fds
+
+
+def receive_chunk(conn: socket.socket, max_fds: int = 0) -> Tuple[bytes, List[int]]:
+    """ the next bytes of a message and the file descriptors sent with them - the file descriptors arrive with the first bytes """
+    l_fds: List[int] = list()
+    chunk, ancdata, _, _ = conn.recvmsg(65536, socket.CMSG_SPACE(max_fds * array.array('i').itemsize) if max_fds else 0)
+    for cmsg_level, cmsg_type, cmsg_data in ancdata:
+        if cmsg_level == socket.SOL_SOCKET and cmsg_type == socket.SCM_RIGHTS:
+            fds = array.array('i')
+            fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+            l_fds.extend(fds)
+    return chunk, l_fds
+
+
+def is_complete_message(data: bytes) -> bool:
+    """
+    >>> is_complete_message(encode_message({'pid': 1})), is_complete_message(encode_message({'pid': 1})[:-1]), is_complete_message(b'')
+    (True, False, False)
+    """
+    return len(data) >= LENGTH_PREFIX.size and len(data) >= LENGTH_PREFIX.size + LENGTH_PREFIX.unpack_from(data)[0]
+
+
+def decode_message(data: bytes) -> Dict[str, Any]:
+    d_message: Dict[str, Any] = json.loads(data[LENGTH_PREFIX.size:LENGTH_PREFIX.size + LENGTH_PREFIX.unpack_from(data)[0]])
+    return d_message
+
+
+def get_exit_code(wait_status: int) -> Dict[str, int]:
+    """
+    the result of a child for the client : {'exit_code': n} or {'signal': n} if the child was killed by a signal
+
+    >>> get_exit_code(3 << 8)
+    {'exit_code': 3}
+    >>> get_exit_code(signal.SIGTERM)
+    {'signal': 15}
+    """
+    if os.WIFSIGNALED(wait_status):
+        return {'signal': os.WTERMSIG(wait_status)}
+    return {'exit_code': os.WEXITSTATUS(wait_status)}
+
+
+def run_direct() -> None:
+    """ runs the cli in this process - exactly what the console script did without the warm server """
+    from .{{PizzaCutter.cli_module}} import cli_main
+    cli_main()      # type: ignore
+
+
+def connect_to_server(socket_path: str) -> Optional[socket.socket]:
+    """
+    the connection to the warm server - None if it is not running, or if it does not belong to the current user
+
+    >>> connect_to_server('does_not_exist/warm_cli.sock') is None
+    True
+    """
+    if not hasattr(os, 'fork') or not is_private_dir(os.path.dirname(socket_path)):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        return None
+    # the request contains the environment of the caller - it is only sent to a server of the current user
+    if not is_peer_current_user(client):
+        client.close()
+        return None
+    return client
+
+
+def main() -> None:
+    """
+    the console script : runs the command on the warm server, or directly if the server is not running.
+    argv, the environment, the working directory and stdin, stdout and stderr are passed to the child.
+    the exit code is the exit code of the child - if the child is killed by a signal, the client kills itself with the same signal.
+    """
+    socket_path = get_socket_path()
+    client = connect_to_server(socket_path)
+    if client is None:
+        return run_direct()
+
+    d_request = {'argv': sys.argv, 'env': dict(os.environ), 'cwd': os.getcwd()}
+    client.sendmsg([encode_message(d_request)], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', [0, 1, 2]))])
+    d_started, _ = receive_message(client)
+    if d_started is None:
+        sys.stderr.write(f'the warm server on "{socket_path}" closed the connection, run "{sys.argv[0]}" again\n')
+        sys.exit(1)
+
+    child_pid = d_started['pid']
+
+    def forward_signal(signum: int, _stack_frame: Optional[FrameType]) -> None:
+        os.kill(child_pid, signum)
+
+    for signal_name in FORWARDED_SIGNALS:
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), forward_signal)
+
+    d_result, _ = receive_message(client)
+    client.close()
+    if d_result is None:
+        sys.stderr.write(f'the warm server on "{socket_path}" stopped while running the command\n')
+        sys.exit(1)
+    if 'signal' in d_result:
+        signal.signal(d_result['signal'], signal.SIG_DFL)
+        os.kill(os.getpid(), d_result['signal'])
+    sys.exit(d_result['exit_code'])
+
+
+def reload_package_configs() -> bool:
+    """
+    the imported modules of the package with a function reload_config() (disk_cache, metrics) read their environment variables again -
+    the server imported them with its own environment. False if a module can not apply the settings in this process
+    """
+    l_results = [module.reload_config() for module_name, module in list(sys.modules.items())
+                 if module_name.startswith(PACKAGE_PREFIX) and callable(getattr(module, 'reload_config', None))]
+    return all(l_results)
+
+
+def run_child(d_request: Dict[str, Any], l_fds: List[int]) -> None:
+    """
+    runs the command in the forked child, with the stdio, argv, environment and working directory of the client - never returns.
+    the exit handlers run like at the exit of the interpreter (for instance the statistics of --cache-stats, the export of the metrics)
+    """
+    signal.set_wakeup_fd(-1)
+    for signal_name in FORWARDED_SIGNALS + ['SIGCHLD']:
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    for target_fd, fd in enumerate(l_fds):
+        os.dup2(fd, target_fd)
+        os.close(fd)
+    os.chdir(d_request['cwd'])
+    os.environ.clear()
+    os.environ.update(d_request['env'])
+    sys.argv = d_request['argv']
+    # the __main__ of the client is the console script, not this module run with "python -m" - click derives the program name from it
+    sys.modules['__main__'] = ModuleType('__main__')
+    if not reload_package_configs():
+        os.execv(sys.executable, [sys.executable, '-c', DIRECT_COMMAND, *sys.argv])
+    # new streams, the buffering depends on the terminal of the client
+    sys.stdin = open(0, closefd=False)
+    sys.stdout = open(1, 'w', buffering=1 if os.isatty(1) else -1, closefd=False)
+    sys.stderr = open(2, 'w', buffering=1, closefd=False, errors='backslashreplace')
+
+    exit_code, kill_signal = 1, 0
+    try:
+        run_direct()
+        exit_code = 0
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            exit_code = exc.code or 0
+        else:
+            sys.stderr.write(f'{exc.code}\n')
+    except KeyboardInterrupt:
+        # like the interpreter : the traceback, the exit handlers, then the process ends by SIGINT
+        sys.excepthook(*sys.exc_info())
+        kill_signal = signal.SIGINT
+    except BaseException:
+        sys.excepthook(*sys.exc_info())
+    finally:
+        # os._exit() skips the exit handlers, they run here - exceptions in the handlers are printed by atexit
+        atexit._run_exitfuncs()
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        if kill_signal:
+            signal.signal(kill_signal, signal.SIG_DFL)
+            os.kill(os.getpid(), kill_signal)
+        os._exit(exit_code)
+
+
+def serve(socket_path: Optional[str] = None) -> None:
+    """
+    the warm server : imports the cli, then forks a child for every request - until it gets SIGINT or SIGTERM.
+    one thread, the requests are read without blocking and the children are reaped on SIGCHLD.
+    if a client disconnects before its child finished, the child is killed.
+    """
+    from . import {{PizzaCutter.cli_module}}     # noqa: F401  # the import is the point of the warm server
+
+    socket_path = socket_path or get_socket_path()
+    make_private_dir(os.path.dirname(os.path.abspath(socket_path)))
+    remove_stale_socket(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # the socket is created with mode 0600 - the server has one thread, the umask is restored right away
+    umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(umask)
+    listener.listen(128)
+    listener.setblocking(False)
+    wakeup_read_fd, wakeup_write_fd = os.pipe()
+    os.set_blocking(wakeup_read_fd, False)
+    os.set_blocking(wakeup_write_fd, False)
+    signal.set_wakeup_fd(wakeup_write_fd)
+    signal.signal(signal.SIGCHLD, lambda _signo, _stack_frame: None)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    selector.register(wakeup_read_fd, selectors.EVENT_READ)
+    d_children: Dict[int, socket.socket] = dict()
+    print(f'warm server for "{{PizzaCutter.shell_command}}" on "{socket_path}"', flush=True)
+
+    try:
+        while True:
+            for key, _ in selector.select(get_select_timeout(selector)):
+                if key.fileobj is listener:
+                    accept_client(listener, selector)
+                elif key.fileobj == wakeup_read_fd:
+                    drain_fd(wakeup_read_fd)
+                    reap_children(d_children, selector)
+                elif isinstance(key.data, PendingRequest):
+                    read_request(key.fileobj, key.data, selector, d_children, [wakeup_read_fd, wakeup_write_fd])     # type: ignore
+                else:
+                    # the client does not send anything after the request - readable means it is gone
+                    os.kill(key.data, signal.SIGKILL)
+                    selector.unregister(key.fileobj)
+            drop_expired_requests(selector)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        selector.close()
+        listener.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class PendingRequest(object):
+    """ the bytes and file descriptors of a request, which did not arrive completely yet """
+    def __init__(self) -> None:
+        self.data = b''
+        self.l_fds: List[int] = list()
+        self.deadline = time.monotonic() + REQUEST_TIMEOUT
+
+    def close(self, conn: socket.socket) -> None:
+        for fd in self.l_fds:
+            os.close(fd)
+        self.l_fds = list()
+        conn.close()
+
+
+def remove_stale_socket(socket_path: str) -> None:
+    """
+    removes the socket of a warm server which is not running anymore
+
+    >>> remove_stale_socket('does_not_exist.sock')
+    """
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        raise RuntimeError(f'a warm server is already running on "{socket_path}"')
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+    finally:
+        probe.close()
+
+
+def drain_fd(fd: int) -> None:
+    """
+    reads everything from a non blocking file descriptor
+
+    >>> read_fd, write_fd = os.pipe()
+    >>> os.set_blocking(read_fd, False)
+    >>> _ = os.write(write_fd, b'\\x11')
+    >>> drain_fd(read_fd)
+    >>> os.close(read_fd), os.close(write_fd)
+    (None, None)
+    """
+    while True:
+        try:
+            if not os.read(fd, 4096):
+                return
+        except BlockingIOError:
+            return
+
+
+def get_select_timeout(selector: selectors.BaseSelector) -> Optional[float]:
+    """ the seconds until the next pending request expires - None (wait without timeout) if no request is pending """
+    l_deadlines = [key.data.deadline for key in selector.get_map().values() if isinstance(key.data, PendingRequest)]
+    return max(0.0, min(l_deadlines) - time.monotonic()) if l_deadlines else None
+
+
+def drop_expired_requests(selector: selectors.BaseSelector) -> None:
+    """ closes the connections of the clients, which did not send their request in time """
+    now = time.monotonic()
+    for key in list(selector.get_map().values()):
+        if isinstance(key.data, PendingRequest) and key.data.deadline <= now:
+            selector.unregister(key.fileobj)
+            key.data.close(key.fileobj)     # type: ignore
+
+
+def accept_client(listener: socket.socket, selector: selectors.BaseSelector) -> None:
+    """ accepts the next client of the current user - the request is read when it arrives, without blocking the server """
+    try:
+        conn, _ = listener.accept()
+    except (BlockingIOError, InterruptedError, ConnectionAbortedError):
+        return
+    if not is_peer_current_user(conn):
+        conn.close()
+        return
+    conn.setblocking(False)
+    selector.register(conn, selectors.EVENT_READ, data=PendingRequest())
+
+
+def read_request(conn: socket.socket, pending_request: PendingRequest, selector: selectors.BaseSelector, d_children: Dict[int, socket.socket],
+                 l_server_fds: List[int]) -> None:
+    """ reads the available bytes of a request - the child is started, when the request is complete """
+    try:
+        chunk, l_fds = receive_chunk(conn, max_fds=3)
+    except (BlockingIOError, InterruptedError):
+        return
+    except OSError:
+        chunk, l_fds = b'', list()
+    pending_request.l_fds.extend(l_fds)
+    pending_request.data += chunk
+    if chunk and not is_complete_message(pending_request.data):
+        return
+    selector.unregister(conn)
+    if not chunk or len(pending_request.l_fds) != 3:
+        pending_request.close(conn)
+        return
+    conn.setblocking(True)
+    start_child(conn, decode_message(pending_request.data), pending_request.l_fds, selector, d_children, l_server_fds)
+
+
+def start_child(conn: socket.socket, d_request: Dict[str, Any], l_fds: List[int], selector: selectors.BaseSelector,
+                d_children: Dict[int, socket.socket], l_server_fds: List[int]) -> None:
+    """ forks the child which runs the request - the pid is sent to the client """
+    pid = os.fork()
+    if pid == 0:
+        try:
+            # the listener, the connections of the other clients and their file descriptors
+            for key in list(selector.get_map().values()):
+                if isinstance(key.data, PendingRequest):
+                    key.data.close(key.fileobj)     # type: ignore
+                elif isinstance(key.fileobj, socket.socket):
+                    key.fileobj.close()
+            selector.close()
+            for fd in l_server_fds:
+                os.close(fd)
+            conn.close()
+            run_child(d_request, l_fds)
+        finally:
+            # the child never returns to the loop of the server
+            os._exit(1)
+    for fd in l_fds:
+        os.close(fd)
+    try:
+        conn.sendall(encode_message({'pid': pid}))
+    except OSError:
+        # the client is gone already
+        os.kill(pid, signal.SIGKILL)
+    d_children[pid] = conn
+    selector.register(conn, selectors.EVENT_READ, data=pid)
+
+
+def reap_children(d_children: Dict[int, socket.socket], selector: selectors.BaseSelector) -> None:
+    """ sends the result of every finished child to its client """
+    while d_children:
+        try:
+            pid, wait_status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        conn = d_children.pop(pid, None)
+        if conn is None:
+            continue
+        try:
+            selector.unregister(conn)
+        except KeyError:
+            # unregistered already, the client is gone
+            pass
+        try:
+            conn.sendall(encode_message(get_exit_code(wait_status)))
+        except OSError:
+            pass
+        conn.close()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['serve']:
+        serve(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        sys.stderr.write('usage : python -m {{PizzaCutter.package_name}}.warm_cli serve [socket_path]\n')
+        sys.exit(2)
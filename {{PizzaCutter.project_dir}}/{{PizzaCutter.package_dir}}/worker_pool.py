@@ -0,0 +1,126 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+# STDLIB
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+import signal
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class _Config(object):
+    # number of worker processes, 0 = number of cpus, 1 = run in the calling process without a pool - set by cli option --jobs
+    jobs: int = 1
+    # multiprocessing start method 'fork', 'forkserver' or 'spawn' - None for the default of the platform
+    start_method: Optional[str] = None
+    # number of items which are sent to a worker in one piece
+    chunksize: int = 64
+
+
+config = _Config()
+
+
+def get_number_of_jobs(jobs: Optional[int] = None) -> int:
+    """
+    returns the number of worker processes - None : config.jobs, 0 : number of cpus
+
+    >>> get_number_of_jobs(4)
+    4
+    >>> assert get_number_of_jobs(0) == (os.cpu_count() or 1)
+    >>> get_number_of_jobs(-1)
+    Traceback (most recent call last):
+        ...
+    ValueError: jobs must be 0 (number of cpus) or more, got -1
+
+    """
+    if jobs is None:
+        jobs = config.jobs
+    if jobs < 0:
+        raise ValueError(f'jobs must be 0 (number of cpus) or more, got {jobs}')
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    return jobs
+
+
+def map_chunked(func: Callable[[T], R], items: Iterable[T], jobs: Optional[int] = None,
+                chunksize: Optional[int] = None, start_method: Optional[str] = None) -> Iterator[R]:
+    """
+    applies func to all items on a process pool, and yields the results in the order of the items.
+    func needs to be picklable (a module level function), and so do the items and the results.
+
+    the items are consumed lazily and sent in chunks, with at most 2 chunks per worker in flight.
+    the workers ignore SIGINT and SIGTERM - the parent (where the cli signal handlers raise SigIntError / SigTermError)
+    cancels the chunks which are not started yet, waits for the running chunks and re-raises the exception,
+    so no orphaned worker processes are left behind. the exit code is set by cli_exit_tools.get_system_exit_code as usual.
+
+    >>> list(map_chunked(abs, [-1, -2, 3], jobs=1))
+    [1, 2, 3]
+    >>> list(map_chunked(abs, range(-100, 0), jobs=2, chunksize=7)) == list(range(100, 0, -1))
+    True
+    >>> list(map_chunked(abs, [], jobs=2))
+    []
+    >>> list(map_chunked(abs, ['x'], jobs=2))
+    Traceback (most recent call last):
+        ...
+    TypeError: bad operand type for abs(): 'str'
+
+    """
+    jobs = get_number_of_jobs(jobs)
+    if chunksize is None:
+        chunksize = config.chunksize
+    if start_method is None:
+        start_method = config.start_method
+
+    if jobs == 1:
+        yield from map(func, items)
+        return
+
+    mp_context = multiprocessing.get_context(start_method)
+    iter_chunks = _iter_chunks(items, chunksize)
+    dq_futures: Deque['concurrent.futures.Future[List[R]]'] = collections.deque()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context, initializer=_init_worker) as executor:
+        try:
+            for chunk in iter_chunks:
+                dq_futures.append(executor.submit(_run_chunk, func, chunk))
+                if len(dq_futures) >= jobs * 2:
+                    yield from dq_futures.popleft().result()
+            while dq_futures:
+                yield from dq_futures.popleft().result()
+        except BaseException:
+            # SigIntError, SigTermError, GeneratorExit, or the exception of a worker : cancel what is not started yet,
+            # the running chunks are finished when the executor shuts down
+            for future in dq_futures:
+                future.cancel()
+            raise
+
+
+def _iter_chunks(items: Iterable[T], chunksize: int) -> Iterator[List[T]]:
+    """
+    >>> list(_iter_chunks(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    chunk: List[T] = list()
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = list()
+    if chunk:
+        yield chunk
+
+
+def _run_chunk(func: Callable[[T], R], chunk: List[T]) -> List[R]:
+    return [func(item) for item in chunk]
+
+
+def _init_worker() -> None:
+    """
+    the workers ignore SIGINT and SIGTERM - Ctrl-C is sent to the whole process group, but only the parent handles it.
+    on 'fork' the workers would inherit the signal handlers of the cli otherwise, which raise exceptions in every worker
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
@@ -0,0 +1,63 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+throughput of the cli for many units of work :
+    - one process per record, like a shell loop or xargs calling "{{PizzaCutter.shell_command}} info"
+    - one process for all records, "{{PizzaCutter.shell_command}} batch info" reading the records from stdin
+the batch needs to produce one result line per record.
+
+usage : python ./tests/benchmarks/bench_batch.py [records]
+"""
+
+# STDLIB
+import json
+import pathlib
+import subprocess
+import sys
+import time
+from typing import List
+
+path_project_dir = pathlib.Path(__file__).resolve().parent.parent.parent
+cli_args: List[str] = [sys.executable, '-m', '{{PizzaCutter.package_name}}.{{PizzaCutter.cli_module}}']
+
+
+def bench_per_invocation(records: int) -> float:
+    """
+    returns the records per second
+
+    >>> assert bench_per_invocation(1) > 0
+    """
+    time_start = time.perf_counter()
+    for _ in range(records):
+        subprocess.run([*cli_args, 'info'], cwd=path_project_dir, check=True, stdout=subprocess.DEVNULL)
+    return records / (time.perf_counter() - time_start)
+
+
+def bench_batch(records: int) -> float:
+    """
+    returns the records per second
+
+    >>> assert bench_batch(2) > 0
+    """
+    stdin = '[]\n' * records
+    time_start = time.perf_counter()
+    result = subprocess.run([*cli_args, 'batch', 'info'], cwd=path_project_dir, check=True, input=stdin, stdout=subprocess.PIPE, text=True)
+    records_per_second = records / (time.perf_counter() - time_start)
+    # the group prints the output of main() before the batch starts - the results are the json lines
+    l_results = [json.loads(line) for line in result.stdout.splitlines() if line.startswith('{')]
+    assert len(l_results) == records, f'{len(l_results)} results for {records} records'
+    assert all('error' not in d_result for d_result in l_results)
+    return records_per_second
+
+
+def main(records: int = 1000) -> None:
+    # the processes are slow, they get less records
+    records_per_invocation = max(1, records // 20)
+    print(f'records per second, {records_per_invocation} records with one process each, {records} records in a batch:')
+    rate_per_invocation = bench_per_invocation(records_per_invocation)
+    rate_batch = bench_batch(records)
+    print(f'    one process per record   {rate_per_invocation:>10.1f}')
+    print(f'    batch                    {rate_batch:>10.1f}   ({rate_batch / rate_per_invocation:.0f} x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,62 @@
+"""
+cold start time of the project from a plain install, compared with the byte-compiled bundles of testing_tools.py build_bundle.
+the interpreter runs with PYTHONDONTWRITEBYTECODE=1 like on a read-only filesystem, where the plain install
+compiles every module again on each start.
+
+usage : python ./tests/benchmarks/bench_cold_start.py [iterations]
+"""
+
+# STDLIB
+import os
+import pathlib
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+# PROJ
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / 'local_testscripts'))
+import testing_tools     # noqa: E402
+
+# the arguments for the interpreter on each cold start - for instance ['-m', '<package>.<cli_module>', '--version'] for a cli
+cold_start_args: List[str] = ['-c', 'import {{PizzaCutter.package_name}}.{{PizzaCutter.main_module}}']
+
+
+def time_cold_start(python_path: str, iterations: int) -> List[float]:
+    """
+    returns the milliseconds of each start
+
+    >>> assert len(time_cold_start(python_path='', iterations=2)) == 2
+    """
+    env = dict(os.environ, PYTHONPATH=python_path, PYTHONDONTWRITEBYTECODE='1')
+    l_ms: List[float] = list()
+    for _ in range(iterations):
+        time_start = time.perf_counter()
+        subprocess.run([sys.executable, *cold_start_args], env=env, check=True, stdout=subprocess.DEVNULL)
+        l_ms.append((time.perf_counter() - time_start) * 1000)
+    return l_ms
+
+
+def main(iterations: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path_plain = testing_tools.install_bundle(str(pathlib.Path(temp_dir) / 'plain'))
+        path_bundle = pathlib.Path(temp_dir) / 'bundle'
+        path_bundle_stripped = pathlib.Path(temp_dir) / 'bundle_stripped'
+        shutil.copytree(path_plain, path_bundle, symlinks=True)
+        shutil.copytree(path_plain, path_bundle_stripped, symlinks=True)
+        testing_tools.compile_bundle(str(path_bundle))
+        testing_tools.compile_bundle(str(path_bundle_stripped), strip_sources=True)
+
+        print(f'{iterations} cold starts of "python {" ".join(cold_start_args)}", milliseconds:')
+        for description, path_install in (('plain install         ', path_plain),
+                                          ('bundle                ', path_bundle),
+                                          ('bundle without sources', path_bundle_stripped)):
+            l_ms = time_cold_start(python_path=str(path_install), iterations=iterations)
+            print(f'    {description}   median {statistics.median(l_ms):>8.1f}   min {min(l_ms):>8.1f}   max {max(l_ms):>8.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
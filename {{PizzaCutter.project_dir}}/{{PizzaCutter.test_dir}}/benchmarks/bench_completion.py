@@ -0,0 +1,52 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+latency of a Tab press in bash, for the completion index and for the completion of click - both need to give the same completions.
+each completion is a new interpreter, like the shell starts it.
+
+usage : python ./tests/benchmarks/bench_completion.py [iterations]
+"""
+
+# STDLIB
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+path_project_dir = pathlib.Path(__file__).resolve().parent.parent.parent
+complete_var = '_{{PizzaCutter.shell_command}}_COMPLETE'.replace('-', '_').upper()
+d_commands = {
+    'completion index': [sys.executable, '-c', 'from {{PizzaCutter.package_name}}.completion_index import main; main()'],
+    'click': [sys.executable, '-c', "from {{PizzaCutter.package_name}}.{{PizzaCutter.cli_module}} import cli_main; cli_main(prog_name='{{PizzaCutter.shell_command}}')"],
+}
+# the command lines to complete
+l_comp_words: List[str] = ['{{PizzaCutter.shell_command}} ', '{{PizzaCutter.shell_command}} i', '{{PizzaCutter.shell_command}} --']
+
+
+def complete(command: List[str], comp_words: str) -> Tuple[float, str]:
+    """
+    returns the milliseconds and the completions
+
+    >>> assert 'plain,info' in complete(d_commands['completion index'], '{{PizzaCutter.shell_command}} i')[1]
+    """
+    env: Dict[str, str] = dict(os.environ, COMP_WORDS=comp_words, COMP_CWORD=str(len(comp_words.split(' ')) - 1))
+    env[complete_var] = 'bash_complete'
+    time_start = time.perf_counter()
+    result = subprocess.run(command, cwd=path_project_dir, env=env, check=True, stdout=subprocess.PIPE, text=True)
+    return (time.perf_counter() - time_start) * 1000, result.stdout
+
+
+def main(iterations: int = 20) -> None:
+    for comp_words in l_comp_words:
+        l_completions = [complete(command, comp_words)[1] for command in d_commands.values()]
+        assert l_completions[0] == l_completions[1], f'"{comp_words}" : {l_completions[0]!r} != {l_completions[1]!r}'
+    print(f'{iterations} x {l_comp_words}, milliseconds per Tab press:')
+    for description, command in d_commands.items():
+        l_ms = [complete(command, comp_words)[0] for _ in range(iterations) for comp_words in l_comp_words]
+        print(f'    {description:<18} median {statistics.median(l_ms):>8.1f}   min {min(l_ms):>8.1f}   max {max(l_ms):>8.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,83 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+time to load the configuration from a system, a user and a project config file, in a new interpreter like on the start of the cli :
+    - cold : no cache file - the toml parser is imported, the config files are parsed and the cache file is written
+    - warm : the config files did not change - the settings are read from the cache file
+both need to give the same settings.
+
+usage : python ./tests/benchmarks/bench_config_loader.py [iterations]
+"""
+
+# STDLIB
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import List, Tuple
+
+path_project_dir = pathlib.Path(__file__).resolve().parent.parent.parent
+# the settings per config file
+number_of_settings = 50
+# loads the configuration and prints the milliseconds of load_config and the settings
+load_script = """
+import dataclasses, hashlib, pathlib, sys, time
+from typing import List
+from {{PizzaCutter.package_name}} import config_loader
+fields = [(f'int_{number}', int, 0) for number in range(int(sys.argv[2]))]
+fields += [(f'str_{number}', str, '') for number in range(int(sys.argv[2]))]
+fields += [(f'list_{number}', List[str], dataclasses.field(default_factory=list)) for number in range(int(sys.argv[2]))]
+BenchConfig = dataclasses.make_dataclass('BenchConfig', fields, frozen=True)
+config_loader.config.path_cache_dir = pathlib.Path(sys.argv[1])
+time_start = time.perf_counter()
+bench_config = config_loader.load_config(BenchConfig, [pathlib.Path(path) for path in sys.argv[3:]], environ={})
+print((time.perf_counter() - time_start) * 1000, hashlib.sha256(repr(bench_config).encode()).hexdigest())
+"""
+
+
+def write_config_files(path_dir: pathlib.Path) -> List[pathlib.Path]:
+    l_paths_config_files: List[pathlib.Path] = list()
+    for layer in ('system', 'user', 'project'):
+        path_config_file = path_dir / f'{layer}.toml'
+        l_lines = [f'int_{number} = {number}\nstr_{number} = "{layer} {number}"\nlist_{number} = ["{layer}", "{number}"]'
+                   for number in range(number_of_settings)]
+        path_config_file.write_text(f'# {layer}\n' + '\n'.join(l_lines) + '\n')
+        l_paths_config_files.append(path_config_file)
+    return l_paths_config_files
+
+
+def load(path_cache_dir: pathlib.Path, l_paths_config_files: List[pathlib.Path]) -> Tuple[float, str]:
+    """
+    returns the milliseconds of load_config and the hash of the settings
+
+    >>> with tempfile.TemporaryDirectory() as temp_dir:
+    ...     l_paths_config_files = write_config_files(pathlib.Path(temp_dir))
+    ...     assert load(pathlib.Path(temp_dir), l_paths_config_files)[1] == load(pathlib.Path(temp_dir), l_paths_config_files)[1]
+    """
+    result = subprocess.run([sys.executable, '-c', load_script, str(path_cache_dir), str(number_of_settings), *map(str, l_paths_config_files)],
+                            cwd=path_project_dir, check=True, stdout=subprocess.PIPE, text=True)
+    ms, settings_hash = result.stdout.split()
+    return float(ms), settings_hash
+
+
+def main(iterations: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path_cache_dir = pathlib.Path(temp_dir) / 'cache'
+        l_paths_config_files = write_config_files(pathlib.Path(temp_dir))
+        l_ms_cold: List[float] = list()
+        l_ms_warm: List[float] = list()
+        for _ in range(iterations):
+            for path_cache_file in path_cache_dir.glob('*'):
+                path_cache_file.unlink()
+            ms_cold, settings_hash_cold = load(path_cache_dir, l_paths_config_files)
+            ms_warm, settings_hash_warm = load(path_cache_dir, l_paths_config_files)
+            assert settings_hash_cold == settings_hash_warm, 'the settings from the cache are different'
+            l_ms_cold.append(ms_cold)
+            l_ms_warm.append(ms_warm)
+    print(f'{iterations} x 3 config files with {number_of_settings * 3} settings each, milliseconds per load_config:')
+    for description, l_ms in (('cold', l_ms_cold), ('warm', l_ms_warm)):
+        print(f'    {description}   median {statistics.median(l_ms):>8.2f}   min {min(l_ms):>8.2f}   max {max(l_ms):>8.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,100 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+cost and concurrency of the disk cache :
+    - the microseconds per call of a memoized function on a miss (compute, pickle and store) and on a hit (load and unpickle),
+      against the plain call - the cache pays off when the function takes longer than a hit
+    - worker processes call the same memoized function with overlapping arguments at the same time - all results need to be right,
+      and every argument is computed at most once per worker
+the cache is created in a temporary directory.
+
+usage : python ./tests/benchmarks/bench_disk_cache.py [calls]
+"""
+
+# STDLIB
+import multiprocessing
+import pathlib
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+# PROJ
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent.parent))
+from {{PizzaCutter.package_name}} import disk_cache     # noqa: E402
+
+# the worker processes of the concurrency test, and the arguments per worker
+workers = 4
+calls_per_worker = 200
+
+
+def expensive_function(value: int) -> List[int]:
+    return [number * value for number in range(1000)]
+
+
+memoized_function = disk_cache.memoize(version='bench')(expensive_function)
+
+
+def time_calls(function: Callable[[int], List[int]], values: List[int]) -> float:
+    """
+    returns the microseconds per call
+
+    >>> assert time_calls(expensive_function, [1, 2]) > 0
+    """
+    time_start = time.perf_counter()
+    for value in values:
+        function(value)
+    return (time.perf_counter() - time_start) / len(values) * 1e6
+
+
+def bench_calls(calls: int) -> Dict[str, float]:
+    """ the microseconds per call : plain, memoized miss, memoized hit """
+    disk_cache.clear()
+    l_values = list(range(calls))
+    return {'plain call': time_calls(expensive_function, l_values), 'miss': time_calls(memoized_function, l_values),
+            'hit': time_calls(memoized_function, l_values)}
+
+
+def worker(worker_number: int, path_cache_dir: str) -> int:
+    """ calls the memoized function with arguments, which overlap with the other workers - returns the wrong results """
+    disk_cache.config.path_cache_dir = pathlib.Path(path_cache_dir)
+    wrong_results = 0
+    for value in range(worker_number * calls_per_worker // 2, worker_number * calls_per_worker // 2 + calls_per_worker):
+        if memoized_function(value) != expensive_function(value):
+            wrong_results += 1
+    return wrong_results
+
+
+def bench_workers(path_cache_dir: pathlib.Path) -> Tuple[float, int, int, int]:
+    """ the seconds of the workers, the wrong results, and the misses and hits of all workers """
+    disk_cache.clear()
+    disk_cache.close()
+    time_start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        l_wrong_results = pool.starmap(worker, [(worker_number, str(path_cache_dir)) for worker_number in range(workers)])
+        # the workers write their pending statistics when they exit - leaving the with block would terminate them
+        pool.close()
+        pool.join()
+    seconds = time.perf_counter() - time_start
+    # the module is "__mp_main__" in spawned workers
+    l_stats = [d_stats for function, d_stats in disk_cache.get_stats().items() if function.endswith('.expensive_function')]
+    return seconds, sum(l_wrong_results), sum(d_stats['misses'] for d_stats in l_stats), sum(d_stats['hits'] for d_stats in l_stats)
+
+
+def main(calls: int = 1000) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        disk_cache.config.path_cache_dir = pathlib.Path(temp_dir)
+        print(f'{calls} calls, microseconds per call:')
+        for description, us in bench_calls(calls).items():
+            print(f'    {description:<16}{us:>10.1f}')
+        seconds, wrong_results, misses, hits = bench_workers(pathlib.Path(temp_dir))
+        distinct_values = calls_per_worker // 2 * (workers + 1)
+        print(f'{workers} worker processes, {workers * calls_per_worker} calls with {distinct_values} distinct arguments : '
+              f'{seconds:.2f} seconds, {misses} misses, {hits} hits, {wrong_results} wrong results')
+        disk_cache.close()
+    assert wrong_results == 0, f'{wrong_results} wrong results from the disk cache'
+    assert distinct_values <= misses <= workers * calls_per_worker, f'{misses} misses for {distinct_values} distinct arguments'
+    assert hits + misses == workers * calls_per_worker, f'{hits} hits and {misses} misses for {workers * calls_per_worker} calls'
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,84 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+scaling of a thread pool on cpu bound pure python work, with and without the GIL :
+    - the same number of tasks runs in a ThreadPoolExecutor with 1, 2, 4 ... threads, in a new interpreter per run
+    - the speedup is the time with one thread, divided by the time with n threads
+on a free-threaded interpreter (python3.13t and later) the runs are made with -X gil=1 and -X gil=0 - without the GIL the speedup
+should grow with the threads, up to the number of cpus. on an interpreter with GIL only the runs with the GIL are made.
+
+usage : python3.13t ./tests/benchmarks/bench_free_threading.py [tasks]
+"""
+
+# STDLIB
+import os
+import subprocess
+import sys
+import sysconfig
+from typing import Dict, List
+
+# the iterations of the pure python loop per task
+task_iterations = 200000
+# runs the tasks in a thread pool with the number of threads given, prints the seconds
+thread_pool_script = """
+import concurrent.futures, sys, time
+def task(iterations):
+    total = 0
+    for number in range(iterations):
+        total += number * number % 7
+    return total
+tasks, threads, iterations = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+time_start = time.perf_counter()
+with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+    results = list(executor.map(task, [iterations] * tasks))
+assert len(set(results)) == 1
+print(time.perf_counter() - time_start)
+"""
+
+
+def is_free_threaded_build() -> bool:
+    """
+    if the interpreter is a free-threaded build, which can run without the GIL
+
+    >>> assert is_free_threaded_build() in (True, False)
+    """
+    return bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+
+
+def get_thread_counts() -> List[int]:
+    """
+    1, 2, 4 ... up to the number of cpus, and the number of cpus
+
+    >>> assert get_thread_counts()[0] == 1
+    """
+    cpus = os.cpu_count() or 1
+    l_thread_counts = [2 ** exponent for exponent in range(cpus.bit_length()) if 2 ** exponent <= cpus]
+    return sorted(set(l_thread_counts + [cpus]))
+
+
+def run_thread_pool(tasks: int, threads: int, gil: bool) -> float:
+    """
+    the seconds for the tasks in a thread pool, in a new interpreter - the GIL can only be switched on a free-threaded build
+
+    >>> assert run_thread_pool(tasks=2, threads=2, gil=True) > 0
+    """
+    l_gil_option = ['-X', f'gil={int(gil)}'] if is_free_threaded_build() else list()
+    result = subprocess.run([sys.executable, *l_gil_option, '-c', thread_pool_script, str(tasks), str(threads), str(task_iterations)],
+                            check=True, stdout=subprocess.PIPE, text=True)
+    return float(result.stdout)
+
+
+def main(tasks: int = 32) -> None:
+    l_thread_counts = get_thread_counts()
+    l_gil_settings = [True, False] if is_free_threaded_build() else [True]
+    d_seconds: Dict[bool, List[float]] = {gil: [run_thread_pool(tasks, threads, gil) for threads in l_thread_counts] for gil in l_gil_settings}
+    print(f'{tasks} tasks of {task_iterations} iterations, python {sys.version.split()[0]}, {os.cpu_count()} cpus - seconds (speedup against 1 thread):')
+    print(f'    {"threads":<10}' + ''.join(f'{"GIL" if gil else "no GIL":>22}' for gil in l_gil_settings))
+    for index, threads in enumerate(l_thread_counts):
+        columns = ''.join(f'{d_seconds[gil][index]:>13.2f} ({d_seconds[gil][0] / d_seconds[gil][index]:>5.2f}x)' for gil in l_gil_settings)
+        print(f'    {threads:<10}{columns}')
+    if not is_free_threaded_build():
+        print('    this interpreter has the GIL - run the benchmark with a free-threaded build like python3.13t, to compare')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
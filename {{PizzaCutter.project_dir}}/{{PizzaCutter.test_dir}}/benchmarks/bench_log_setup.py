@@ -0,0 +1,82 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+per call overhead of logging in a hot loop, as seen by the caller :
+    - a disabled level (only the level check)
+    - a synchronous FileHandler (formatting and writing in the calling thread)
+    - log_setup (LazyQueueHandler, formatting and writing in the QueueListener thread)
+and the time the QueueListener needs to drain the queue after the loop, which is not paid by the caller
+
+usage : python ./tests/benchmarks/bench_log_setup.py [iterations]
+"""
+
+# STDLIB
+import logging
+import pathlib
+import sys
+import tempfile
+import time
+from typing import Tuple
+
+# PROJ
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent.parent))
+from {{PizzaCutter.package_name}} import log_setup     # noqa: E402
+
+
+def hot_loop(logger: logging.Logger, iterations: int) -> float:
+    """
+    returns the nanoseconds per log call
+
+    >>> assert hot_loop(logging.getLogger('bench_log_setup'), 10) > 0
+    """
+    time_start = time.perf_counter_ns()
+    for iteration in range(iterations):
+        logger.info('record %s of %s', iteration, iterations)
+    return (time.perf_counter_ns() - time_start) / iterations
+
+
+def bench_disabled(iterations: int) -> float:
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.WARNING)
+    return hot_loop(logging.getLogger('bench_log_setup'), iterations)
+
+
+def bench_sync_file(iterations: int, path_log_file: pathlib.Path) -> float:
+    root_logger = logging.getLogger()
+    file_handler = logging.FileHandler(str(path_log_file), encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(log_setup.LOG_FORMAT))
+    root_logger.addHandler(file_handler)
+    root_logger.setLevel(logging.INFO)
+    try:
+        return hot_loop(logging.getLogger('bench_log_setup'), iterations)
+    finally:
+        root_logger.removeHandler(file_handler)
+        file_handler.close()
+
+
+def bench_queue(iterations: int, path_log_file: pathlib.Path) -> Tuple[float, float]:
+    """
+    returns the nanoseconds per log call, and the milliseconds to drain the queue
+    """
+    log_setup.setup_logging(level='INFO', sink=str(path_log_file))
+    try:
+        ns_per_call = hot_loop(logging.getLogger('bench_log_setup'), iterations)
+    finally:
+        time_start_drain = time.perf_counter_ns()
+        log_setup.shutdown_logging()
+    return ns_per_call, (time.perf_counter_ns() - time_start_drain) / 1000000
+
+
+def main(iterations: int = 100000) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path_temp_dir = pathlib.Path(temp_dir)
+        ns_per_call_disabled = bench_disabled(iterations)
+        ns_per_call_sync_file = bench_sync_file(iterations, path_temp_dir / 'sync.log')
+        ns_per_call_queue, ms_drain_queue = bench_queue(iterations, path_temp_dir / 'queue.log')
+    print(f'{iterations} log calls, overhead per call in the calling thread:')
+    print(f'    disabled level            {ns_per_call_disabled:>10.0f} ns')
+    print(f'    synchronous FileHandler   {ns_per_call_sync_file:>10.0f} ns')
+    print(f'    log_setup QueueHandler    {ns_per_call_queue:>10.0f} ns   (+ {ms_drain_queue:.1f} ms to drain the queue after the loop)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
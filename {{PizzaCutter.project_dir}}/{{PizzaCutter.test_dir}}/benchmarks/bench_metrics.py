@@ -0,0 +1,106 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+overhead of the metrics per call of a hot function, in nanoseconds above the plain call :
+    - disabled : the decorators return the function itself, inc() and time() only check the flag - need to stay within the budget
+    - enabled : the values are added to the array of the thread
+the benchmark fails if a disabled metric is over the budget.
+
+usage : python ./tests/benchmarks/bench_metrics.py [iterations]
+"""
+
+# STDLIB
+import pathlib
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+# PROJ
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent.parent))
+from {{PizzaCutter.package_name}} import metrics     # noqa: E402
+
+# the overhead of a disabled metric per call, by loop - a with statement alone costs about 100 ns, even if it does nothing
+D_BUDGET_DISABLED_NS = {'counter decorator': 100.0, 'counter inc()': 100.0, 'histogram decorator': 100.0, 'histogram time()': 300.0}
+
+
+def hot_function(value: int) -> int:
+    return value + 1
+
+
+def time_loop(loop: Callable[[int], None], iterations: int) -> float:
+    """
+    returns the nanoseconds per iteration, the fastest of 5 runs
+
+    >>> assert time_loop(lambda iterations: None, 10) >= 0
+    """
+    l_ns: List[float] = list()
+    for _ in range(5):
+        time_start = time.perf_counter_ns()
+        loop(iterations)
+        l_ns.append((time.perf_counter_ns() - time_start) / iterations)
+    return min(l_ns)
+
+
+def get_call_loop(function: Callable[[int], int]) -> Callable[[int], None]:
+    def loop(iterations: int) -> None:
+        for iteration in range(iterations):
+            function(iteration)
+    return loop
+
+
+def get_inc_loop(counter: metrics.Counter) -> Callable[[int], None]:
+    def loop(iterations: int) -> None:
+        for iteration in range(iterations):
+            hot_function(iteration)
+            counter.inc()
+    return loop
+
+
+def get_time_loop(histogram: metrics.Histogram) -> Callable[[int], None]:
+    def loop(iterations: int) -> None:
+        for iteration in range(iterations):
+            with histogram.time():
+                hot_function(iteration)
+    return loop
+
+
+def get_loops(enabled: bool) -> Dict[str, Callable[[int], None]]:
+    """
+    the loops which call the hot function with the metrics - the metrics are created (and the decorators applied) with the flag set
+    """
+    metrics.config.enabled = enabled
+    state = 'enabled' if enabled else 'disabled'
+    calls = metrics.Counter(f'bench_{state}_calls_total')
+    seconds = metrics.Histogram(f'bench_{state}_seconds')
+    counted_function = calls(hot_function)
+    timed_function = seconds(hot_function)
+    assert enabled or (counted_function is hot_function and timed_function is hot_function), 'a disabled decorator needs to return the function itself'
+    return {'plain call': get_call_loop(hot_function), 'counter decorator': get_call_loop(counted_function), 'counter inc()': get_inc_loop(calls),
+            'histogram decorator': get_call_loop(timed_function), 'histogram time()': get_time_loop(seconds)}
+
+
+def bench(enabled: bool, iterations: int) -> Dict[str, Tuple[float, float]]:
+    """
+    returns the nanoseconds per call and the overhead above the plain call, by loop
+
+    >>> assert bench(enabled=False, iterations=100)['plain call'][1] == 0
+    """
+    d_loops = get_loops(enabled)
+    d_ns = {description: time_loop(loop, iterations) for description, loop in d_loops.items()}
+    return {description: (ns, ns - d_ns['plain call']) for description, ns in d_ns.items()}
+
+
+def main(iterations: int = 200000) -> None:
+    metrics.reset()
+    l_over_budget: List[str] = list()
+    print(f'{iterations} calls, nanoseconds per call   (overhead above the plain call):')
+    for enabled in (False, True):
+        print(f'    metrics {"enabled" if enabled else "disabled"}:')
+        for description, (ns, overhead_ns) in bench(enabled, iterations).items():
+            print(f'        {description:<24}{ns:>10.1f}   ({overhead_ns:>+8.1f})')
+            if not enabled and overhead_ns > D_BUDGET_DISABLED_NS.get(description, 0.0):
+                l_over_budget.append(f'{description} (budget {D_BUDGET_DISABLED_NS.get(description, 0.0)} ns)')
+    assert not l_over_budget, f'disabled metrics over the budget per call: {", ".join(l_over_budget)}'
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,86 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+compares the mypyc compiled modules of the installed package with the interpreted sources of the project.
+run it with the python of the virtual environment where the compiled package is installed,
+and outside of the project directory - otherwise the sources are imported instead of the compiled modules.
+
+usage : python ./tests/benchmarks/bench_mypyc.py [iterations]
+exit code 1 if one of the modules is not compiled
+"""
+
+# STDLIB
+import contextlib
+import importlib
+import importlib.util
+import io
+import pathlib
+import sys
+import time
+from types import ModuleType
+from typing import Any, List, Tuple
+
+path_project_dir = pathlib.Path(__file__).resolve().parent.parent.parent
+
+# the modules compiled with mypyc
+mypyc_module_names: List[str] = {{PizzaCutter.mypyc.module_names}}
+
+# the functions to compare : (module name, function name, arguments) - add the hot functions of Your compiled modules here
+benchmarks: List[Tuple[str, str, Tuple[Any, ...]]] = [('{{PizzaCutter.package_name}}.{{PizzaCutter.main_module}}', 'main', ())]
+
+
+def is_compiled(module: ModuleType) -> bool:
+    """
+    >>> is_compiled(pathlib)
+    False
+    """
+    return pathlib.Path(getattr(module, '__file__', None) or '').suffix in ('.so', '.pyd')
+
+
+def load_interpreted_module(module_name: str) -> ModuleType:
+    """
+    loads the source file of the module from the project directory, as submodule of the same package,
+    so relative imports in the module still work
+    """
+    package_name, _, leaf_name = module_name.rpartition('.')
+    path_source_file = path_project_dir / (module_name.replace('.', '/') + '.py')
+    spec = importlib.util.spec_from_file_location(f'{package_name}._interpreted_{leaf_name}', str(path_source_file))
+    if spec is None or spec.loader is None:
+        raise ImportError(f'can not load the source of "{module_name}" from "{path_source_file}"')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_per_call(module: ModuleType, function_name: str, args: Tuple[Any, ...], iterations: int) -> float:
+    """
+    returns the microseconds per call - the output of the function is discarded
+
+    >>> assert time_per_call(pathlib, 'PurePosixPath', ('a', ), 10) > 0
+    """
+    function = getattr(module, function_name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        time_start = time.perf_counter()
+        for _ in range(iterations):
+            function(*args)
+        return (time.perf_counter() - time_start) / iterations * 1000000
+
+
+def main(iterations: int = 10000) -> int:
+    all_compiled = True
+    for module_name in mypyc_module_names:
+        compiled_module = importlib.import_module(module_name)
+        if not is_compiled(compiled_module):
+            print(f'{module_name} is not compiled : "{compiled_module.__file__}"')
+            all_compiled = False
+
+    print(f'{iterations} calls, microseconds per call:')
+    for module_name, function_name, args in benchmarks:
+        us_compiled = time_per_call(importlib.import_module(module_name), function_name, args, iterations)
+        us_interpreted = time_per_call(load_interpreted_module(module_name), function_name, args, iterations)
+        print(f'    {module_name}.{function_name} : compiled {us_compiled:.2f} us, interpreted {us_interpreted:.2f} us, '
+              f'speedup {us_interpreted / us_compiled:.2f}x')
+    return 0 if all_compiled else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
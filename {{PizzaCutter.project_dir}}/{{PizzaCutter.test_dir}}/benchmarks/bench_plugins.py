@@ -0,0 +1,99 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+startup of the cli with plugin commands, with and without the cached plugin index :
+    - a temporary site directory holds many distributions without plugins, and one distribution with the plugin command "hello"
+    - cold : no index file, the entry points of all installed distributions are scanned
+    - warm : the index is read from the cache file
+    - the help of cli_main lists "hello" without importing the plugin, "hello" imports and runs it
+    - with the completion index (completion_index.py), a Tab press lists "hello" without importing the plugin
+each run is a new interpreter, like the shell starts it.
+
+usage : python ./tests/benchmarks/bench_plugins.py [iterations]
+"""
+
+# STDLIB
+import os
+import pathlib
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+path_project_dir = pathlib.Path(__file__).resolve().parent.parent.parent
+path_package_dir = path_project_dir / '{{PizzaCutter.package_dir}}'
+complete_command = [sys.executable, '-c', 'from {{PizzaCutter.package_name}}.completion_index import main; main()']
+complete_var = '_{{PizzaCutter.shell_command}}_COMPLETE'.replace('-', '_').upper()
+cli_command = [sys.executable, '-c', "from {{PizzaCutter.package_name}}.{{PizzaCutter.cli_module}} import cli_main; cli_main(prog_name='{{PizzaCutter.shell_command}}')"]
+# the distributions without plugins in the temporary site directory
+other_distributions = 300
+plugin_module = """
+import sys
+import click
+print('plugin imported', file=sys.stderr)
+
+@click.command()
+def hello() -> None:
+    print('hello from the plugin')
+"""
+
+
+def create_site_dir(path_site_dir: pathlib.Path) -> None:
+    """ the distributions, like they are installed in site-packages """
+    for number in range(other_distributions):
+        path_dist_info_dir = path_site_dir / f'other_distribution_{number}-1.0.dist-info'
+        path_dist_info_dir.mkdir()
+        (path_dist_info_dir / 'METADATA').write_text(f'Metadata-Version: 2.1\nName: other_distribution_{number}\nVersion: 1.0\n')
+        (path_dist_info_dir / 'entry_points.txt').write_text(f'[console_scripts]\nother_{number} = other_distribution_{number}:main\n')
+    path_dist_info_dir = path_site_dir / 'demo_plugin-1.0.dist-info'
+    path_dist_info_dir.mkdir()
+    (path_dist_info_dir / 'METADATA').write_text('Metadata-Version: 2.1\nName: demo_plugin\nVersion: 1.0\nSummary: says hello\n')
+    (path_dist_info_dir / 'entry_points.txt').write_text('[{{PizzaCutter.package_name}}.commands]\nhello = demo_plugin:hello\n')
+    (path_site_dir / 'demo_plugin.py').write_text(plugin_module)
+
+
+def run_cli(l_args: List[str], env: Dict[str, str], command: Optional[List[str]] = None) -> Tuple[float, str, str]:
+    """
+    returns the milliseconds, stdout and stderr of the cli
+
+    >>> assert '{{PizzaCutter.shell_command}}' in run_cli(['--help'], dict(os.environ))[1]
+    """
+    time_start = time.perf_counter()
+    result = subprocess.run((command or cli_command) + l_args, cwd=path_project_dir, env=env, check=True, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, text=True)
+    return (time.perf_counter() - time_start) * 1000, result.stdout, result.stderr
+
+
+def main(iterations: int = 10) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path_site_dir, path_cache_dir = pathlib.Path(temp_dir) / 'site', pathlib.Path(temp_dir) / 'cache'
+        path_site_dir.mkdir()
+        create_site_dir(path_site_dir)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(path_site_dir), str(path_project_dir)]), XDG_CACHE_HOME=str(path_cache_dir))
+
+        _, stdout, stderr = run_cli(['--help'], env)
+        assert 'hello' in stdout and 'says hello' in stdout, f'the plugin command is not listed :\n{stdout}'
+        assert 'plugin imported' not in stderr, 'the help of cli_main imported the plugin'
+        _, stdout, stderr = run_cli(['hello'], env)
+        assert 'hello from the plugin' in stdout and 'plugin imported' in stderr, f'the plugin command did not run :\n{stdout}{stderr}'
+        if (path_package_dir / 'completion_index.py').is_file():
+            env_complete = dict(env, COMP_WORDS='{{PizzaCutter.shell_command}} ', COMP_CWORD='1', **{complete_var: 'bash_complete'})
+            _, stdout, stderr = run_cli([], env_complete, complete_command)
+            assert 'plain,hello' in stdout.splitlines(), f'the completion does not list the plugin command :\n{stdout}'
+            assert 'plugin imported' not in stderr, 'the completion imported the plugin'
+
+        d_ms: Dict[str, List[float]] = {'cold (scan)': list(), 'warm (index)': list()}
+        for _ in range(iterations):
+            shutil.rmtree(path_cache_dir, ignore_errors=True)
+            d_ms['cold (scan)'].append(run_cli(['--help'], env)[0])
+            d_ms['warm (index)'].append(run_cli(['--help'], env)[0])
+
+    print(f'{iterations} x "{{PizzaCutter.shell_command}} --help" with {other_distributions + 1} distributions, milliseconds per start:')
+    for description, l_ms in d_ms.items():
+        print(f'    {description:<18} median {statistics.median(l_ms):>8.1f}   min {min(l_ms):>8.1f}   max {max(l_ms):>8.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,93 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+time per invocation of the cli, run directly and on the warm server of warm_cli.py -
+and the exit codes, stdout and stderr of both paths, which need to be the same. the server is started without the environment
+variables of the optional modules, the clients set them : the children of the server need to apply them, and run the exit handlers.
+each invocation is a new interpreter, like a call of "{{PizzaCutter.shell_command}}" from a shell script.
+
+usage : python ./tests/benchmarks/bench_warm_cli.py [iterations]
+"""
+
+# STDLIB
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+path_project_dir = pathlib.Path(__file__).resolve().parent.parent.parent
+path_package_dir = path_project_dir / '{{PizzaCutter.package_dir}}'
+
+# the console script, like it is installed by pip
+client_args: List[str] = ['-c', 'import sys; from {{PizzaCutter.package_name}}.warm_cli import main; sys.exit(main())']
+# the arguments of the invocations, and their expected exit code
+invocations: List[Tuple[List[str], int]] = [(['--version'], 0), (['info'], 0), (['--no-such-option'], 2)]
+# the statistics of the disk cache are printed to stderr by an exit handler
+if (path_package_dir / 'disk_cache.py').is_file():
+    invocations.append((['--cache-stats', 'info'], 0))
+# the metrics are enabled by an environment variable of the client, and written to the file by an exit handler - if the cli imports them
+metrics_file_env = '{{PizzaCutter.package_name}}'.upper() + '_METRICS_FILE' if (path_package_dir / 'metrics.py').is_file() else ''
+
+
+def invoke(cli_args: List[str], env: Dict[str, str]) -> Tuple[float, int, str, str]:
+    """
+    returns the milliseconds, the exit code, stdout and stderr of the invocation
+
+    >>> assert invoke(['--version'], dict(os.environ, WARM_CLI_SOCKET='does_not_exist.sock'))[1] == 0
+    """
+    time_start = time.perf_counter()
+    result = subprocess.run([sys.executable, *client_args, *cli_args], cwd=path_project_dir, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return (time.perf_counter() - time_start) * 1000, result.returncode, result.stdout, result.stderr
+
+
+def time_invocations(env: Dict[str, str], iterations: int, d_expected_output: Dict[str, Tuple[str, str, bool]]) -> List[float]:
+    """
+    the milliseconds of the invocations - stdout, stderr and if the metrics file was written need to be the same for every invocation
+    with the same arguments, d_expected_output keeps them from the first invocation
+    """
+    l_ms: List[float] = list()
+    for _ in range(iterations):
+        for cli_args, expected_exit_code in invocations:
+            if metrics_file_env:
+                pathlib.Path(env[metrics_file_env]).unlink(missing_ok=True)
+            ms, exit_code, stdout, stderr = invoke(cli_args, env)
+            assert exit_code == expected_exit_code, f'{cli_args} : exit code {exit_code}, expected {expected_exit_code}'
+            metrics_written = bool(metrics_file_env) and pathlib.Path(env[metrics_file_env]).is_file()
+            expected_stdout, expected_stderr, expected_metrics_written = d_expected_output.setdefault(str(cli_args), (stdout, stderr, metrics_written))
+            assert stdout == expected_stdout, f'{cli_args} : stdout differs :\n{stdout}\nexpected :\n{expected_stdout}'
+            assert stderr == expected_stderr, f'{cli_args} : stderr differs :\n{stderr}\nexpected :\n{expected_stderr}'
+            assert metrics_written == expected_metrics_written, f'{cli_args} : metrics file written : {metrics_written}, expected {expected_metrics_written}'
+            l_ms.append(ms)
+    return l_ms
+
+
+def main(iterations: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        socket_path = os.path.join(temp_dir, 'bench_warm_cli.sock')
+        # the server and the clients use the same cache directory, the clients set the environment variables of the optional modules
+        env_server = dict(os.environ, XDG_CACHE_HOME=os.path.join(temp_dir, 'cache'))
+        env_client = dict(env_server, **({metrics_file_env: os.path.join(temp_dir, 'metrics.json')} if metrics_file_env else {}))
+        env_direct = dict(env_client, WARM_CLI_SOCKET=os.path.join(temp_dir, 'not_running.sock'))
+        env_warm = dict(env_client, WARM_CLI_SOCKET=socket_path)
+        server = subprocess.Popen([sys.executable, '-m', '{{PizzaCutter.package_name}}.warm_cli', 'serve', socket_path],
+                                  cwd=path_project_dir, env=env_server, stdout=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.01)
+            print(f'{iterations} x {[cli_args for cli_args, _ in invocations]}, milliseconds per invocation:')
+            # the output of the direct runs is the expected output of the warm runs
+            d_expected_output: Dict[str, Tuple[str, str, bool]] = dict()
+            for description, env in (('direct     ', env_direct), ('warm server', env_warm)):
+                l_ms = time_invocations(env, iterations, d_expected_output)
+                print(f'    {description}   median {statistics.median(l_ms):>8.1f}   min {min(l_ms):>8.1f}   max {max(l_ms):>8.1f}')
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
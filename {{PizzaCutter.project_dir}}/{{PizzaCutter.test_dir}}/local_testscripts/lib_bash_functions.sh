@@ -156,10 +156,23 @@ function run_mypy_tests() {
 }
 
 
+function get_coverage_core() {
+  # the coverage engine for the interpreter given as parameter - see testing_tools.py coverage_core
+  python3 "${own_dir}/testing_tools.py" coverage_core --python "${1}"
+}
+
+
+function skip_coverage() {
+  # true if the test loop iteration given as parameter runs pytest without coverage - only every n-th iteration measures the coverage
+  local iteration="${1}"
+  [[ "{{PizzaCutter.testscript.do_coverage}}" == "True" ]] && (( (iteration - 1) % {{PizzaCutter.testscript.coverage_every_nth_iteration}} != 0 ))
+}
+
+
 function run_pytest() {
   # run pytest, accepts additional pytest parameters like --disable-warnings and so on
   my_banner "running pytest with settings from pytest.ini, mypy.ini and conftest.py"
-  if ! /opt/python3/bin/python3 -m pytest "${project_root_dir}" "$@" {{PizzaCutter.testscript.pytest_coverage_option}}; then
+  if ! COVERAGE_CORE="$(get_coverage_core /opt/python3/bin/python3)" /opt/python3/bin/python3 -m pytest "${project_root_dir}" "$@" {{PizzaCutter.testscript.pytest_coverage_option}}; then
     my_banner_warning "pytest ERROR"
     beep
     sleep "${sleeptime_on_error}"
@@ -171,7 +184,7 @@ function run_pytest() {
 function run_pytest_venv() {
   # run pytest, accepts additional pytest parameters like --disable-warnings and so on
   my_banner "running pytest with settings from pytest.ini, mypy.ini and conftest.py"
-  if ! ~/venv/local/bin/python3 -m pytest "${project_root_dir}" "$@" {{PizzaCutter.testscript.pytest_coverage_option}}; then
+  if ! COVERAGE_CORE="$(get_coverage_core ~/venv/local/bin/python3)" ~/venv/local/bin/python3 -m pytest "${project_root_dir}" "$@" {{PizzaCutter.testscript.pytest_coverage_option}}; then
     my_banner_warning "pytest ERROR"
     beep
     sleep "${sleeptime_on_error}"
@@ -200,15 +213,73 @@ function install_pip_requirements_venv_old() {
 function setup_install_venv() {
   if test -f "${project_root_dir}/pyproject.toml"; then
     my_banner "install via pip and pyproject.toml on virtual environment"
-    install_clean_virtual_environment
+    local venv_dir
     cd "${project_root_dir}" || exit
-    if ! ~/venv/local/bin/python3 -m pip install -e ".[test]"; then
+    # the cached virtual environment is only created again if pyproject.toml, requirements.txt or requirements_test.txt changed.
+    # the editable install is always the interpreted build - mypyc compiled modules would shadow the sources in the project directory
+    if ! venv_dir="$(python3 "${project_root_dir}/tests/local_testscripts/testing_tools.py" cached_venv)"; then
       my_banner_warning "pip install [test] ERROR"
       beep
       sleep "${sleeptime_on_error}"
       return 1
     fi
+    # ~/venv/local links to the cached virtual environment - deleting ~/venv keeps the cached virtual environment
+    delete_virtual_environment
+    mkdir -p ~/venv
+    ln -s "${venv_dir}" ~/venv/local
+  fi
+}
+
+
+function test_footprint_venv() {
+  # checks import time, memory and wheel size of the package on the virtual environment against the footprint budgets
+  my_banner "footprint budgets on virtual environment"
+  cd "${project_root_dir}" || exit
+  if ! python3 "${project_root_dir}/tests/local_testscripts/testing_tools.py" check_footprint --python ~/venv/local/bin/python3; then
+    my_banner_warning "footprint budgets ERROR"
+    beep
+    sleep "${sleeptime_on_error}"
+    return 1
+  fi
+}
+
+
+function test_stubs_venv() {
+  # checks the stubs (*.pyi) against the implementation - the differences to accept are listed in stubtest_allowlist.txt
+  # the stubs are generated on the next PizzaCutter build - or by hand with "stubgen --export-less"
+  my_banner "stubtest on virtual environment"
+  cd "${project_root_dir}" || exit
+  if ! ~/venv/local/bin/python3 -c "import sys; from mypy.stubtest import main; sys.exit(main())" \
+      --allowlist "${project_root_dir}/stubtest_allowlist.txt" --ignore-unused-allowlist "{{PizzaCutter.package_name}}"; then
+    my_banner_warning "stubtest ERROR - the stubs do not match the implementation"
+    beep
+    sleep "${sleeptime_on_error}"
+    return 1
+  fi
+}
+
+
+function test_mypyc_compiled_venv() {
+  # installs the mypyc compiled build (not editable) and compares it with the interpreted sources
+  my_banner "mypyc compiled build on virtual environment"
+  install_clean_virtual_environment
+  cd "${project_root_dir}" || exit
+  if ! MYPYC_COMPILE=1 ~/venv/local/bin/python3 -m pip install ".[test]"; then
+    my_banner_warning "pip install mypyc compiled build ERROR"
+    beep
+    sleep "${sleeptime_on_error}"
+    return 1
+  fi
+  # run outside of the project directory, otherwise the sources would be imported instead of the compiled modules
+  cd "${HOME}" || exit
+  if ! ~/venv/local/bin/python3 "${project_root_dir}/tests/benchmarks/bench_mypyc.py"; then
+    my_banner_warning "mypyc compiled build ERROR"
+    beep
+    sleep "${sleeptime_on_error}"
+    cd "${project_root_dir}" || exit
+    return 1
   fi
+  cd "${project_root_dir}" || exit
 }
 
 
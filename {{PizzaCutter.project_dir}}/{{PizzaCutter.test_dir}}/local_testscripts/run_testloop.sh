@@ -14,6 +14,9 @@ DO_FLAKE8_TESTS="{{PizzaCutter.flake8_do_tests_in_local_testscript}}"
 DO_MYPY_TESTS="{{PizzaCutter.testscript.do_mypy_tests}}"
 DO_PYTEST="{{PizzaCutter.pytest_do_in_local_testscript}}"
 DO_BLACK="{{PizzaCutter.auto_black_files}}"
+DO_MYPYC="{{PizzaCutter.testscript.do_mypyc}}"
+DO_FOOTPRINT_CHECK="{{PizzaCutter.testscript.do_footprint_check}}"
+DO_STUBTEST="{{PizzaCutter.testscript.do_stubtest}}"
 # cleanup on cntrl-c
 trap cleanup EXIT
 
@@ -21,7 +24,9 @@ trap cleanup EXIT
 install_dependencies
 
 function pytest_loop {
+    local iteration=0
     while true; do
+        iteration=$((iteration + 1))
         banner "Project Root Dir: ${project_root_dir}"
         cleanup
 
@@ -35,7 +40,11 @@ function pytest_loop {
         fi
 
         if [ "${DO_PYTEST}" == "True" ]; then
-            if ! run_pytest --disable-warnings; then continue; fi
+            if skip_coverage "${iteration}"; then
+                if ! run_pytest --disable-warnings --no-cov; then continue; fi
+            else
+                if ! run_pytest --disable-warnings; then continue; fi
+            fi
         fi
 
         # we prefer to run tests on its own, not within pytest, due to shaky and outdated pytest plugins
@@ -48,6 +57,18 @@ function pytest_loop {
         if ! setup_install_venv; then continue; fi
         if ! test_commandline_interface_venv; then continue; fi
 
+        if [ "${DO_FOOTPRINT_CHECK}" == "True" ]; then
+            if ! test_footprint_venv; then continue; fi
+        fi
+
+        if [ "${DO_STUBTEST}" == "True" ]; then
+            if ! test_stubs_venv; then continue; fi
+        fi
+
+        if [ "${DO_MYPYC}" == "True" ]; then
+            if ! test_mypyc_compiled_venv; then continue; fi
+        fi
+
         banner "ALL TESTS PASSED for ${project_root_dir}"
         banner "ALL TESTS PASSED for ${project_root_dir}"
         banner "ALL TESTS PASSED for ${project_root_dir}"
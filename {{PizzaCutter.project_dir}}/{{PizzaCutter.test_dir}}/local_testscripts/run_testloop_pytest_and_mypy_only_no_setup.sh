@@ -21,7 +21,9 @@ trap cleanup EXIT
 install_dependencies
 
 function pytest_loop {
+    local iteration=0
     while true; do
+        iteration=$((iteration + 1))
         banner "Project Root Dir: ${project_root_dir}"
         cleanup
 
@@ -35,7 +37,11 @@ function pytest_loop {
         fi
 
         if [ "${DO_PYTEST}" == "True" ]; then
-            if ! run_pytest --disable-warnings; then continue; fi
+            if skip_coverage "${iteration}"; then
+                if ! run_pytest --disable-warnings --no-cov; then continue; fi
+            else
+                if ! run_pytest --disable-warnings; then continue; fi
+            fi
         fi
 
         # we prefer to run tests on its own, not within pytest, due to shaky and outdated pytest plugins
@@ -1,16 +1,125 @@
 # stdlib
+import compileall
+import concurrent.futures
+import configparser
+import hashlib
+import json
 import logging
 import os
 import pathlib
+import py_compile
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 # EXT
 import click
 
 # CONSTANTS
 CLICK_CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
+PATH_PROJECT_DIR = pathlib.Path(__file__).resolve().parent.parent.parent
 logger = logging.getLogger()
 logger.level = logging.INFO
 
+# the footprint budgets from the PizzaCutter configuration - 0 disables the check
+PACKAGE_NAME = '{{PizzaCutter.package_name}}'
+BUDGET_IMPORT_MS: float = {{PizzaCutter.budget.import_ms}}
+BUDGET_IMPORT_RSS_MB: float = {{PizzaCutter.budget.import_rss_mb}}
+BUDGET_WHEEL_KB: float = {{PizzaCutter.budget.wheel_kb}}
+
+# runs in a fresh interpreter : imports the module given as argument, prints the import time in ms and the peak rss in kB
+# (ru_maxrss is in bytes on macOS). there is no resource module on Windows, the rss is reported as 0 there.
+FOOTPRINT_SCRIPT = '''
+import importlib, sys, time
+time_start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+import_ms = (time.perf_counter() - time_start) * 1000
+try:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform == 'darwin' else 1)
+except ImportError:
+    rss_kb = 0
+print(import_ms, rss_kb)
+'''
+
+# runs in the measured interpreter : prints the top level modules of the installed distributions given as arguments, as json -
+# from top_level.txt, or from the files of the distribution. distributions which are not installed are left out.
+REQUIREMENT_MODULES_SCRIPT = '''
+import importlib.metadata, json, sys
+d_modules = dict()
+for requirement in sys.argv[1:]:
+    for name in dict.fromkeys([requirement, requirement.replace('-', '_'), requirement.replace('_', '-')]):
+        try:
+            distribution = importlib.metadata.distribution(name)
+            break
+        except importlib.metadata.PackageNotFoundError:
+            distribution = None
+    if distribution is None:
+        continue
+    top_level = distribution.read_text('top_level.txt')
+    if top_level:
+        l_modules = top_level.split()
+    else:
+        l_modules = [file.parts[0].split('.')[0] for file in distribution.files or []
+                     if file.suffix in ('.py', '.so', '.pyd') and not file.parts[0].endswith(('.dist-info', '.egg-info', '.data'))]
+    d_modules[requirement] = sorted(module for module in set(l_modules) if module.isidentifier() and module != '__pycache__')
+print(json.dumps(d_modules))
+'''
+# runs in a fresh interpreter : imports the modules given as arguments, prints the import time in ms and how much the resident memory
+# grew during the import in kB - the current rss from /proc on linux, elsewhere the peak rss (the peak of the interpreter startup
+# can hide small imports there). there is no resource module on Windows, the growth is reported as 0 there.
+IMPORT_COST_SCRIPT = '''
+import importlib, os, sys, time
+def get_rss_kb():
+    try:
+        with open('/proc/self/statm') as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform == 'darwin' else 1)
+    except ImportError:
+        return 0
+rss_kb_start = get_rss_kb()
+time_start = time.perf_counter()
+for module_name in sys.argv[1:]:
+    importlib.import_module(module_name)
+import_ms = (time.perf_counter() - time_start) * 1000
+print(import_ms, get_rss_kb() - rss_kb_start)
+'''
+# the ranked report of import_cost
+PATH_IMPORT_COST_REPORT = PATH_PROJECT_DIR / '{{PizzaCutter.docs_dir}}' / 'import_cost.rst'
+
+# the cached virtual environments and the wheelhouse of cached_venv
+PATH_CACHE_DIR = pathlib.Path(os.environ.get('XDG_CACHE_HOME') or pathlib.Path.home() / '.cache') / 'testing_tools'
+# the files which define the dependencies - a cached virtual environment is reused, as long as they do not change
+REQUIREMENTS_FILES: List[str] = ['pyproject.toml', 'requirements.txt', 'requirements_test.txt']
+
+# the linux test matrix from the PizzaCutter configuration - the same cells as in the github actions workflow
+LINUX_TEST_MATRIX: List[Dict[str, Any]] = {{PizzaCutter.testscript.linux_test_matrix}}
+SHELL_COMMAND = '{{PizzaCutter.shell_command}}'
+MYPY_OPTIONS: List[str] = '{{PizzaCutter.testscript.mypy_options}}'.split()
+# the results of cli_bench, one json file per commit
+PATH_CLI_BENCH_DIR = PATH_PROJECT_DIR / '.cli_bench'
+# the percentiles of the latency in the cli_bench report
+CLI_BENCH_PERCENTILES: List[int] = [50, 95, 99]
+
+# the coverage engine from the PizzaCutter configuration : 'auto', 'sysmon', 'ctrace' or 'pytrace', see get_coverage_core
+COVERAGE_CORE = '{{PizzaCutter.coverage_core}}'
+PATH_COVERAGERC = PATH_PROJECT_DIR / '.coveragerc'
+# runs in the interpreter of the tests : prints its implementation, major and minor version
+INTERPRETER_VERSION_SCRIPT = 'import sys; print(sys.implementation.name, *sys.version_info[:2])'
+
+# the stages of a matrix cell, in the order they run : (name, the switch in the matrix cell)
+MATRIX_STAGES: List[Tuple[str, str]] = [('install', 'do_setup_install'), ('pytest', 'do_setup_install_test'), ('mypy', 'mypy_test'),
+                                        ('build', 'build'), ('cli', 'do_cli_test')]
+
 
 def append_subdirs_to_mypy_paths(root_directory: str) -> str:
     """
@@ -104,6 +213,678 @@ def set_env_data(env_variable: str, env_str: str) -> None:
     os.environ[env_variable] = env_str
 
 
+def install_bundle(target_directory: str, project_directory: str = str(PATH_PROJECT_DIR)) -> pathlib.Path:
+    """
+    installs the project and its requirements into the (not existing or empty) target directory, without byte-compiling it.
+    use the bundle with PYTHONPATH=<target_directory>, the console scripts are in <target_directory>/bin
+    """
+    path_target_directory = pathlib.Path(target_directory).resolve()
+    if path_target_directory.exists() and any(path_target_directory.iterdir()):
+        raise FileExistsError(f'the target directory "{path_target_directory}" is not empty')
+    command = [sys.executable, '-m', 'pip', 'install', '--no-compile', '--target', str(path_target_directory), str(project_directory)]
+    subprocess.run(command, check=True)
+    return path_target_directory
+
+
+def compile_bundle(target_directory: str, strip_sources: bool = False, jobs: int = 0) -> None:
+    """
+    byte-compiles all modules in the target directory on <jobs> processes (0 = number of cpus).
+    the pyc files use the "unchecked-hash" invalidation mode : the interpreter does not check the source files on import,
+    so the bundle starts without compiling anything on a read-only filesystem - rebuild the bundle if the sources change.
+    strip_sources writes the pyc files next to the sources (the legacy layout, which is needed for sourceless imports),
+    and deletes the sources - tracebacks will not show source lines, and inspect.getsource or doctests will not work.
+
+    >>> # Setup
+    >>> import importlib, tempfile
+    >>> temp_dir = tempfile.TemporaryDirectory()
+    >>> path_module = pathlib.Path(temp_dir.name) / 'bundle_doctest_module.py'
+    >>> _ = path_module.write_text('answer = 42')
+
+    >>> # Test
+    >>> compile_bundle(temp_dir.name, strip_sources=True, jobs=1)
+    >>> sorted(path.name for path in pathlib.Path(temp_dir.name).iterdir())
+    ['bundle_doctest_module.pyc']
+    >>> sys.path.insert(0, temp_dir.name)
+    >>> importlib.import_module('bundle_doctest_module').answer
+    42
+
+    >>> # Teardown
+    >>> sys.path.remove(temp_dir.name)
+    >>> del sys.modules['bundle_doctest_module']
+    >>> temp_dir.cleanup()
+
+    """
+    path_target_directory = pathlib.Path(target_directory).resolve()
+    compiled_all = compileall.compile_dir(str(path_target_directory), quiet=1, workers=jobs, legacy=strip_sources,
+                                          invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    if not compiled_all:
+        # some distributions ship templates or python 2 code as .py files - those are kept as they are
+        logger.warning(f'compile bundle : some files in "{path_target_directory}" could not be compiled')
+    if strip_sources:
+        for path_source_file in path_target_directory.rglob('*.py'):
+            if path_source_file.with_suffix('.pyc').is_file():
+                path_source_file.unlink()
+
+
+def build_bundle(target_directory: str, project_directory: str = str(PATH_PROJECT_DIR), strip_sources: bool = False, jobs: int = 0) -> pathlib.Path:
+    """
+    creates a deployable bundle of the project and its requirements, byte-compiled for a fast cold start
+    """
+    path_target_directory = install_bundle(target_directory=target_directory, project_directory=project_directory)
+    compile_bundle(target_directory=str(path_target_directory), strip_sources=strip_sources, jobs=jobs)
+    return path_target_directory
+
+
+def get_import_footprint(module_name: str, python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR),
+                         repeats: int = 3) -> Tuple[float, float]:
+    """
+    imports the module <repeats> times, each time in a fresh interpreter, started in the project directory.
+    returns the fastest import time in ms, and the highest peak rss of the interpreter process after the import in MB.
+
+    >>> import_ms, rss_mb = get_import_footprint('json', repeats=1)
+    >>> assert import_ms > 0
+    """
+    l_import_ms: List[float] = list()
+    l_rss_mb: List[float] = list()
+    for _ in range(repeats):
+        result = subprocess.run([python, '-c', FOOTPRINT_SCRIPT, module_name], cwd=project_directory, check=True, capture_output=True, text=True)
+        import_ms, rss_kb = result.stdout.split()
+        l_import_ms.append(float(import_ms))
+        l_rss_mb.append(float(rss_kb) / 1024)
+    return min(l_import_ms), max(l_rss_mb)
+
+
+def parse_import_time(importtime_output: str) -> List[Tuple[str, int]]:
+    """
+    returns (module, self time in us) for each module in the output of "python -X importtime"
+
+    >>> parse_import_time('import time: self [us] | cumulative | imported package\\nimport time:       352 |        946 |   json.decoder')
+    [('json.decoder', 352)]
+    """
+    l_import_times: List[Tuple[str, int]] = list()
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, _, module_name = line[len('import time:'):].split('|')
+        l_import_times.append((module_name.strip(), int(self_us)))
+    return l_import_times
+
+
+def get_import_time_breakdown(module_name: str, python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR)) -> List[Tuple[str, float]]:
+    """
+    returns the import time in ms per top level import, the slowest first - the self times of all submodules
+    are added up to their top level package. the modules imported already by the interpreter on startup are not counted.
+
+    >>> assert 'json' in dict(get_import_time_breakdown('json'))
+    """
+    def get_import_times(command: str) -> List[Tuple[str, int]]:
+        result = subprocess.run([python, '-X', 'importtime', '-c', command], cwd=project_directory, check=True, capture_output=True, text=True)
+        return parse_import_time(result.stderr)
+
+    startup_modules: Set[str] = {name for name, _ in get_import_times('pass')}
+    d_top_level_us: Dict[str, int] = dict()
+    for name, self_us in get_import_times(f'import {module_name}'):
+        if name not in startup_modules:
+            top_level_name = name.split('.')[0]
+            d_top_level_us[top_level_name] = d_top_level_us.get(top_level_name, 0) + self_us
+    return sorted(((name, self_us / 1000) for name, self_us in d_top_level_us.items()), key=lambda item: item[1], reverse=True)
+
+
+def get_wheel_size_kb(python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR)) -> float:
+    """
+    builds the wheel of the project (without dependencies) and returns its size in kB
+    """
+    with tempfile.TemporaryDirectory() as wheel_directory:
+        command = [python, '-m', 'pip', 'wheel', '--no-deps', '--quiet', '--wheel-dir', wheel_directory, project_directory]
+        subprocess.run(command, check=True)
+        return sum(path_wheel.stat().st_size for path_wheel in pathlib.Path(wheel_directory).glob('*.whl')) / 1024
+
+
+def check_footprint(module_name: str = PACKAGE_NAME, python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR),
+                    budget_import_ms: float = BUDGET_IMPORT_MS, budget_import_rss_mb: float = BUDGET_IMPORT_RSS_MB,
+                    budget_wheel_kb: float = BUDGET_WHEEL_KB, top: int = 10) -> Tuple[bool, List[str]]:
+    """
+    measures the import time and the memory of the module in a fresh interpreter, and the size of the wheel (only if it has a budget).
+    returns if all measurements are within their budgets (0 = no budget), and the lines of the report
+    with the import time of the <top> slowest top level imports.
+
+    >>> within_budgets, l_report = check_footprint('json', budget_import_ms=0, budget_import_rss_mb=0, budget_wheel_kb=0)
+    >>> within_budgets
+    True
+    """
+    import_ms, rss_mb = get_import_footprint(module_name=module_name, python=python, project_directory=project_directory)
+    l_measurements = [('import time', import_ms, budget_import_ms, 'ms'), ('peak rss after import', rss_mb, budget_import_rss_mb, 'MB')]
+    if budget_wheel_kb:
+        l_measurements.append(('wheel size', get_wheel_size_kb(python=python, project_directory=project_directory), budget_wheel_kb, 'kB'))
+
+    within_budgets = True
+    l_report = [f'footprint of "{module_name}" on "{python}":']
+    for description, measured, budget, unit in l_measurements:
+        if not budget:
+            result = 'no budget'
+        elif description == 'peak rss after import' and not measured:
+            result = 'not measured on this platform'
+        elif measured > budget:
+            result = f'OVER BUDGET of {budget:.1f} {unit}'
+            within_budgets = False
+        else:
+            result = f'within budget of {budget:.1f} {unit}'
+        l_report.append(f'    {description:<24}{measured:>10.1f} {unit}   {result}')
+
+    l_report.append(f'import time per top level import (sum of the self times, python -X importtime), the {top} slowest:')
+    for name, self_ms in get_import_time_breakdown(module_name=module_name, python=python, project_directory=project_directory)[:top]:
+        l_report.append(f'    {name:<32}{self_ms:>10.1f} ms')
+    return within_budgets, l_report
+
+
+def get_line_data(line: str) -> str:
+    """
+    the line of a requirements file without comment - the same as get_line_data of the PizzaCutter configuration
+
+    >>> get_line_data('# comment')
+    ''
+    >>> get_line_data('test # comment')
+    'test'
+    """
+    line = line.strip()
+    if "#" in line:
+        line = line.split("#", 1)[0].strip()
+    return line
+
+
+def get_requirement_name(requirement: str) -> str:
+    """
+    the name of the distribution, without extras, version, environment markers and url - '' for pip options like "-r other.txt"
+
+    >>> get_requirement_name('black[jupyter]>=23.1 ; platform_python_implementation != "PyPy"')
+    'black'
+    >>> get_requirement_name('some_package @ git+https://github.com/some_user/some_package.git')
+    'some_package'
+    >>> get_requirement_name('-r requirements_test.txt')
+    ''
+    """
+    match = re.match(r'[A-Za-z0-9][A-Za-z0-9._-]*', requirement)
+    return match.group(0) if match else ''
+
+
+def get_requirements(path_requirements_file: pathlib.Path) -> List[str]:
+    """
+    the names of the requirements in the file, in their order and without duplicates - [] if the file does not exist
+
+    >>> assert 'click' in get_requirements(PATH_PROJECT_DIR / 'requirements.txt')
+    >>> get_requirements(PATH_PROJECT_DIR / 'does_not_exist.txt')
+    []
+    """
+    if not path_requirements_file.is_file():
+        return list()
+    l_names = [get_requirement_name(get_line_data(line)) for line in path_requirements_file.read_text(encoding='utf-8').splitlines()]
+    return list(dict.fromkeys(name for name in l_names if name))
+
+
+def get_requirement_modules(l_requirements: List[str], python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR)) -> Dict[str, List[str]]:
+    """
+    the top level modules of each requirement which is installed in the interpreter
+
+    >>> get_requirement_modules(['click', 'does_not_exist'])
+    {'click': ['click']}
+    """
+    result = subprocess.run([python, '-c', REQUIREMENT_MODULES_SCRIPT, *l_requirements], cwd=project_directory, check=True, capture_output=True, text=True)
+    d_requirement_modules: Dict[str, List[str]] = json.loads(result.stdout)
+    return d_requirement_modules
+
+
+def get_import_cost(l_module_names: List[str], python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR),
+                    repeats: int = 3) -> Tuple[float, float]:
+    """
+    imports the modules <repeats> times, each time in a fresh interpreter, started in the project directory.
+    returns the fastest import time in ms, and the highest growth of the resident memory during the import in MB.
+
+    >>> import_ms, rss_mb = get_import_cost(['json', 'decimal'], repeats=1)
+    >>> assert import_ms > 0
+    """
+    l_import_ms: List[float] = list()
+    l_rss_mb: List[float] = list()
+    for _ in range(repeats):
+        result = subprocess.run([python, '-c', IMPORT_COST_SCRIPT, *l_module_names], cwd=project_directory, check=True, capture_output=True, text=True)
+        import_ms, rss_kb = result.stdout.split()
+        l_import_ms.append(float(import_ms))
+        l_rss_mb.append(float(rss_kb) / 1024)
+    return min(l_import_ms), max(l_rss_mb)
+
+
+def import_cost(l_requirements_files: List[str], python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR),
+                repeats: int = 3) -> List[Tuple[str, List[str], Optional[float], Optional[float], str]]:
+    """
+    measures for each requirement the import of its top level modules, in fresh interpreters started in the project directory.
+    returns (requirement, modules, import time in ms, growth of the resident memory in MB, note) for each requirement,
+    ranked by the import time - the requirements which are not installed or can not be imported are at the end, without measurements.
+
+    >>> path_requirements_file = pathlib.Path(tempfile.mkdtemp()) / 'requirements.txt'
+    >>> _ = path_requirements_file.write_text('click  # the cli\\ndoes_not_exist>=1.0\\n')
+    >>> l_rows = import_cost([str(path_requirements_file)], repeats=1)
+    >>> [(requirement, l_modules, note) for requirement, l_modules, _, _, note in l_rows]
+    [('click', ['click'], ''), ('does_not_exist', [], 'not installed')]
+    """
+    path_project_directory = pathlib.Path(project_directory)
+    l_requirements: List[str] = list()
+    for requirements_file in l_requirements_files:
+        l_requirements.extend(get_requirements(path_project_directory / requirements_file))
+    l_requirements = list(dict.fromkeys(l_requirements))
+    d_requirement_modules = get_requirement_modules(l_requirements, python=python, project_directory=project_directory)
+
+    l_measured: List[Tuple[str, List[str], Optional[float], Optional[float], str]] = list()
+    l_not_measured: List[Tuple[str, List[str], Optional[float], Optional[float], str]] = list()
+    for requirement in l_requirements:
+        l_modules = d_requirement_modules.get(requirement)
+        if not l_modules:
+            l_not_measured.append((requirement, list(), None, None, 'not installed' if l_modules is None else 'no top level modules'))
+            continue
+        try:
+            import_ms, rss_mb = get_import_cost(l_modules, python=python, project_directory=project_directory, repeats=repeats)
+        except subprocess.CalledProcessError as exc:
+            error_lines = exc.stderr.strip().splitlines() or ['unknown error']
+            l_not_measured.append((requirement, l_modules, None, None, f'import failed : {error_lines[-1]}'))
+            continue
+        l_measured.append((requirement, l_modules, import_ms, rss_mb, ''))
+    return sorted(l_measured, key=lambda row: row[2] or 0.0, reverse=True) + l_not_measured
+
+
+def format_import_cost_report(l_rows: List[Tuple[str, List[str], Optional[float], Optional[float], str]], python: str, repeats: int) -> List[str]:
+    """
+    the report of import_cost as restructured text
+
+    >>> print('\\n'.join(format_import_cost_report([('click', ['click'], 12.3, 1.5, ''), ('x', [], None, None, 'not installed')], 'python3', 3)))
+    Import cost of the requirements
+    ...
+        rank  requirement                   import ms    rss MB  modules
+           1  click                              12.3       1.5  click
+              x                                     -         -  not installed
+    """
+    l_report = ['Import cost of the requirements', '=' * 31, '',
+                f'measured by "testing_tools.py import_cost" with "{python}" on {time.strftime("%Y-%m-%d")} :',
+                f'the fastest of {repeats} cold imports of the top level modules of each requirement, each in a fresh interpreter,',
+                'and how much the resident memory grew during the import - the top rows are candidates for a lazy import, or to be dropped.', '',
+                '.. code-block::', '',
+                f'    {"rank":>4}  {"requirement":<28}{"import ms":>10}{"rss MB":>10}  modules']
+    rank = 0
+    for requirement, l_modules, import_ms, rss_mb, note in l_rows:
+        if import_ms is None:
+            l_report.append(f'    {"":>4}  {requirement:<28}{"-":>10}{"-":>10}  {note}')
+            continue
+        rank += 1
+        rss = f'{rss_mb:.1f}' if rss_mb is not None else 'n/a'
+        l_report.append(f'    {rank:>4}  {requirement:<28}{import_ms:>10.1f}{rss:>10}  {", ".join(l_modules)}')
+    return l_report
+
+
+def get_interpreter_names(python_version: str) -> List[str]:
+    """
+    the executable names of the interpreter for a python version of the github actions matrix
+
+    >>> get_interpreter_names('3.11')
+    ['python3.11']
+    >>> get_interpreter_names('3.13-dev')
+    ['python3.13']
+    >>> get_interpreter_names('3.13t')
+    ['python3.13t']
+    >>> get_interpreter_names('pypy-3.10')
+    ['pypy3.10']
+    >>> get_interpreter_names('graalpy-24.1')
+    ['graalpy-24.1', 'graalpy']
+    """
+    version = python_version.split('-dev')[0]
+    if version.startswith('pypy-'):
+        return [f'pypy{version[len("pypy-"):]}']
+    if version.startswith('graalpy-'):
+        return [version, 'graalpy']
+    return [f'python{version}']
+
+
+def find_interpreter(python_version: str) -> Optional[str]:
+    """
+    searches the interpreter for a python version of the github actions matrix on PATH, in the pyenv versions and in /opt/python*/bin.
+    the first one which starts is taken - pyenv shims for instance fail, if the version is not activated.
+
+    >>> find_interpreter(f'{sys.version_info.major}.{sys.version_info.minor}') is not None
+    True
+    >>> find_interpreter('1.0') is None
+    True
+    """
+    l_search_directories = os.environ.get('PATH', '').split(os.pathsep)
+    l_search_directories += [str(path_bin) for path_bin in sorted((pathlib.Path.home() / '.pyenv/versions').glob('*/bin'), reverse=True)]
+    l_search_directories += [str(path_bin) for path_bin in sorted(pathlib.Path('/opt').glob('python*/bin'), reverse=True)]
+    for interpreter_name in get_interpreter_names(python_version):
+        for search_directory in l_search_directories:
+            interpreter = shutil.which(interpreter_name, path=search_directory)
+            if interpreter and subprocess.run([interpreter, '-c', 'pass'], capture_output=True).returncode == 0:
+                return interpreter
+    return None
+
+
+def run_matrix_cell(d_cell: Dict[str, Any], work_directory: str, project_directory: str = str(PATH_PROJECT_DIR)) -> Dict[str, Tuple[str, float]]:
+    """
+    runs the enabled stages of the matrix cell on a copy of the project, in a new virtual environment below the work directory.
+    the stages after a failed install are skipped. the output of all stages is written to <work_directory>/<python_version>/matrix.log
+    returns {stage : (result, seconds)} - the result is "ok", "FAILED", "skipped" or "-" if the stage is not enabled for the cell.
+    the free-threaded cells run without the GIL and with the thread stress tests, like on github actions
+    """
+    path_cell_directory = pathlib.Path(work_directory).resolve() / d_cell['python_version']
+    path_venv = path_cell_directory / 'venv'
+    path_project = path_cell_directory / 'project'
+    venv_bin = path_venv / ('Scripts' if sys.platform == 'win32' else 'bin')
+    d_stage_commands: Dict[str, List[List[str]]] = {
+        'install': [[d_cell['interpreter'], '-m', 'venv', str(path_venv)], [str(venv_bin / 'python'), '-m', 'pip', 'install', '.[test]']],
+        'pytest': [[str(venv_bin / 'python'), '-m', 'pytest', '.']],
+        'mypy': [[str(venv_bin / 'python'), '-m', 'mypy', '.', *MYPY_OPTIONS]],
+        'build': [[str(venv_bin / 'python'), '-m', 'pip', 'wheel', '--no-deps', '--wheel-dir', 'dist', '.']],
+        'cli': [[str(venv_bin / SHELL_COMMAND), '--version']]}
+
+    # every cell builds on its own copy - builds in the same project directory would share build/ and *.egg-info
+    path_cell_directory.mkdir(parents=True, exist_ok=True)
+    shutil.copytree(project_directory, path_project, dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns('.git', '.eggs', '.mypy_cache', '.pytest_cache', '__pycache__', 'build', 'dist', '*.egg-info'))
+
+    env = dict(os.environ, PYTHON_GIL='0', THREAD_STRESS='True') if d_cell.get('free_threaded') else None
+    d_results: Dict[str, Tuple[str, float]] = dict()
+    with open(path_cell_directory / 'matrix.log', 'w') as log_file:
+        for stage, switch in MATRIX_STAGES:
+            # the install is needed by all other stages - it always runs
+            if stage != 'install' and not d_cell[switch]:
+                d_results[stage] = ('-', 0.0)
+                continue
+            if d_results.get('install', ('ok', 0.0))[0] != 'ok':
+                d_results[stage] = ('skipped', 0.0)
+                continue
+            time_start = time.perf_counter()
+            result = 'ok'
+            for command in d_stage_commands[stage]:
+                log_file.write(f'\n### {stage} : {" ".join(command)}\n')
+                log_file.flush()
+                if subprocess.run(command, cwd=path_project, env=env, stdout=log_file, stderr=subprocess.STDOUT).returncode:
+                    result = 'FAILED'
+                    break
+            d_results[stage] = (result, time.perf_counter() - time_start)
+            # the install builds in the project directory - mypy would find the package twice
+            shutil.rmtree(path_project / 'build', ignore_errors=True)
+    return d_results
+
+
+def run_matrix(work_directory: str, l_python_versions: Optional[List[str]] = None, jobs: int = 0,
+               project_directory: str = str(PATH_PROJECT_DIR)) -> Tuple[bool, List[str]]:
+    """
+    runs the cells of the linux test matrix (or only those with the given python versions) in parallel on <jobs> threads
+    (0 = number of cpus), with the interpreters found on this machine - cells without interpreter are skipped.
+    docs are not built locally, and the build test runs on github actions only.
+    returns if no stage failed, and the lines of the result table.
+    """
+    l_cells = [dict(d_cell) for d_cell in LINUX_TEST_MATRIX if not l_python_versions or d_cell['python_version'] in l_python_versions]
+    for d_cell in l_cells:
+        d_cell['interpreter'] = find_interpreter(d_cell['python_version'])
+
+    d_cell_results: Dict[str, Dict[str, Tuple[str, float]]] = dict()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        d_futures = {executor.submit(run_matrix_cell, d_cell, work_directory, project_directory): d_cell['python_version']
+                     for d_cell in l_cells if d_cell['interpreter']}
+        for future in concurrent.futures.as_completed(d_futures):
+            d_cell_results[d_futures[future]] = future.result()
+
+    all_passed = True
+    l_table = [f'{"cell":<14}{"interpreter":<48}' + ''.join(f'{stage:<14}' for stage, _ in MATRIX_STAGES) + 'total']
+    for d_cell in l_cells:
+        python_version = d_cell['python_version']
+        if python_version not in d_cell_results:
+            l_table.append(f'{python_version:<14}{"not found, skipped":<48}')
+            continue
+        d_results = d_cell_results[python_version]
+        all_passed = all_passed and all(result != 'FAILED' for result, _ in d_results.values())
+        columns = ''.join(f'{f"{result} {seconds:.1f}s" if seconds else result:<14}' for result, seconds in d_results.values())
+        l_table.append(f'{python_version:<14}{d_cell["interpreter"]:<48}{columns}{sum(seconds for _, seconds in d_results.values()):.1f}s')
+    l_table.append(f'logs : {pathlib.Path(work_directory).resolve()}/<cell>/matrix.log')
+    return all_passed, l_table
+
+
+def get_requirements_hash(python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR)) -> str:
+    """
+    the sha256 of the requirements files, the project directory and the interpreter - the key of the cached virtual environment
+
+    >>> assert get_requirements_hash() == get_requirements_hash()
+    >>> assert get_requirements_hash() != get_requirements_hash(python='other_python')
+    """
+    path_project_directory = pathlib.Path(project_directory).resolve()
+    requirements_hash = hashlib.sha256(f'{path_project_directory}\0{pathlib.Path(python).resolve()}\0'.encode('utf-8'))
+    for requirements_file in REQUIREMENTS_FILES:
+        path_requirements_file = path_project_directory / requirements_file
+        requirements_hash.update(f'\0{requirements_file}\0'.encode('utf-8'))
+        if path_requirements_file.is_file():
+            requirements_hash.update(path_requirements_file.read_bytes())
+    return requirements_hash.hexdigest()
+
+
+def cached_venv(python: str = sys.executable, project_directory: str = str(PATH_PROJECT_DIR), cache_directory: str = str(PATH_CACHE_DIR),
+                offline: bool = False) -> pathlib.Path:
+    """
+    returns a virtual environment with the editable install of the project and its test requirements.
+    it is reused as long as the requirements files do not change - the sources are installed editable, they do not count.
+    otherwise a new one is created : the wheels of all requirements are collected in <cache_directory>/wheelhouse first,
+    then the virtual environment is installed from the wheelhouse only - with offline=True the wheelhouse is not updated,
+    so a virtual environment can be rebuilt without network, as long as the wheelhouse has all wheels.
+    older virtual environments of the same project and interpreter are deleted.
+    """
+    path_project_directory = pathlib.Path(project_directory).resolve()
+    path_wheelhouse = pathlib.Path(cache_directory) / 'wheelhouse'
+    path_venvs = pathlib.Path(cache_directory) / 'venvs'
+    requirements_hash = get_requirements_hash(python=python, project_directory=str(path_project_directory))
+    path_venv = path_venvs / requirements_hash[:16]
+    # the marker is written last - a virtual environment without marker was not completely installed
+    path_marker = path_venv / 'testing_tools_venv.json'
+    d_marker = {'requirements_hash': requirements_hash, 'project_directory': str(path_project_directory), 'python': str(pathlib.Path(python).resolve())}
+    if path_marker.is_file() and json.loads(path_marker.read_text()) == d_marker:
+        logger.info(f'reusing the virtual environment "{path_venv}", the requirements did not change')
+        return path_venv
+
+    for path_marker_other in path_venvs.glob('*/testing_tools_venv.json'):
+        d_marker_other = json.loads(path_marker_other.read_text())
+        if (d_marker_other['project_directory'], d_marker_other['python']) == (d_marker['project_directory'], d_marker['python']):
+            shutil.rmtree(path_marker_other.parent)
+    shutil.rmtree(path_venv, ignore_errors=True)
+
+    logger.info(f'creating the virtual environment "{path_venv}", the requirements changed')
+    path_wheelhouse.mkdir(parents=True, exist_ok=True)
+    venv_python = str(path_venv / ('Scripts' if sys.platform == 'win32' else 'bin') / 'python')
+    install_from_wheelhouse = ['-m', 'pip', 'install', '--no-index', '--find-links', str(path_wheelhouse)]
+    # the editable install is always the interpreted build, see setup_install_venv in lib_bash_functions.sh
+    env = dict(os.environ, MYPYC_COMPILE='0')
+    # the output of pip and venv goes to stderr - "testing_tools.py cached_venv" prints only the path of the virtual environment to stdout
+    if not offline:
+        subprocess.run([python, '-m', 'pip', 'wheel', '--wheel-dir', str(path_wheelhouse), '--find-links', str(path_wheelhouse),
+                        '.[test]', 'setuptools', 'wheel'], cwd=path_project_directory, env=env, check=True, stdout=sys.stderr)
+    subprocess.run([python, '-m', 'venv', str(path_venv)], check=True, stdout=sys.stderr)
+    # the build requirements come from the wheelhouse as well - an isolated build would need the index
+    subprocess.run([venv_python, *install_from_wheelhouse, 'setuptools', 'wheel'], check=True, stdout=sys.stderr)
+    subprocess.run([venv_python, *install_from_wheelhouse, '--no-build-isolation', '-e', '.[test]'], cwd=path_project_directory, env=env, check=True,
+                   stdout=sys.stderr)
+    path_marker.write_text(json.dumps(d_marker))
+    return path_venv
+
+
+def get_percentile(l_values: List[float], percent: float) -> float:
+    """
+    the percentile with linear interpolation between the closest ranks, like numpy.percentile
+
+    >>> get_percentile([1, 2, 3, 4], 50)
+    2.5
+    >>> get_percentile([5], 99)
+    5.0
+    >>> get_percentile([10, 20, 30, 40, 50], 95)
+    48.0
+    """
+    l_sorted = sorted(l_values)
+    position = (len(l_sorted) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(l_sorted) - 1)
+    return float(l_sorted[lower] + (l_sorted[upper] - l_sorted[lower]) * (position - lower))
+
+
+def run_cli_once(l_command: List[str]) -> Tuple[float, float, int]:
+    """
+    runs the command once, with stdout and stderr discarded - returns the wall time in ms, the peak rss of the process in MB
+    (0 on Windows, where there is no wait4) and the exit code
+
+    >>> ms, rss_mb, exit_code = run_cli_once([sys.executable, '-c', 'pass'])
+    >>> assert ms > 0 and exit_code == 0
+    """
+    time_start = time.perf_counter()
+    process = subprocess.Popen(l_command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not hasattr(os, 'wait4'):
+        exit_code = process.wait()
+        return (time.perf_counter() - time_start) * 1000, 0.0, exit_code
+    # wait4 returns the resource usage of exactly that child - ru_maxrss is in bytes on macOS
+    _, wait_status, rusage = os.wait4(process.pid, 0)
+    ms = (time.perf_counter() - time_start) * 1000
+    process.returncode = -os.WTERMSIG(wait_status) if os.WIFSIGNALED(wait_status) else os.WEXITSTATUS(wait_status)
+    return ms, rusage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), process.returncode
+
+
+def run_cli_bench(l_command: List[str], invocations: int = 50, concurrency: int = 1, warmup: int = 3,
+                  expected_exit_code: int = 0) -> Dict[str, Any]:
+    """
+    runs the command <invocations> times, at most <concurrency> at the same time, after <warmup> unmeasured runs.
+    returns the latency percentiles, the throughput, the highest peak rss and the number of runs with another exit code
+
+    >>> d_run = run_cli_bench([sys.executable, '-c', 'pass'], invocations=4, concurrency=2, warmup=0)
+    >>> d_run['invocations'], d_run['failed']
+    (4, 0)
+    """
+    for _ in range(warmup):
+        run_cli_once(l_command)
+    time_start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        l_results = list(executor.map(lambda _: run_cli_once(l_command), range(invocations)))
+    seconds = time.perf_counter() - time_start
+    l_ms = [ms for ms, _, _ in l_results]
+    d_run: Dict[str, Any] = {'invocations': invocations, 'concurrency': concurrency}
+    d_run.update({f'p{percent}_ms': round(get_percentile(l_ms, percent), 2) for percent in CLI_BENCH_PERCENTILES})
+    d_run.update({'mean_ms': round(sum(l_ms) / len(l_ms), 2), 'max_ms': round(max(l_ms), 2),
+                  'throughput_per_s': round(invocations / seconds, 2),
+                  'peak_rss_mb': round(max(rss_mb for _, rss_mb, _ in l_results), 2),
+                  'failed': sum(1 for _, _, exit_code in l_results if exit_code != expected_exit_code)})
+    return d_run
+
+
+def get_git_commit(project_directory: str = str(PATH_PROJECT_DIR)) -> str:
+    """
+    the commit of the project, with "-dirty" if there are uncommitted changes - '' if it is not a git repository
+
+    >>> assert isinstance(get_git_commit(), str)
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_directory, check=True, capture_output=True, text=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=project_directory, check=True,
+                                capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+    return f'{commit}-dirty' if status else commit
+
+
+def cli_bench(l_command: List[str], l_concurrency: List[int], invocations: int = 50, warmup: int = 3, expected_exit_code: int = 0,
+              project_directory: str = str(PATH_PROJECT_DIR)) -> Dict[str, Any]:
+    """
+    runs the command serially and with each concurrency, returns the results with the commit, the interpreter and the machine
+
+    >>> d_results = cli_bench([sys.executable, '-c', 'pass'], l_concurrency=[1, 2], invocations=2, warmup=0)
+    >>> [d_run['concurrency'] for d_run in d_results['runs']]
+    [1, 2]
+    """
+    return {'command': l_command, 'commit': get_git_commit(project_directory), 'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': sys.version.split()[0], 'platform': sys.platform, 'cpus': os.cpu_count(),
+            'runs': [run_cli_bench(l_command, invocations=invocations, concurrency=concurrency, warmup=warmup, expected_exit_code=expected_exit_code)
+                     for concurrency in l_concurrency]}
+
+
+def format_cli_bench_report(d_results: Dict[str, Any], d_baseline: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    the lines of the result table - with the change against the baseline, for the runs with the same concurrency
+
+    >>> d_run = {'invocations': 10, 'concurrency': 1, 'p50_ms': 20.0, 'p95_ms': 30.0, 'p99_ms': 31.0, 'mean_ms': 22.0, 'max_ms': 31.0,
+    ...          'throughput_per_s': 45.0, 'peak_rss_mb': 12.0, 'failed': 0}
+    >>> d_results = {'command': ['cmd'], 'commit': 'abc', 'runs': [d_run]}
+    >>> print('\\n'.join(format_cli_bench_report(d_results, dict(d_results, commit='xyz', runs=[dict(d_run, p50_ms=25.0)]))))
+    "cmd" at commit abc, compared with commit xyz:
+    concurrency     p50 ms     p95 ms     p99 ms   per second    peak rss MB   failed
+    1                 20.0       30.0       31.0         45.0           12.0        0
+       change       -20.0%      +0.0%      +0.0%        +0.0%          +0.0%
+    """
+    l_columns = [f'p{percent}_ms' for percent in CLI_BENCH_PERCENTILES] + ['throughput_per_s', 'peak_rss_mb']
+    d_baseline_runs = {d_run['concurrency']: d_run for d_run in (d_baseline or dict()).get('runs', list())}
+    title = f'"{shlex.join(d_results["command"])}" at commit {d_results["commit"] or "unknown"}'
+    l_report = [title + (f', compared with commit {d_baseline["commit"] or "unknown"}:' if d_baseline else ':'),
+                f'{"concurrency":<12}' + ''.join(f'{f"p{percent} ms":>11}' for percent in CLI_BENCH_PERCENTILES)
+                + f'{"per second":>13}{"peak rss MB":>15}   failed']
+    for d_run in d_results['runs']:
+        l_report.append(f'{d_run["concurrency"]:<12}' + ''.join(f'{d_run[column]:>11.1f}' for column in l_columns[:-2])
+                        + f'{d_run["throughput_per_s"]:>13.1f}{d_run["peak_rss_mb"]:>15.1f}{d_run["failed"]:>9}')
+        d_baseline_run = d_baseline_runs.get(d_run['concurrency'])
+        if d_baseline_run:
+            l_changes = [f'{(d_run[column] / d_baseline_run[column] - 1) * 100:+.1f}%' if d_baseline_run[column] else '' for column in l_columns]
+            l_report.append(f'{"   change":<12}' + ''.join(f'{change:>11}' for change in l_changes[:-2]) + f'{l_changes[-2]:>13}{l_changes[-1]:>15}')
+    return l_report
+
+
+def get_coverage_branch(path_coveragerc: pathlib.Path = PATH_COVERAGERC) -> bool:
+    """
+    if branch coverage is measured, from the [run] section of the coverage configuration
+
+    >>> with tempfile.TemporaryDirectory() as temp_dir:
+    ...     path_coveragerc = pathlib.Path(temp_dir) / '.coveragerc'
+    ...     assert not get_coverage_branch(path_coveragerc)
+    ...     _ = path_coveragerc.write_text('[run]\\nbranch  = True\\n')
+    ...     assert get_coverage_branch(path_coveragerc)
+    """
+    config = configparser.ConfigParser()
+    config.read(path_coveragerc)
+    return config.getboolean('run', 'branch', fallback=False)
+
+
+def get_coverage_core(core: str = COVERAGE_CORE, implementation: str = sys.implementation.name,
+                      version_info: Tuple[int, int] = (sys.version_info[0], sys.version_info[1]), branch: bool = False) -> str:
+    """
+    the coverage engine for the interpreter, passed to coverage as environment variable COVERAGE_CORE (coverage >= 7.4, older versions ignore it).
+    'auto' selects 'sysmon' (sys.monitoring, python >= 3.12), which only pays for the lines which were not seen yet, instead of tracing
+    every line - but sys.monitoring measures branches only from python 3.14. elsewhere the C tracer 'ctrace' - on other implementations
+    like pypy the python tracer 'pytrace', they have no C tracer. any other value is passed as it is.
+
+    >>> get_coverage_core('auto', 'cpython', (3, 12))
+    'sysmon'
+    >>> get_coverage_core('auto', 'cpython', (3, 12), branch=True)
+    'ctrace'
+    >>> get_coverage_core('auto', 'cpython', (3, 14), branch=True)
+    'sysmon'
+    >>> get_coverage_core('auto', 'cpython', (3, 11))
+    'ctrace'
+    >>> get_coverage_core('auto', 'pypy', (3, 10))
+    'pytrace'
+    >>> get_coverage_core('ctrace', 'cpython', (3, 13))
+    'ctrace'
+    """
+    if core != 'auto':
+        return core
+    if implementation != 'cpython':
+        return 'pytrace'
+    if version_info >= (3, 14) or (version_info >= (3, 12) and not branch):
+        return 'sysmon'
+    return 'ctrace'
+
+
+def get_interpreter_version(python: str = sys.executable) -> Tuple[str, Tuple[int, int]]:
+    """
+    the implementation and the version of the interpreter
+
+    >>> assert get_interpreter_version() == (sys.implementation.name, tuple(sys.version_info[:2]))
+    """
+    implementation, major, minor = subprocess.run([python, '-c', INTERPRETER_VERSION_SCRIPT], check=True, stdout=subprocess.PIPE, text=True).stdout.split()
+    return implementation, (int(major), int(minor))
+
+
 @click.group(context_settings=CLICK_CONTEXT_SETTINGS)
 def cli_main() -> None:                     # pragma: no cover
     """ testing tools """
@@ -134,6 +915,121 @@ def cli_append_directory_to_python_path(directory: str) -> None:
     print(response)
 
 
+@cli_main.command('build_bundle', context_settings=CLICK_CONTEXT_SETTINGS)
+@click.argument('target_directory', type=click.Path(exists=False, file_okay=False, dir_okay=True))
+@click.option('--project_directory', type=click.Path(exists=True, file_okay=False, dir_okay=True), default=str(PATH_PROJECT_DIR),
+              help='the project to bundle, default : this project')
+@click.option('--strip_sources', is_flag=True, default=False, help='delete the sources, keep only the byte-compiled files')
+@click.option('--jobs', type=click.IntRange(min=0), default=0, help='number of processes to byte-compile, 0 = number of cpus')
+def cli_build_bundle(target_directory: str, project_directory: str, strip_sources: bool, jobs: int) -> None:                # pragma: no cover
+    """ installs the project and its requirements into the target directory, byte-compiled with unchecked-hash pycs """
+    path_target_directory = build_bundle(target_directory=target_directory, project_directory=project_directory,
+                                         strip_sources=strip_sources, jobs=jobs)                                           # pragma: no cover
+    print(path_target_directory)
+
+
+@cli_main.command('check_footprint', context_settings=CLICK_CONTEXT_SETTINGS)
+@click.option('--module', 'module_name', default=PACKAGE_NAME, help='the module to import, default : the package')
+@click.option('--python', default=sys.executable, help='the interpreter to measure, default : the current interpreter')
+@click.option('--project_directory', type=click.Path(exists=True, file_okay=False, dir_okay=True), default=str(PATH_PROJECT_DIR),
+              help='the project to measure, default : this project')
+@click.option('--import_ms', type=click.FloatRange(min=0), default=BUDGET_IMPORT_MS, help='budget for the import time, 0 = no budget')
+@click.option('--import_rss_mb', type=click.FloatRange(min=0), default=BUDGET_IMPORT_RSS_MB, help='budget for the peak rss after the import, 0 = no budget')
+@click.option('--wheel_kb', type=click.FloatRange(min=0), default=BUDGET_WHEEL_KB, help='budget for the wheel size, 0 = no budget and no wheel build')
+def cli_check_footprint(module_name: str, python: str, project_directory: str,
+                        import_ms: float, import_rss_mb: float, wheel_kb: float) -> None:                                  # pragma: no cover
+    """ checks import time, memory and wheel size against the footprint budgets, exit code 1 if over budget """
+    within_budgets, l_report = check_footprint(module_name=module_name, python=python, project_directory=project_directory,
+                                               budget_import_ms=import_ms, budget_import_rss_mb=import_rss_mb, budget_wheel_kb=wheel_kb)   # pragma: no cover
+    print('\n'.join(l_report))
+    if not within_budgets:
+        sys.exit(1)
+
+
+@cli_main.command('import_cost', context_settings=CLICK_CONTEXT_SETTINGS)
+@click.option('--requirements_file', 'l_requirements_files', multiple=True, default=['requirements.txt'], show_default=True,
+              help='the requirements files in the project directory, can be given more than once')
+@click.option('--python', default=sys.executable, help='the interpreter with the installed requirements, default : the current interpreter')
+@click.option('--project_directory', type=click.Path(exists=True, file_okay=False, dir_okay=True), default=str(PATH_PROJECT_DIR),
+              help='the project to measure, default : this project')
+@click.option('--repeats', type=click.IntRange(min=1), default=3, show_default=True, help='cold imports per requirement, the fastest counts')
+@click.option('--output', type=click.Path(dir_okay=False), default=str(PATH_IMPORT_COST_REPORT), help='the report, default : .docs/import_cost.rst')
+def cli_import_cost(l_requirements_files: Tuple[str, ...], python: str, project_directory: str, repeats: int, output: str) -> None:  # pragma: no cover
+    """ measures the import time and memory of each requirement in a fresh interpreter, and writes a ranked report """
+    l_rows = import_cost(list(l_requirements_files), python=python, project_directory=project_directory, repeats=repeats)
+    l_report = format_import_cost_report(l_rows, python=python, repeats=repeats)
+    pathlib.Path(output).write_text('\n'.join(l_report) + '\n', encoding='utf-8')
+    print('\n'.join(l_report))
+    logger.info(f'the report was written to "{output}"')
+
+
+@cli_main.command('matrix', context_settings=CLICK_CONTEXT_SETTINGS)
+@click.option('--python_version', 'l_python_versions', multiple=True, help='run only the cells of that python version, can be given more than once')
+@click.option('--work_directory', type=click.Path(file_okay=False, dir_okay=True), default=None,
+              help='the directory for the virtual environments and logs of the cells, default : a new temporary directory')
+@click.option('--jobs', type=click.IntRange(min=0), default=0, help='number of cells to run in parallel, 0 = number of cpus')
+def cli_matrix(l_python_versions: Tuple[str, ...], work_directory: Optional[str], jobs: int) -> None:                    # pragma: no cover
+    """ runs the linux test matrix locally, with the interpreters found on this machine, exit code 1 if a stage failed """
+    work_directory = work_directory or tempfile.mkdtemp(prefix='{{PizzaCutter.package_name}}_matrix_')       # pragma: no cover
+    all_passed, l_table = run_matrix(work_directory=work_directory, l_python_versions=list(l_python_versions), jobs=jobs)
+    print('\n'.join(l_table))
+    if not all_passed:
+        sys.exit(1)
+
+
+@cli_main.command('cached_venv', context_settings=CLICK_CONTEXT_SETTINGS)
+@click.option('--python', default=sys.executable, help='the interpreter of the virtual environment, default : the current interpreter')
+@click.option('--project_directory', type=click.Path(exists=True, file_okay=False, dir_okay=True), default=str(PATH_PROJECT_DIR),
+              help='the project to install, default : this project')
+@click.option('--cache_directory', type=click.Path(file_okay=False, dir_okay=True), default=str(PATH_CACHE_DIR),
+              help='the directory for the virtual environments and the wheelhouse')
+@click.option('--offline', is_flag=True, default=False, help='install from the wheelhouse only, without updating it')
+def cli_cached_venv(python: str, project_directory: str, cache_directory: str, offline: bool) -> None:                    # pragma: no cover
+    """ creates or reuses the virtual environment for the requirements of the project, and returns its path as string """
+    path_venv = cached_venv(python=python, project_directory=project_directory, cache_directory=cache_directory, offline=offline)     # pragma: no cover
+    print(path_venv)
+
+
+@cli_main.command('cli_bench', context_settings=CLICK_CONTEXT_SETTINGS)
+@click.option('--args', 'cli_args', default='--version', show_default=True, help='the arguments of the cli')
+@click.option('--command', default=SHELL_COMMAND, show_default=True, help='the installed cli to run - or any command line')
+@click.option('--invocations', type=click.IntRange(min=1), default=50, show_default=True, help='number of measured runs, per concurrency')
+@click.option('--concurrency', 'l_concurrency', type=click.IntRange(min=1), multiple=True,
+              help='runs at the same time, can be given more than once, default : 1 and the number of cpus')
+@click.option('--warmup', type=click.IntRange(min=0), default=3, show_default=True, help='number of runs before the measurement')
+@click.option('--expected_exit_code', type=int, default=0, show_default=True, help='runs with another exit code are counted as failed')
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='the json file of the results, default : .cli_bench/<commit>.json')
+@click.option('--compare', type=click.Path(exists=True, dir_okay=False), default=None, help='the json file of earlier results, to compare with')
+def cli_cli_bench(cli_args: str, command: str, invocations: int, l_concurrency: Tuple[int, ...], warmup: int, expected_exit_code: int,
+                  output: Optional[str], compare: Optional[str]) -> None:                                                    # pragma: no cover
+    """ measures latency percentiles, throughput and peak rss of the installed cli, exit code 1 if a run failed """
+    l_command = shlex.split(command) + shlex.split(cli_args)                                                             # pragma: no cover
+    if not shutil.which(l_command[0]):
+        raise click.ClickException(f'"{l_command[0]}" not found - install the project first, or use --command')
+    d_results = cli_bench(l_command, l_concurrency=list(l_concurrency) or sorted({1, os.cpu_count() or 1}), invocations=invocations,
+                          warmup=warmup, expected_exit_code=expected_exit_code)
+    path_output = pathlib.Path(output) if output else PATH_CLI_BENCH_DIR / f'{d_results["commit"] or time.strftime("%Y%m%d_%H%M%S")}.json'
+    path_output.parent.mkdir(parents=True, exist_ok=True)
+    path_output.write_text(json.dumps(d_results, indent=1) + '\n')
+    d_baseline = json.loads(pathlib.Path(compare).read_text()) if compare else None
+    print('\n'.join(format_cli_bench_report(d_results, d_baseline)))
+    print(f'results : {path_output}')
+    if any(d_run['failed'] for d_run in d_results['runs']):
+        sys.exit(1)
+
+
+@cli_main.command('coverage_core', context_settings=CLICK_CONTEXT_SETTINGS)
+@click.option('--python', default=sys.executable, help='the interpreter which runs the tests, default : the current interpreter')
+@click.option('--core', default=COVERAGE_CORE, show_default=True, help='auto, sysmon, ctrace or pytrace')
+def cli_coverage_core(python: str, core: str) -> None:                                                                     # pragma: no cover
+    """ prints the coverage engine for the interpreter - the environment variable COVERAGE_CORE, if set, wins """
+    if os.environ.get('COVERAGE_CORE'):
+        print(os.environ['COVERAGE_CORE'])
+    else:
+        implementation, version_info = get_interpreter_version(python)
+        print(get_coverage_core(core=core, implementation=implementation, version_info=version_info, branch=get_coverage_branch()))
+
+
 # entry point if main
 if __name__ == '__main__':
     cli_main()
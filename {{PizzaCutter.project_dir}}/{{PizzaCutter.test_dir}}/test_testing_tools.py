@@ -0,0 +1,51 @@
+"""
+the commands of tests/local_testscripts/testing_tools.py, which the local testscripts read the output of
+"""
+
+# STDLIB
+import os
+import pathlib
+import stat
+import subprocess
+import sys
+
+# EXT
+import pytest
+
+path_testing_tools = pathlib.Path(__file__).resolve().parent / 'local_testscripts/testing_tools.py'
+
+# an interpreter, which only pretends to run pip and venv - and writes to stdout like they do
+fake_python = """#!{python}
+import os, pathlib, shutil, sys
+print('Collecting some_requirement - output of the fake interpreter')
+if sys.argv[1:3] == ['-m', 'venv']:
+    path_bin_dir = pathlib.Path(sys.argv[3]) / 'bin'
+    path_bin_dir.mkdir(parents=True)
+    shutil.copy2(__file__, path_bin_dir / 'python')
+print('Successfully installed some_requirement')
+"""
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='the fake interpreter is a script with a shebang')
+def test_cached_venv_prints_only_the_path(tmp_path: pathlib.Path) -> None:
+    # the local testscript reads the path with venv_dir="$(python3 testing_tools.py cached_venv)", output of pip would break it
+    path_fake_python = tmp_path / 'fake_python'
+    path_fake_python.write_text(fake_python.format(python=sys.executable))
+    path_fake_python.chmod(path_fake_python.stat().st_mode | stat.S_IXUSR)
+    path_project_dir = tmp_path / 'project'
+    path_project_dir.mkdir()
+    (path_project_dir / 'requirements.txt').write_text('some_requirement\n')
+    command = [sys.executable, str(path_testing_tools), 'cached_venv', '--python', str(path_fake_python), '--project_directory', str(path_project_dir),
+               '--cache_directory', str(tmp_path / 'cache')]
+
+    l_paths_venv = list()
+    for _ in ('cache miss', 'cache hit'):
+        result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=dict(os.environ))
+        l_lines = result.stdout.splitlines()
+        assert len(l_lines) == 1, f'stdout is not only the path of the virtual environment :\n{result.stdout}'
+        assert (pathlib.Path(l_lines[0]) / 'testing_tools_venv.json').is_file()
+        l_paths_venv.append(l_lines[0])
+        if not l_paths_venv[1:]:
+            # the output of pip and venv on the cache miss
+            assert 'Successfully installed some_requirement' in result.stderr
+    assert l_paths_venv[0] == l_paths_venv[1]
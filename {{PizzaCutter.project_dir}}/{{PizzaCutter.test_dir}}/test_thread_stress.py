@@ -0,0 +1,179 @@
+# optional file of PizzaCutter, removed on every build if its option is not set - delete this line to keep the file as it is
+"""
+thread stress tests : the doctests of the package and the cli commands run in many threads at the same time, so races show up.
+on free-threaded python (no GIL) the threads really run in parallel, with the GIL the switch interval is lowered, so the threads switch often.
+they only run with the environment variable THREAD_STRESS=True - the free-threaded cells of the test matrix set it.
+THREAD_STRESS_WORKERS and THREAD_STRESS_ROUNDS set the number of threads, and how often each thread runs all tests.
+"""
+
+# STDLIB
+import doctest
+import importlib
+import io
+import os
+import pkgutil
+import random
+import sys
+import threading
+from typing import Any, Callable, Iterator, List, Optional
+
+# EXT
+import pytest
+
+PACKAGE_NAME = '{{PizzaCutter.package_name}}'
+CLI_MODULE_NAME = f'{PACKAGE_NAME}.{{PizzaCutter.cli_module_filename}}'
+THREAD_STRESS = os.environ.get('THREAD_STRESS', 'False') == 'True'
+THREAD_STRESS_WORKERS = int(os.environ.get('THREAD_STRESS_WORKERS', '8'))
+THREAD_STRESS_ROUNDS = int(os.environ.get('THREAD_STRESS_ROUNDS', '10'))
+DOCTEST_OPTIONFLAGS = doctest.ELLIPSIS | doctest.NORMALIZE_WHITESPACE | doctest.IGNORE_EXCEPTION_DETAIL
+
+# the doctests which change global state on purpose, and can not run in parallel with themselves - like "<package>.<module>.<function>".
+# the optional modules : signal handlers and the logging configuration belong to the process, the config_loader doctest sets the
+# cache directory, the metrics doctests register their metrics by name, the disk_cache doctest sets the cache directory and clears the cache,
+# the plugins doctests set the plugin index, batch_io.run_record redirects sys.stdout of the process.
+l_thread_unsafe_doctests: List[str] = [f'{PACKAGE_NAME}.aio_tools._run_cancel_on_signals', f'{PACKAGE_NAME}.log_setup.setup_logging',
+                                       f'{PACKAGE_NAME}.config_loader.load_config', f'{PACKAGE_NAME}.metrics.Counter',
+                                       f'{PACKAGE_NAME}.metrics.Gauge', f'{PACKAGE_NAME}.metrics.Histogram', f'{PACKAGE_NAME}.disk_cache.memoize',
+                                       f'{PACKAGE_NAME}.plugins.PluginGroup', f'{PACKAGE_NAME}.plugins.get_plugin_info', f'{PACKAGE_NAME}.batch_io.run_record']
+# the cli commands which run in parallel, in the process of the test
+l_cli_commands: List[List[str]] = [['--version'], ['-h'], ['info'], ['--traceback', 'info']]
+
+pytestmark = pytest.mark.skipif(not THREAD_STRESS, reason='the thread stress tests only run with the environment variable THREAD_STRESS=True')
+
+StressRunner = Callable[[Callable[[int], None]], None]
+
+
+class _ThreadLocalOutput(io.TextIOBase):
+    """ sys.stdout during the stress tests : every thread writes to its own buffer, and reads its own output like the buffer of doctest """
+    def __init__(self) -> None:
+        super().__init__()
+        self._local = threading.local()
+
+    def _get_buffer(self) -> io.StringIO:
+        try:
+            buffer: io.StringIO = self._local.buffer
+        except AttributeError:
+            buffer = self._local.buffer = io.StringIO()
+        return buffer
+
+    def write(self, text: str) -> int:
+        return self._get_buffer().write(text)
+
+    def getvalue(self) -> str:
+        # like the buffer of doctest : the output of an example ends with a newline
+        value = self._get_buffer().getvalue()
+        if value and not value.endswith('\n'):
+            value += '\n'
+        return value
+
+    def truncate(self, size: Optional[int] = None) -> int:
+        buffer = self._get_buffer()
+        buffer.seek(size or 0)
+        return buffer.truncate()
+
+
+_thread_local_output = _ThreadLocalOutput()
+
+
+class _ThreadDocTestRunner(doctest.DocTestRunner):
+    """
+    a doctest runner for one thread. DocTestRunner.run() patches sys.stdout, sys.displayhook, linecache and pdb for every test
+    and restores them afterwards - runners in parallel would restore the patches of each other. here sys.stdout and sys.displayhook
+    are set once for all threads by the thread_stress fixture, linecache and pdb are not patched.
+    """
+    def __init__(self) -> None:
+        super().__init__(optionflags=DOCTEST_OPTIONFLAGS)
+        self._fakeout = _thread_local_output
+        self.debugger = doctest._OutputRedirectingPdb(_thread_local_output)          # type: ignore
+
+    def run(self, test: doctest.DocTest, compileflags: Optional[int] = None, out: Any = None, clear_globs: bool = True) -> doctest.TestResults:
+        self.test = test
+        if compileflags is None:
+            compileflags = doctest._extract_future_flags(test.globs)                  # type: ignore
+        try:
+            results: doctest.TestResults = self._DocTestRunner__run(test, compileflags, out)     # type: ignore
+        finally:
+            if clear_globs:
+                test.globs.clear()
+        return results
+
+
+def run_in_threads(function: Callable[[int], None]) -> None:
+    """
+    runs the function in THREAD_STRESS_WORKERS threads at the same time, THREAD_STRESS_ROUNDS times per thread, with the number of the
+    thread as argument - the threads start together at a barrier. the first exception of a thread is raised.
+    sys.stdout is a stream with a buffer per thread, while the threads run.
+    """
+    barrier = threading.Barrier(THREAD_STRESS_WORKERS)
+    l_exceptions: List[BaseException] = list()
+
+    def worker(thread_number: int) -> None:
+        try:
+            barrier.wait()
+            for _ in range(THREAD_STRESS_ROUNDS):
+                function(thread_number)
+        except BaseException as exc:
+            l_exceptions.append(exc)
+
+    l_threads = [threading.Thread(target=worker, args=(thread_number, ), name=f'stress_{thread_number}') for thread_number in range(THREAD_STRESS_WORKERS)]
+    stdout, displayhook = sys.stdout, sys.displayhook
+    sys.stdout, sys.displayhook = _thread_local_output, sys.__displayhook__
+    try:
+        for thread in l_threads:
+            thread.start()
+        for thread in l_threads:
+            thread.join()
+    finally:
+        sys.stdout, sys.displayhook = stdout, displayhook
+    if l_exceptions:
+        raise l_exceptions[0]
+
+
+@pytest.fixture
+def thread_stress() -> Iterator[StressRunner]:
+    """
+    returns run_in_threads - with the GIL the switch interval is set to 1 microsecond for the test, so the threads switch as often as possible
+    """
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        yield run_in_threads
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+def get_doctests() -> List[doctest.DocTest]:
+    """ the doctests of all modules of the package, with examples """
+    package = importlib.import_module(PACKAGE_NAME)
+    l_module_names = [PACKAGE_NAME] + [module_info.name for module_info in pkgutil.walk_packages(package.__path__, prefix=f'{PACKAGE_NAME}.')]
+    finder = doctest.DocTestFinder()
+    l_doctests: List[doctest.DocTest] = list()
+    for module_name in l_module_names:
+        l_doctests += [test for test in finder.find(importlib.import_module(module_name))
+                       if test.examples and test.name not in l_thread_unsafe_doctests]
+    return l_doctests
+
+
+def test_doctests_in_threads(thread_stress: StressRunner) -> None:
+    l_doctests = get_doctests()
+
+    def run_doctests(thread_number: int) -> None:
+        runner = _ThreadDocTestRunner()
+        l_report: List[str] = list()
+        # every thread in its own order, every run with its own copy of the globals
+        for test in random.Random(thread_number).sample(l_doctests, len(l_doctests)):
+            runner.run(doctest.DocTest(test.examples, dict(test.globs), test.name, test.filename, test.lineno, test.docstring), out=l_report.append)
+        assert not runner.failures, f'thread {thread_number}:\n' + ''.join(l_report)
+
+    thread_stress(run_doctests)
+
+
+def test_cli_commands_in_threads(thread_stress: StressRunner) -> None:
+    cli_module: Any = pytest.importorskip(CLI_MODULE_NAME)
+
+    def run_cli_commands(thread_number: int) -> None:
+        for l_args in l_cli_commands:
+            exit_code = cli_module.cli_main.main(args=l_args, prog_name='{{PizzaCutter.shell_command}}', standalone_mode=False)
+            assert exit_code in (None, 0), f'thread {thread_number}: "{" ".join(l_args)}" exit code {exit_code}'
+
+    thread_stress(run_cli_commands)